@@ -0,0 +1,48 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from config.config import API_CACHE_TTL_SECONDS
+
+
+class TTLCache:
+    """
+    Результаты дорогих запросов в памяти на ttl секунд.
+
+    Одновременные запросы с одним ключом ждут одну загрузку, а не идут в БД каждый сам по себе —
+    дашборды обычно обновляют одни и те же панели разом.
+    """
+
+    def __init__(self, ttl: float = API_CACHE_TTL_SECONDS, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, tuple[float, Any]] = {}  # ключ -> (до какого момента годен, значение)
+        self._loading: dict[Hashable, asyncio.Task] = {}
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        task = self._loading.get(key)
+        if task is None:
+            task = self._loading[key] = asyncio.create_task(self._load(key, load))
+        # Отключившийся клиент не отменяет загрузку, которую ждут остальные
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await load()
+        finally:
+            del self._loading[key]
+
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            self._entries = {k: entry for k, entry in self._entries.items() if entry[0] > now}
+            while len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
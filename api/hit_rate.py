@@ -0,0 +1,62 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backtest.replay import HORIZONS, forward_returns, load_series
+from config.config import BAR_STORE_DIR
+from data_fetcher.bar_store import BAR_MS
+
+
+def signal_bar_time(timestamp: datetime) -> int:
+    # Время сигнала в БД хранится без пояса и считается UTC (SQLite всегда пишет UTC, PostgreSQL — при timezone=UTC)
+    ms = int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return ms // BAR_MS * BAR_MS
+
+
+def hit_rates(signals: list[tuple[str, str, str, datetime]], root: str = BAR_STORE_DIR) -> list[dict]:
+    """
+    Качество сигналов (биржа, символ, набор правил, время) по (биржа, набор правил): доля сигналов,
+    после которых цена выросла, и средняя форвардная доходность на горизонтах backtest.replay.HORIZONS.
+
+    Цены берутся из хранилища баров; сигналы, для которых нет бара или горизонт ещё не наступил,
+    в долю не входят (evaluated).
+    """
+    by_exchange = defaultdict(list)
+    for exchange, symbol, rule, timestamp in signals:
+        by_exchange[exchange].append((symbol, rule, signal_bar_time(timestamp)))
+
+    returns: dict[tuple[str, str], dict[str, list[float]]] = {}
+    counts: dict[tuple[str, str], int] = defaultdict(int)
+    for exchange, items in by_exchange.items():
+        start = min(bar_time for *_, bar_time in items)
+        end = max(bar_time for *_, bar_time in items) + (max(HORIZONS.values()) + 1) * BAR_MS
+        series = load_series(exchange, start, end, root, symbols=sorted({symbol for symbol, *_ in items}))
+        times = {symbol: [bar.timestamp for bar in bars] for symbol, bars in series.items()}
+
+        for symbol, rule, bar_time in items:
+            counts[(exchange, rule)] += 1
+            horizons = returns.setdefault((exchange, rule), {name: [] for name in HORIZONS})
+            bars = series.get(symbol)
+            if not bars:
+                continue
+            i = bisect_left(times[symbol], bar_time)
+            if i == len(bars) or bars[i].timestamp != bar_time:
+                continue
+            for name, value in forward_returns(bars, i).items():
+                if value is not None:
+                    horizons[name].append(value)
+
+    result = []
+    for (exchange, rule), horizons in sorted(returns.items()):
+        stats = {}
+        for name, values in horizons.items():
+            values = np.array(values)
+            stats[name] = {
+                "evaluated": len(values),
+                "hit_rate": round(float((values > 0).mean()), 4) if len(values) else None,
+                "mean_return": round(float(values.mean()), 4) if len(values) else None,
+            }
+        result.append({"exchange": exchange, "rule": rule, "signals": counts[(exchange, rule)], "horizons": stats})
+    return result
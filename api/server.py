@@ -0,0 +1,227 @@
+import asyncio
+import base64
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.cache import TTLCache
+from api.hit_rate import hit_rates
+from config.config import API_HOST, API_PORT, API_PAGE_SIZE, API_MAX_PAGE_SIZE, API_EXPORT_CHUNK, API_MAX_DAYS, \
+    BAR_STORE_DIR
+from db.crud import get_signals_page, get_signal_totals, get_signal_times
+from db.engine import db_url, make_engine
+from db.models import SignalData, utc_today
+
+logger = logging.getLogger("api")
+
+COLUMNS = ("id", "timestamp", "exchange", "symbol", "rule", "oi_growth", "price_growth", "volume_growth_ratio")
+
+
+def create_read_engine():
+    """
+    Свой пул соединений для API: тяжёлые выборки не занимают соединения, в которые пишет сканер.
+    API_DB_URL позволяет читать с реплики; в PostgreSQL транзакции открываются только на чтение.
+    """
+    url = os.getenv("API_DB_URL") or db_url
+    options = {"execution_options": {"postgresql_readonly": True}} if url.startswith("postgresql") else {}
+    return make_engine(url, int(os.getenv("API_DB_POOL_SIZE", 2)), int(os.getenv("API_DB_MAX_OVERFLOW", 2)), **options)
+
+
+def encode_cursor(signal: SignalData) -> str:
+    return base64.urlsafe_b64encode(f"{signal.timestamp.isoformat()}|{signal.id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        timestamp, signal_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(signal_id)
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"invalid cursor: {cursor}\n")
+
+
+def _row(signal: SignalData) -> dict:
+    row = {column: getattr(signal, column) for column in COLUMNS}
+    row["timestamp"] = signal.timestamp.isoformat()
+    return row
+
+
+def _int(request: web.Request, name: str, default: int, low: int, high: int) -> int:
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be an integer\n")
+    if not low <= number <= high:
+        raise web.HTTPBadRequest(text=f"{name} must be between {low} and {high}\n")
+    return number
+
+
+def _datetime(request: web.Request, name: str) -> datetime | None:
+    value = request.query.get(name)
+    if value is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be an ISO 8601 datetime\n")
+    # В БД время без пояса (UTC)
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def _filters(request: web.Request) -> dict:
+    return {
+        "exchange": request.query.get("exchange"),
+        "symbol": request.query.get("symbol"),
+        "rule": request.query.get("rule"),
+        "since": _datetime(request, "since"),
+        "until": _datetime(request, "until"),
+    }
+
+
+class SignalApi:
+    """
+    Чтение истории сигналов: лента с постраничной выдачей по ключу, выгрузка потоком CSV/NDJSON
+    и агрегаты для дашбордов за TTL-кешем.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], cache: TTLCache | None = None,
+                 bar_root: str = BAR_STORE_DIR):
+        self.session_factory = session_factory
+        self.cache = cache or TTLCache()
+        self.bar_root = bar_root
+
+    def add_routes(self, app: web.Application):
+        app.router.add_get("/signals", self.signals)
+        app.router.add_get("/signals/export", self.export)
+        app.router.add_get("/stats/counts", self.counts)
+        app.router.add_get("/stats/hit-rate", self.hit_rate)
+
+    async def signals(self, request: web.Request) -> web.Response:
+        """Последние сигналы; next — курсор следующей страницы (параметр after), null на последней."""
+        filters = _filters(request)
+        limit = _int(request, "limit", API_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+        after = decode_cursor(request.query["after"]) if "after" in request.query else None
+        async with self.session_factory() as session:
+            page = await get_signals_page(session, limit, after, **filters)
+        cursor = encode_cursor(page[-1]) if len(page) == limit else None
+        return web.json_response({"signals": [_row(signal) for signal in page], "next": cursor})
+
+    async def export(self, request: web.Request) -> web.StreamResponse:
+        """
+        Все сигналы по фильтрам, format=csv или ndjson. Строки читаются из БД пачками по ключу и сразу
+        отправляются клиенту — память не зависит от размера выгрузки, соединение с БД не держится, пока
+        медленный клиент дочитывает ответ.
+        """
+        export_format = request.query.get("format", "ndjson")
+        if export_format not in ("csv", "ndjson"):
+            raise web.HTTPBadRequest(text="format must be csv or ndjson\n")
+        filters = _filters(request)
+
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/csv; charset=utf-8" if export_format == "csv" else "application/x-ndjson",
+            "Content-Disposition": f'attachment; filename="signals.{export_format}"',
+        })
+        await response.prepare(request)
+        if export_format == "csv":
+            await response.write((",".join(COLUMNS) + "\r\n").encode())
+
+        after = None
+        exported = 0
+        while True:
+            async with self.session_factory() as session:
+                page = await get_signals_page(session, API_EXPORT_CHUNK, after, **filters)
+            if not page:
+                break
+            rows = [_row(signal) for signal in page]
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.DictWriter(buffer, COLUMNS).writerows(rows)
+                chunk = buffer.getvalue()
+            else:
+                chunk = "".join(json.dumps(row) + "\n" for row in rows)
+            await response.write(chunk.encode())
+            exported += len(page)
+            if len(page) < API_EXPORT_CHUNK:
+                break
+            after = (page[-1].timestamp, page[-1].id)
+
+        await response.write_eof()
+        logger.info(f"Выгружено сигналов в {export_format}: {exported}")
+        return response
+
+    async def counts(self, request: web.Request) -> web.Response:
+        """Сигналов по символам и наборам правил за последние days суток (из дневных сводок)."""
+        days = _int(request, "days", 1, 1, API_MAX_DAYS)
+        limit = _int(request, "limit", API_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+        exchange, rule = request.query.get("exchange"), request.query.get("rule")
+        end = utc_today() + timedelta(days=1)
+
+        async def load():
+            async with self.session_factory() as session:
+                rows = await get_signal_totals(session, end - timedelta(days=days), end, exchange, rule, limit)
+            return [{"exchange": row_exchange, "symbol": symbol, "rule": row_rule, "signals": signals}
+                    for row_exchange, symbol, row_rule, signals in rows]
+
+        counts = await self.cache.get(("counts", days, exchange, rule, limit, end), load)
+        return web.json_response({"days": days, "counts": counts})
+
+    async def hit_rate(self, request: web.Request) -> web.Response:
+        """Доля сигналов с ростом цены и средняя доходность после сигнала за последние days суток."""
+        days = _int(request, "days", 7, 1, API_MAX_DAYS)
+        exchange = request.query.get("exchange")
+
+        async def load():
+            since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+            async with self.session_factory() as session:
+                signals = await get_signal_times(session, since, exchange)
+            # Чтение баров и расчёт доходностей — в отдельном потоке, чтобы не держать цикл событий
+            return await asyncio.to_thread(hit_rates, signals, self.bar_root)
+
+        stats = await self.cache.get(("hit_rate", days, exchange), load)
+        return web.json_response({"days": days, "rules": stats})
+
+
+async def start_api_server(host: str = API_HOST, port: int = API_PORT) -> web.AppRunner:
+    engine = create_read_engine()
+    api = SignalApi(async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+    app = web.Application()
+    api.add_routes(app)
+
+    async def dispose_engine(app: web.Application):
+        await engine.dispose()
+
+    app.on_cleanup.append(dispose_engine)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"API сигналов доступно на http://{host}:{port}/signals")
+    return runner
+
+
+if __name__ == "__main__":
+    # Отдельный процесс рядом с main.py: python -m api.server
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    async def serve():
+        runner = await start_api_server()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
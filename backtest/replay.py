@@ -0,0 +1,188 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from config.config import EXCHANGES, BAR_STORE_DIR, OI_THRESHOLD_PERCENT, PRICE_THRESHOLD_PERCENT, \
+    VOLUME_RATIO_THRESHOLD, TIMEFRAME_MINUTES, MAX_SIGNALS_PER_DAY
+from data_fetcher.bar import Bar
+from data_fetcher.bar_store import BarStore, BAR_MS
+from db.signal_counter import DailySignalCounter
+from logic.pipeline import evaluate_symbol
+from logic.rules import RuleSet
+
+HORIZONS = {"15m": 3, "1h": 12, "4h": 48}  # горизонты форвардной доходности в барах
+
+_series: dict[str, dict[str, list[Bar]]] = {}  # данные, загруженные в процессе-воркере
+
+
+def load_series(exchange: str, start: int, end: int, root: str = BAR_STORE_DIR,
+                symbols: list[str] | None = None) -> dict[str, list[Bar]]:
+    """Записанные бары биржи за [start, end) в виде рядов {symbol: [bar, ...]} по возрастанию времени."""
+    bars = BarStore(root).read(exchange, start=start, end=end, symbols=symbols)
+    series = {}
+    symbols, starts = np.unique(bars["symbol"], return_index=True)
+    bounds = list(starts[1:]) + [len(bars)]
+    for symbol, first, last in zip(symbols, starts, bounds):
+        name = symbol.decode()
+        series[name] = [Bar(name, ts, oi, price, volume) for _, ts, oi, price, volume in bars[first:last].tolist()]
+    return series
+
+
+class ReplayClock:
+    """Дата прогона для суточных лимитов: счётчик сигналов обнуляется по датам баров, а не по часам."""
+
+    def __init__(self):
+        self.day: date | None = None
+
+    def today(self) -> date:
+        return self.day
+
+
+def forward_returns(bars: list[Bar], index: int) -> dict[str, float | None]:
+    price = bars[index].price
+    returns = {}
+    for name, steps in HORIZONS.items():
+        target = index + steps
+        if target < len(bars) and bars[target].timestamp == bars[index].timestamp + steps * BAR_MS:
+            returns[name] = (bars[target].price / price - 1) * 100
+        else:
+            returns[name] = None
+    return returns
+
+
+def replay(exchange: str, series: dict[str, list[Bar]], rules: list[RuleSet]) -> list[dict]:
+    """
+    Прогон записанных баров через тот же путь, что и боевой тик: analyze_signal, суточные лимиты, форматтер.
+
+    Тик — закрытие каждого бара (в хранилище только закрытые бары), окна с пропусками баров пропускаются.
+    Возвращает по записи на каждый сигнал с форвардной доходностью.
+    """
+    clock = ReplayClock()
+    counter = DailySignalCounter(today=clock.today)
+    bars_needed = max(rule.bars_needed for rule in rules)
+    span = (bars_needed - 1) * BAR_MS
+
+    records = []
+    for symbol, bars in series.items():
+        for i in range(bars_needed - 1, len(bars)):
+            window = bars[i - bars_needed + 1:i + 1]
+            if window[-1].timestamp - window[0].timestamp != span:
+                continue
+
+            # Сутки по UTC — как у DailySignalCounter в боевом режиме
+            clock.day = datetime.fromtimestamp(window[-1].timestamp / 1000, timezone.utc).date()
+            for event in evaluate_symbol(symbol, exchange, window, rules, counter):
+                records.append({
+                    "exchange": exchange,
+                    "symbol": symbol,
+                    "rule": event.rule.name,
+                    "timestamp": window[-1].timestamp,
+                    "number": event.number,
+                    "notified": event.message is not None,
+                    "oi_growth": event.signal["oi_growth"],
+                    "price_growth": event.signal["price_growth"],
+                    "volume_growth_ratio": event.signal["volume_growth_ratio"],
+                    "returns": forward_returns(bars, i),
+                })
+    return records
+
+
+def summarize(records: list[dict]) -> dict:
+    """Число сигналов и статистика форвардной доходности по отправленным уведомлениям."""
+    notified = [record for record in records if record["notified"]]
+    summary = {"signals": len(records), "notified": len(notified)}
+    for name in HORIZONS:
+        values = np.array([record["returns"][name] for record in notified if record["returns"][name] is not None])
+        summary[name] = {
+            "mean": round(float(values.mean()), 3) if len(values) else None,
+            "median": round(float(np.median(values)), 3) if len(values) else None,
+            "positive": round(float((values > 0).mean()), 3) if len(values) else None,
+        }
+    return summary
+
+
+def build_grid(windows: list[int], ois: list[float], prices: list[float], volumes: list[float],
+               max_signals: int = MAX_SIGNALS_PER_DAY) -> list[RuleSet]:
+    return [
+        RuleSet(name=f"w{window}_oi{oi}_p{price}_v{volume}", window=window, min_growth_oi=oi,
+                min_growth_price=price, min_volume_ratio=volume, max_signals_per_day=max_signals)
+        for window, oi, price, volume in itertools.product(windows, ois, prices, volumes)
+    ]
+
+
+def _init_worker(exchanges: list[str], start: int, end: int, root: str):
+    for exchange in exchanges:
+        _series[exchange] = load_series(exchange, start, end, root)
+
+
+def _run_chunk(rules: list[RuleSet]) -> dict[str, list[dict]]:
+    # Наборы правил считаются независимо (счётчик ведётся по имени правила), поэтому пачка проходит данные один раз
+    records = [record for exchange, series in _series.items() for record in replay(exchange, series, rules)]
+    return {rule.name: [record for record in records if record["rule"] == rule.name] for rule in rules}
+
+
+def sweep(rules: list[RuleSet], exchanges: list[str], start: int, end: int, root: str = BAR_STORE_DIR,
+          workers: int | None = None) -> dict[str, dict]:
+    """Прогон сетки наборов правил в пуле процессов. Возвращает {имя правила: summarize(...)}."""
+    workers = workers or os.cpu_count() or 1
+    chunks = [rules[i::workers] for i in range(min(workers, len(rules)))]
+    with ProcessPoolExecutor(len(chunks), initializer=_init_worker, initargs=(exchanges, start, end, root)) as pool:
+        results = {}
+        for chunk_records in pool.map(_run_chunk, chunks):
+            results.update({name: summarize(records) for name, records in chunk_records.items()})
+    return {rule.name: results[rule.name] for rule in rules}
+
+
+def _floats(value: str) -> list[float]:
+    return [float(item) for item in value.split(",")]
+
+
+def _ints(value: str) -> list[int]:
+    return [int(item) for item in value.split(",")]
+
+
+if __name__ == "__main__":
+    # python -m backtest.replay --days 14 --oi 2,3,5 --volume 3,5 --window 15,20,30
+    parser = argparse.ArgumentParser(description="Прогон порогов analyze_signal по записанным барам")
+    parser.add_argument("--exchange", action="append", choices=EXCHANGES, help="по умолчанию все биржи")
+    parser.add_argument("--days", type=int, default=7, help="сколько последних суток прогонять")
+    parser.add_argument("--window", type=_ints, default=[TIMEFRAME_MINUTES])
+    parser.add_argument("--oi", type=_floats, default=[OI_THRESHOLD_PERCENT])
+    parser.add_argument("--price", type=_floats, default=[PRICE_THRESHOLD_PERCENT])
+    parser.add_argument("--volume", type=_floats, default=[VOLUME_RATIO_THRESHOLD])
+    parser.add_argument("--max-signals", type=int, default=MAX_SIGNALS_PER_DAY)
+    parser.add_argument("--store", default=BAR_STORE_DIR)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--json", help="сохранить результаты в файл")
+    args = parser.parse_args()
+
+    end = int(time.time() * 1000)
+    start = end - args.days * 24 * 60 * 60 * 1000
+    grid = build_grid(args.window, args.oi, args.price, args.volume, args.max_signals)
+
+    started = time.perf_counter()
+    results = sweep(grid, args.exchange or EXCHANGES, start, end, args.store, args.workers)
+    print(f"Наборов правил: {len(grid)}, прогон за {time.perf_counter() - started:.1f} с")
+
+    header = f"{'правило':<28} {'сигналов':>9} {'уведомл.':>9}"
+    header += "".join(f" | {name:>6} ср/мед/доля+" for name in HORIZONS)
+    print(header)
+    for name, summary in results.items():
+        line = f"{name:<28} {summary['signals']:>9} {summary['notified']:>9}"
+        for horizon in HORIZONS:
+            stats = summary[horizon]
+            if stats["mean"] is None:
+                line += f" | {'—':>22}"
+            else:
+                line += f" | {stats['mean']:>6.2f}/{stats['median']:>6.2f}/{stats['positive']:>5.0%}"
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+
+from data_fetcher.bar import Bar
+from data_fetcher.bar_store import BAR_DTYPE
+from logic.analyzer import analyze_signal
+from logic.batch_analyzer import analyze_batch, block_from_bars, block_from_records, hits_to_signals
+
+INTERVAL = 5
+BAR_MS = INTERVAL * 60 * 1000
+WINDOWS = (20, 60, 240)
+THRESHOLDS = {"min_growth_oi": 3.0, "min_growth_price": float("-inf"), "min_volume_ratio": 2.0}
+
+
+def generate_series(n_symbols: int, n_bars: int, seed: int = 42) -> dict[str, list[Bar]]:
+    """Синтетические ряды; у каждого двадцатого символа пропущен бар, у каждого десятого цена стоит."""
+    rng = np.random.default_rng(seed)
+    oi = 1e6 * np.cumprod(1 + rng.normal(0, 0.01, (n_symbols, n_bars)), axis=1)
+    price = 10 * np.cumprod(1 + rng.normal(0, 0.005, (n_symbols, n_bars)), axis=1)
+    price[::10] = 10.0
+    volume = rng.lognormal(7, 1, (n_symbols, n_bars))
+    series = {}
+    for i in range(n_symbols):
+        symbol = f"SYM{i}USDT"
+        bars = [Bar(symbol, j * BAR_MS, *values) for j, values in enumerate(zip(oi[i].tolist(), price[i].tolist(),
+                                                                                 volume[i].tolist()))]
+        if i % 20 == 0:
+            del bars[-3]
+        series[symbol] = bars
+    return series
+
+
+def to_records(series: dict[str, list[Bar]]) -> np.ndarray:
+    # Как отдаёт BarStore.read: по возрастанию (symbol, timestamp)
+    records = np.array([(bar.symbol, bar.timestamp, bar.oi, bar.price, bar.volume)
+                        for bars in series.values() for bar in bars], dtype=BAR_DTYPE)
+    return records[np.lexsort((records["timestamp"], records["symbol"]))]
+
+
+def best_of(func, repeat: int = 5) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def loop_signals(series: dict[str, list[Bar]], window: int) -> list[dict]:
+    signals = []
+    for data in series.values():
+        try:
+            signal = analyze_signal(data, window=window, interval=INTERVAL, **THRESHOLDS)
+        except ZeroDivisionError:
+            continue  # в боевом цикле такой символ тоже пропускается
+        if signal:
+            signals.append(signal)
+    return signals
+
+
+def run(n_symbols: int):
+    n_bars = max(WINDOWS) // INTERVAL + 1
+    series = generate_series(n_symbols, n_bars)
+    records = to_records(series)
+
+    bars_time, block = best_of(lambda: block_from_bars(series, n_bars))
+    records_time, records_block = best_of(lambda: block_from_records(records, n_bars))
+    # В хранилище символы отсортированы как строки — сверяем по символу
+    order = [records_block.symbols.index(symbol) for symbol in block.symbols]
+    for field in ("timestamp", "oi", "price", "volume"):
+        assert np.array_equal(getattr(block, field), getattr(records_block, field)[order], equal_nan=True)
+    print(f"{n_symbols:>6} символов: блок из Bar {bars_time * 1000:.2f} мс, из записей хранилища "
+          f"{records_time * 1000:.2f} мс")
+
+    loop_total = batch_total = 0.0
+    for window in WINDOWS:
+        loop_time, expected = best_of(lambda: loop_signals(series, window))
+        batch_time, (mask, result) = best_of(
+            lambda: analyze_batch(block, window=window, interval=INTERVAL, **THRESHOLDS)
+        )
+        assert hits_to_signals(mask, result) == expected, "batch results differ from analyze_signal"
+        loop_total += loop_time
+        batch_total += batch_time
+        complete = int((mask & result["complete"]).sum())
+        print(f"    окно {window:>3} мин: analyze_signal {loop_time * 1000:7.2f} мс, "
+              f"analyze_batch {batch_time * 1000:6.2f} мс, x{loop_time / batch_time:.0f}, "
+              f"сигналов {len(expected)} (полных окон {complete})")
+
+    print(f"    все окна: x{loop_total / batch_total:.0f} без сборки, "
+          f"x{loop_total / (batch_total + bars_time):.1f} со сборкой из Bar, "
+          f"x{loop_total / (batch_total + records_time):.1f} со сборкой из хранилища")
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_analyzer
+    for n_symbols in (1_000, 5_000, 10_000):
+        run(n_symbols)
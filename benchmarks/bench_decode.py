@@ -0,0 +1,99 @@
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from data_fetcher.binance import BinanceAdapter
+from data_fetcher.http_client import json_loads
+from data_fetcher.merge import merge_bars
+
+N_BARS = 61  # окно самого длинного правила с запасом
+BAR_MS = 5 * 60_000
+
+
+def generate_payloads(n_symbols: int, seed: int = 42) -> dict[str, tuple[bytes, bytes]]:
+    """Тела ответов Binance klines и openInterestHist в том виде, в каком они приходят по сети."""
+    rng = np.random.default_rng(seed)
+    payloads = {}
+    for i in range(n_symbols):
+        price = 10 * np.cumprod(1 + rng.normal(0, 0.005, N_BARS))
+        oi = 1e6 * np.cumprod(1 + rng.normal(0, 0.01, N_BARS))
+        volume = rng.lognormal(7, 1, N_BARS)
+        klines = [
+            [j * BAR_MS, f"{p:.4f}", f"{p:.4f}", f"{p:.4f}", f"{p:.4f}", f"{v:.2f}", j * BAR_MS + BAR_MS - 1,
+             f"{p * v:.2f}", 100, f"{v / 2:.2f}", f"{p * v / 2:.2f}", "0"]
+            for j, (p, v) in enumerate(zip(price, volume))
+        ]
+        oi_hist = [
+            {"symbol": f"SYM{i}USDT", "sumOpenInterest": f"{o / p:.3f}", "sumOpenInterestValue": f"{o:.8f}",
+             "timestamp": j * BAR_MS}
+            for j, (o, p) in enumerate(zip(oi, price))
+        ]
+        payloads[f"SYM{i}USDT"] = (json.dumps(klines).encode(), json.dumps(oi_hist).encode())
+    return payloads
+
+
+def decode_dicts(payloads: dict[str, tuple[bytes, bytes]]) -> dict[str, list[dict]]:
+    """Прежний путь: json.loads, словарь на каждую точку обоих рядов и склейка в словари."""
+    series = {}
+    for symbol, (klines, oi_hist) in payloads.items():
+        price_volume = [{"timestamp": int(row[0]), "price": float(row[4]), "volume": float(row[5])}
+                        for row in json.loads(klines)]
+        oi = [{"timestamp": int(item["timestamp"]), "oi": float(item["sumOpenInterestValue"])}
+              for item in json.loads(oi_hist)]
+        series[symbol] = [
+            {"symbol": symbol, "timestamp": max(o["timestamp"], pv["timestamp"]), "oi": o["oi"],
+             "price": pv["price"], "volume": pv["volume"]}
+            for o, pv in zip(oi, price_volume)
+        ]
+    return series
+
+
+def decode_bars(payloads: dict[str, tuple[bytes, bytes]], loads) -> dict[str, list]:
+    """Текущий путь фетчеров: разбор из байтов, кортежи по рядам, Bar на склеенную точку."""
+    series = {}
+    for symbol, (klines, oi_hist) in payloads.items():
+        price_volume = [(int(row[0]), float(row[4]), float(row[5])) for row in loads(klines)]
+        oi = [(int(item["timestamp"]), float(item["sumOpenInterestValue"])) for item in loads(oi_hist)]
+        series[symbol] = merge_bars(symbol, oi, price_volume, BinanceAdapter.oi_value)
+    return series
+
+
+def measure(func, repeat: int = 3) -> tuple[float, float]:
+    """Лучшее время и пиковая память (МБ) при удержании результата для всех символов."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak / 2 ** 20
+
+
+def run(n_symbols: int):
+    payloads = generate_payloads(n_symbols)
+    variants = {
+        "json + dict": lambda: decode_dicts(payloads),
+        "json + Bar": lambda: decode_bars(payloads, json.loads),
+    }
+    if json_loads is not json.loads:
+        variants[f"{json_loads.__module__} + Bar"] = lambda: decode_bars(payloads, json_loads)
+
+    baseline = None
+    print(f"{n_symbols:>6} символов × {N_BARS} баров:")
+    for name, func in variants.items():
+        seconds, peak = measure(func)
+        baseline = baseline or seconds
+        print(f"    {name:<16} {seconds * 1000:8.1f} мс  x{baseline / seconds:4.1f}  пик памяти {peak:7.1f} МБ")
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_decode
+    for n_symbols in (500, 2_000):
+        run(n_symbols)
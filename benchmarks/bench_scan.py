@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import socket
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.mock_exchange import MockSettings, create_app
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+TELEGRAM_TEST_TOKEN = "123456:benchmark"
+
+
+class FakeBot:
+    """Вместо Telegram: считает отправленные сообщения."""
+
+    def __init__(self):
+        self.messages = 0
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.messages += 1
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve_mock(settings: MockSettings, port: int):
+    from aiohttp import web
+
+    web.run_app(create_app(settings), host="127.0.0.1", port=port, access_log=None, print=None)
+
+
+def _wait_for_port(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"mock server did not start on port {port}")
+
+
+def _configure_environment(port: int, workdir: str, limit_scale: float):
+    """Окружение задаётся до импорта модулей скринера: адреса бирж и БД читаются при импорте."""
+    os.environ["BINANCE_BASE_URL"] = os.environ["BYBIT_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["DB_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["TELEGRAM_BOT_TOKEN"] = TELEGRAM_TEST_TOKEN
+    os.environ["TELEGRAM_CHAT_ID"] = "0"
+
+    from data_fetcher import binance, bybit
+
+    for limits in (binance.BINANCE_RATE_LIMITS, bybit.BYBIT_RATE_LIMITS):
+        for name, (capacity, window) in limits.items():
+            limits[name] = (capacity * limit_scale, window)
+
+
+async def _run_ticks(ticks: int, prefilter: bool, workdir: str) -> dict:
+    import scheduler.job as job
+    from bot.telegram_bot import signal_dispatcher
+    from config.config import EXCHANGES
+    from data_fetcher.adapters import ADAPTERS
+    from data_fetcher.bar_store import BAR_STORE
+    from data_fetcher.http_client import HttpClient, init_http_clients, close_http_clients
+    from db.engine import init_db, async_session
+    from db.signal_counter import SIGNAL_COUNTER
+    from logic.rules import RULES
+    from monitoring.metrics import SYMBOLS_SCANNED, TICK_COVERAGE, SIGNALS
+
+    job.PREFILTER_ENABLED = prefilter
+    fake_bot = FakeBot()
+    signal_dispatcher.bot = fake_bot
+    signal_dispatcher.min_interval = 0
+    BAR_STORE.root = os.path.join(workdir, "bars")
+
+    await init_db()
+    async with async_session() as session:
+        await SIGNAL_COUNTER.seed(session)
+    await init_http_clients([
+        HttpClient(exchange, adapter.base_url, adapter.create_rate_limiter()) for exchange, adapter in ADAPTERS.items()
+    ])
+    signal_dispatcher.start()
+    BAR_STORE.start()
+
+    durations, scanned, coverage = [], [], []
+    try:
+        for _ in range(ticks):
+            start = time.perf_counter()
+            await job.run_signal_job()
+            durations.append(time.perf_counter() - start)
+            scanned.append(sum(SYMBOLS_SCANNED.get(exchange=exchange) for exchange in EXCHANGES))
+            coverage.append(min(TICK_COVERAGE.get(exchange=exchange) for exchange in EXCHANGES))
+    finally:
+        await BAR_STORE.stop()
+        await signal_dispatcher.stop()
+        await close_http_clients()
+
+    durations = np.array(durations)
+    return {
+        "tick_p50_seconds": round(float(np.percentile(durations, 50)), 3),
+        "tick_p99_seconds": round(float(np.percentile(durations, 99)), 3),
+        "tick_seconds": [round(float(duration), 3) for duration in durations],
+        "symbols_per_second": round(float(sum(scanned) / durations.sum()), 1),
+        "symbols_scanned": scanned,
+        "min_coverage": round(float(min(coverage)), 3),
+        "signals": int(sum(SIGNALS.get(exchange=exchange, rule=rule.name)
+                           for exchange in EXCHANGES for rule in RULES)),
+        "telegram_messages": fake_bot.messages,
+    }
+
+
+def _scenario_worker(settings: MockSettings, ticks: int, prefilter: bool, limit_scale: float, queue):
+    context = multiprocessing.get_context("spawn")
+    port = _free_port()
+    # Мок в отдельном процессе, чтобы не делить с ним цикл событий и процессор
+    server = context.Process(target=_serve_mock, args=(settings, port), daemon=True)
+    server.start()
+    try:
+        _wait_for_port(port)
+        with tempfile.TemporaryDirectory() as workdir:
+            _configure_environment(port, workdir, limit_scale)
+            result = asyncio.run(_run_ticks(ticks, prefilter, workdir))
+        # ru_maxrss в Linux — килобайты
+        result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        queue.put(result)
+    finally:
+        server.terminate()
+        server.join()
+
+
+def run_scenario(settings: MockSettings, ticks: int, prefilter: bool = False, limit_scale: float = 1.0) -> dict:
+    """Один сценарий в свежем процессе: синглтоны скринера и пиковая память не переходят между сценариями."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    worker = context.Process(target=_scenario_worker, args=(settings, ticks, prefilter, limit_scale, queue))
+    worker.start()
+    worker.join()
+    if worker.exitcode != 0:
+        raise RuntimeError(f"scenario failed with exit code {worker.exitcode}")
+    return {"settings": asdict(settings), "ticks": ticks, "prefilter": prefilter, "limit_scale": limit_scale,
+            **queue.get()}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_scan --symbols 500,2000,10000 --latency 0.02 --ticks 5
+    parser = argparse.ArgumentParser(description="Сквозной прогон run_signal_job против мок-бирж")
+    parser.add_argument("--symbols", default="500,2000", help="число символов на биржу, через запятую")
+    parser.add_argument("--latency", type=float, default=0.02, help="задержка ответа мока, секунды")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов HTTP 500")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="принудительный 429 на каждый N-й запрос")
+    parser.add_argument("--limit-scale", type=float, default=1.0,
+                        help="множитель лимитов бирж (и в моке, и в лимитере клиента)")
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument("--prefilter", action="store_true", help="включить отбор по срезам тикеров")
+    parser.add_argument("--output", help="файл результатов (по умолчанию benchmarks/results/bench-<время>.json)")
+    args = parser.parse_args()
+
+    scenarios = []
+    for symbols in (int(value) for value in args.symbols.split(",")):
+        settings = MockSettings(symbols=symbols, latency=args.latency, error_rate=args.error_rate,
+                                weight_limit=int(2400 * args.limit_scale), rate_limit_every=args.rate_limit_every)
+        result = run_scenario(settings, args.ticks, args.prefilter, args.limit_scale)
+        scenarios.append(result)
+        print(f"{symbols:>6} символов: {result['symbols_per_second']:>8.1f} символов/с, "
+              f"тик p50 {result['tick_p50_seconds']:.2f} с, p99 {result['tick_p99_seconds']:.2f} с, "
+              f"покрытие {result['min_coverage']:.0%}, RSS {result['peak_rss_mb']} МБ")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "scenarios": scenarios,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Результаты: {output}")
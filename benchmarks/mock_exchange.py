@@ -0,0 +1,252 @@
+import asyncio
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass
+
+from aiohttp import web, WSMsgType
+
+BAR_MS = 5 * 60 * 1000
+
+
+@dataclass
+class MockSettings:
+    symbols: int = 500  # число торгуемых символов
+    latency: float = 0.0  # задержка ответа в секундах
+    error_rate: float = 0.0  # доля ответов с HTTP 500
+    weight_limit: int = 2400  # лимит веса в минуту, сверх него — HTTP 429
+    rate_limit_every: int = 0  # принудительный 429 на каждый N-й запрос (0 — выключено)
+    stream_interval: float = 1.0  # период рассылки обновлений в WebSocket-потоках, секунды
+
+
+def _symbol_bars(symbol: str, limit: int, end_ms: int) -> list[tuple[int, float, float, float]]:
+    """Детерминированный ряд (timestamp, oi, price, volume), заканчивающийся баром end_ms."""
+    seed = zlib.crc32(symbol.encode())
+    bars = []
+    for i in range(limit):
+        ts = end_ms - (limit - 1 - i) * BAR_MS
+        rnd = random.Random(seed ^ ts)
+        price = 1 + seed % 1000 * (1 + 0.01 * rnd.uniform(-1, 1))
+        oi = 1_000_000 * (1 + seed % 7) * (1 + 0.03 * rnd.uniform(-1, 1))
+        volume = 1000 * rnd.uniform(0.5, 6)
+        bars.append((ts, oi, price, volume))
+    return bars
+
+
+def _current_bar() -> int:
+    return int(time.time() * 1000) // BAR_MS * BAR_MS
+
+
+class MockExchange:
+    """Общая часть моков: задержка, учёт лимита за минуту, инъекция 429 и 500."""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.requests = 0
+        self._window_start = time.monotonic()
+        self._used_weight = 0
+
+    def symbols(self) -> list[str]:
+        return [f"SYM{i}USDT" for i in range(self.settings.symbols)]
+
+    async def _spend(self, weight: int) -> web.Response | None:
+        await asyncio.sleep(self.settings.latency)
+
+        now = time.monotonic()
+        if now - self._window_start >= 60:
+            self._window_start, self._used_weight = now, 0
+        self.requests += 1
+        self._used_weight += weight
+
+        every = self.settings.rate_limit_every
+        over_limit = self._used_weight > self.settings.weight_limit
+        if over_limit or (every and self.requests % every == 0):
+            retry_after = int(60 - (now - self._window_start)) + 1 if over_limit else 1
+            return web.json_response({"code": -1003, "msg": "Too many requests"}, status=429,
+                                     headers={"Retry-After": str(retry_after), **self._headers()})
+        if random.random() < self.settings.error_rate:
+            return web.json_response({"code": -1000, "msg": "Internal error"}, status=500)
+        return None
+
+    def _headers(self) -> dict[str, str]:
+        return {}
+
+    async def _stream_loop(self, ws: web.WebSocketResponse, subscribed: set[str], make_messages):
+        while not ws.closed:
+            await asyncio.sleep(self.settings.stream_interval)
+            current_bar = _current_bar()
+            for symbol in list(subscribed):
+                ts, oi, price, volume = _symbol_bars(symbol, 1, current_bar)[0]
+                for message in make_messages(symbol, ts, oi, price, volume):
+                    await ws.send_json(message)
+
+
+class MockBinance(MockExchange):
+    def _headers(self) -> dict[str, str]:
+        return {"X-MBX-USED-WEIGHT-1M": str(self._used_weight)}
+
+    async def exchange_info(self, request: web.Request) -> web.Response:
+        if (error := await self._spend(1)) is not None:
+            return error
+        symbols = [
+            {"symbol": symbol, "contractType": "PERPETUAL", "status": "TRADING", "quoteAsset": "USDT"}
+            for symbol in self.symbols()
+        ]
+        return web.json_response({"symbols": symbols}, headers=self._headers())
+
+    async def klines(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", 500))
+        if (error := await self._spend(1 if limit < 100 else 2)) is not None:
+            return error
+        rows = [
+            [ts, str(price), str(price), str(price), str(price), str(volume), ts + BAR_MS - 1]
+            for ts, _, price, volume in _symbol_bars(request.query["symbol"], limit, _current_bar())
+        ]
+        return web.json_response(rows, headers=self._headers())
+
+    async def open_interest_hist(self, request: web.Request) -> web.Response:
+        if (error := await self._spend(0)) is not None:
+            return error
+        limit = int(request.query.get("limit", 30))
+        symbol = request.query["symbol"]
+        # Binance отдаёт OI только по закрытым периодам
+        rows = [
+            {"symbol": symbol, "sumOpenInterest": str(oi / price), "sumOpenInterestValue": str(oi), "timestamp": ts}
+            for ts, oi, price, _ in _symbol_bars(symbol, limit, _current_bar() - BAR_MS)
+        ]
+        return web.json_response(rows, headers=self._headers())
+
+    async def ticker_24hr(self, request: web.Request) -> web.Response:
+        if (error := await self._spend(40)) is not None:
+            return error
+        current_bar = _current_bar()
+        rows = []
+        for symbol in self.symbols():
+            ts, oi, price, volume = _symbol_bars(symbol, 1, current_bar)[0]
+            rows.append({"symbol": symbol, "lastPrice": str(price), "volume": str(volume * 288),
+                         "quoteVolume": str(volume * 288 * price), "closeTime": ts})
+        return web.json_response(rows, headers=self._headers())
+
+    async def stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscribed: set[str] = set()
+
+        def make_messages(symbol, ts, oi, price, volume):
+            kline = {"t": ts, "c": str(price), "v": str(volume), "x": False}
+            yield {"stream": f"{symbol.lower()}@kline_5m", "data": {"e": "kline", "s": symbol, "k": kline}}
+
+        sender = asyncio.create_task(self._stream_loop(ws, subscribed, make_messages))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                request_data = json.loads(msg.data)
+                if request_data.get("method") == "SUBSCRIBE":
+                    subscribed.update(param.split("@")[0].upper() for param in request_data["params"])
+                    await ws.send_json({"result": None, "id": request_data.get("id")})
+        finally:
+            sender.cancel()
+        return ws
+
+
+class MockBybit(MockExchange):
+    def _headers(self) -> dict[str, str]:
+        limit = self.settings.weight_limit
+        return {"X-Bapi-Limit": str(limit), "X-Bapi-Limit-Status": str(max(limit - self._used_weight, 0))}
+
+    def _ok(self, result: dict) -> web.Response:
+        return web.json_response({"retCode": 0, "retMsg": "OK", "result": result}, headers=self._headers())
+
+    async def instruments_info(self, request: web.Request) -> web.Response:
+        if (error := await self._spend(1)) is not None:
+            return error
+        return self._ok({"list": [
+            {"symbol": symbol, "status": "Trading", "contractType": "LinearPerpetual", "quoteCoin": "USDT",
+             "launchTime": "1585526400000", "priceFilter": {"tickSize": "0.01"}}
+            for symbol in self.symbols()
+        ]})
+
+    async def tickers(self, request: web.Request) -> web.Response:
+        if (error := await self._spend(1)) is not None:
+            return error
+        current_bar = _current_bar()
+        rows = []
+        for symbol in self.symbols():
+            ts, oi, price, volume = _symbol_bars(symbol, 1, current_bar)[0]
+            rows.append({"symbol": symbol, "lastPrice": str(price), "openInterestValue": str(oi),
+                         "volume24h": str(volume * 288), "turnover24h": str(volume * 288 * price)})
+        return self._ok({"category": "linear", "list": rows})
+
+    async def kline(self, request: web.Request) -> web.Response:
+        if (error := await self._spend(1)) is not None:
+            return error
+        limit = int(request.query.get("limit", 200))
+        bars = _symbol_bars(request.query["symbol"], limit, _current_bar())
+        # Bybit отдаёт бары по убыванию времени
+        return self._ok({"list": [
+            [str(ts), str(price), str(price), str(price), str(price), str(volume), str(volume * price)]
+            for ts, _, price, volume in reversed(bars)
+        ]})
+
+    async def open_interest(self, request: web.Request) -> web.Response:
+        if (error := await self._spend(1)) is not None:
+            return error
+        limit = int(request.query.get("limit", 50))
+        bars = _symbol_bars(request.query["symbol"], limit, _current_bar())
+        return self._ok({"list": [
+            {"openInterest": str(oi / price), "timestamp": str(ts)}
+            for ts, oi, price, _ in reversed(bars)
+        ]})
+
+    async def stream(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscribed: set[str] = set()
+
+        def make_messages(symbol, ts, oi, price, volume):
+            kline = {"start": ts, "close": str(price), "volume": str(volume), "confirm": False}
+            yield {"topic": f"kline.5.{symbol}", "type": "snapshot", "data": [kline]}
+            yield {"topic": f"tickers.{symbol}", "type": "delta", "ts": int(time.time() * 1000),
+                   "data": {"symbol": symbol, "openInterestValue": str(oi)}}
+
+        sender = asyncio.create_task(self._stream_loop(ws, subscribed, make_messages))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                request_data = json.loads(msg.data)
+                if request_data.get("op") == "subscribe":
+                    subscribed.update(topic.rsplit(".", 1)[1] for topic in request_data["args"])
+                    await ws.send_json({"success": True, "op": "subscribe"})
+                elif request_data.get("op") == "ping":
+                    await ws.send_json({"success": True, "op": "pong"})
+        finally:
+            sender.cancel()
+        return ws
+
+
+def create_app(settings: MockSettings) -> web.Application:
+    binance = MockBinance(settings)
+    bybit = MockBybit(settings)
+
+    app = web.Application()
+    app["binance"] = binance
+    app["bybit"] = bybit
+    app.router.add_get("/fapi/v1/exchangeInfo", binance.exchange_info)
+    app.router.add_get("/fapi/v1/klines", binance.klines)
+    app.router.add_get("/futures/data/openInterestHist", binance.open_interest_hist)
+    app.router.add_get("/fapi/v1/ticker/24hr", binance.ticker_24hr)
+    app.router.add_get("/stream", binance.stream)
+    app.router.add_get("/v5/market/instruments-info", bybit.instruments_info)
+    app.router.add_get("/v5/market/tickers", bybit.tickers)
+    app.router.add_get("/v5/market/kline", bybit.kline)
+    app.router.add_get("/v5/market/open-interest", bybit.open_interest)
+    app.router.add_get("/v5/public/linear", bybit.stream)
+    return app
+
+
+if __name__ == "__main__":
+    # Один сервер отвечает за обе биржи: BINANCE_BASE_URL=BYBIT_BASE_URL=http://127.0.0.1:8081
+    web.run_app(create_app(MockSettings()), host="127.0.0.1", port=8081)
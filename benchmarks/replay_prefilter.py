@@ -0,0 +1,81 @@
+import numpy as np
+
+from logic.analyzer import analyze_signal
+from logic.rules import RULES, BAR_MINUTES
+from scheduler.prefilter import SnapshotPrefilter
+
+MINUTES = 6 * 60  # длина прогона, один тик — одна минута
+
+
+def generate_minutes(n_symbols: int, n_minutes: int, seed: int = 7) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Поминутные OI, цена и объём с редкими всплесками OI и цены, на которых срабатывают правила."""
+    rng = np.random.default_rng(seed)
+    oi_steps = rng.normal(0, 0.002, (n_symbols, n_minutes))
+    price_steps = rng.normal(0, 0.001, (n_symbols, n_minutes))
+    volume = rng.lognormal(5, 1, (n_symbols, n_minutes))
+
+    for _ in range(n_symbols * n_minutes // 2000):
+        row, start = rng.integers(n_symbols), rng.integers(n_minutes - 30)
+        length = rng.integers(5, 25)
+        oi_steps[row, start:start + length] += rng.uniform(0.05, 0.3) / length
+        price_steps[row, start:start + length] += rng.uniform(-0.01, 0.02) / length
+        volume[row, start:start + length] *= rng.uniform(1, 20)
+
+    oi = 1e6 * np.cumprod(1 + oi_steps, axis=1)
+    price = 10 * np.cumprod(1 + price_steps, axis=1)
+    return oi, price, volume
+
+
+def bars_at(oi: np.ndarray, price: np.ndarray, volume: np.ndarray, row: int, minute: int, n_bars: int) -> list[dict]:
+    """Последние n_bars 5-минутных баров на минуту minute, включая незакрытый текущий."""
+    bars = []
+    current = minute // BAR_MINUTES
+    for bar in range(max(0, current - n_bars + 1), current + 1):
+        first = bar * BAR_MINUTES
+        last = min(first + BAR_MINUTES - 1, minute)
+        bars.append({
+            "symbol": f"SYM{row}",
+            "timestamp": first * 60_000,
+            "oi": float(oi[row, last]),
+            "price": float(price[row, last]),
+            "volume": float(volume[row, first:last + 1].sum()),
+        })
+    return bars
+
+
+def replay(n_symbols: int, with_oi: bool):
+    oi, price, volume = generate_minutes(n_symbols, MINUTES)
+    symbols = [f"SYM{row}" for row in range(n_symbols)]
+    n_bars = max(rule.bars_needed for rule in RULES)
+    prefilter = SnapshotPrefilter()
+
+    hits = found = scanned = 0
+    for minute in range(MINUTES):
+        prefilter.add_snapshot("replay", {
+            symbols[row]: {"price": float(price[row, minute]), "oi": float(oi[row, minute]) if with_oi else None}
+            for row in range(n_symbols)
+        }, timestamp=minute * 60)
+        candidates = set(prefilter.candidates("replay", symbols))
+        scanned += len(candidates)
+
+        for row in range(n_symbols):
+            data = bars_at(oi, price, volume, row, minute, n_bars)
+            fired = any(
+                analyze_signal(data, window=rule.window, interval=BAR_MINUTES, min_growth_oi=rule.min_growth_oi,
+                               min_growth_price=rule.min_growth_price, min_volume_ratio=rule.min_volume_ratio)
+                for rule in RULES
+            )
+            if fired:
+                hits += 1
+                found += symbols[row] in candidates
+
+    recall = found / hits if hits else 1.0
+    label = "OI + цена" if with_oi else "только цена"
+    print(f"{n_symbols} символов, {label}: сигналов {hits}, найдено {found}, recall {recall:.3f}, "
+          f"запрошено историй {scanned / MINUTES:.1f} из {n_symbols} за тик")
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.replay_prefilter
+    replay(300, with_oi=True)  # Bybit: OI есть в срезе tickers
+    replay(300, with_oi=False)  # Binance: в срезе только цена
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramServerError
+
+from config.config import TELEGRAM_QUEUE_SIZE, TELEGRAM_MIN_INTERVAL_SECONDS, TELEGRAM_MAX_RETRIES, \
+    TELEGRAM_DRAIN_TIMEOUT_SECONDS, TELEGRAM_RETRY_BACKOFF_SECONDS
+from monitoring.metrics import SEND_SECONDS, TELEGRAM_DROPPED, TELEGRAM_QUEUE_DEPTH, TELEGRAM_DELIVERY_SECONDS
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+MESSAGE_SEPARATOR = "\n➖➖➖\n"
+
+logger = logging.getLogger("telegram")
+
+
+class TelegramDispatcher:
+    """
+    Фоновая доставка сообщений в Telegram через ограниченную очередь.
+
+    Один обработчик отправляет сообщения в порядке постановки, выдерживает паузу между отправками
+    в чат и ждёт retry_after при 429; сетевые ошибки и 5xx повторяет с нарастающей паузой. Если за время паузы накопилось несколько сообщений,
+    они склеиваются в одно (в пределах лимита длины Telegram).
+    """
+
+    def __init__(self, bot: Bot, chat_id: str | None, maxsize: int = TELEGRAM_QUEUE_SIZE,
+                 min_interval: float = TELEGRAM_MIN_INTERVAL_SECONDS):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self._queue: asyncio.Queue[tuple[float, str]] = asyncio.Queue(maxsize)
+        self._worker: asyncio.Task | None = None
+        self._carry: tuple[float, str] | None = None
+        self._last_sent = 0.0
+        self._stats = {"sent_messages": 0, "sent_signals": 0, "dropped": 0, "failed": 0, "retry_after": 0}
+        self._latency_last = 0.0
+        self._latency_max = 0.0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def enqueue(self, message: str) -> bool:
+        try:
+            self._queue.put_nowait((time.monotonic(), message))
+            return True
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            TELEGRAM_DROPPED.inc(reason="queue_full")
+            logger.error("Очередь Telegram переполнена, сообщение отброшено")
+            return False
+        finally:
+            TELEGRAM_QUEUE_DEPTH.set(self.queue_depth())
+
+    def queue_depth(self) -> int:
+        # Перенесённое в следующую пачку сообщение тоже ещё ждёт отправки
+        return self._queue.qsize() + (self._carry is not None)
+
+    async def stop(self, timeout: float = TELEGRAM_DRAIN_TIMEOUT_SECONDS):
+        """Дожидается отправки всего, что уже в очереди, и останавливает обработчик."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Не отправлено сообщений при остановке: {self._queue.qsize()}")
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+    def _take_batch(self, first: tuple[float, str]) -> list[tuple[float, str]]:
+        batch = [first]
+        length = len(first[1])
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            length += len(MESSAGE_SEPARATOR) + len(item[1])
+            if length > TELEGRAM_MESSAGE_LIMIT:
+                # Не влезло — уйдёт первым в следующей пачке
+                self._carry = item
+                break
+            batch.append(item)
+        return batch
+
+    async def _run(self):
+        while True:
+            if self._carry is not None:
+                first, self._carry = self._carry, None
+            else:
+                first = await self._queue.get()
+
+            # Выдерживаем интервал между сообщениями в чат; за это время может накопиться пачка
+            delay = self._last_sent + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            batch = self._take_batch(first)
+            try:
+                await self._send(MESSAGE_SEPARATOR.join(message for _, message in batch))
+                self._stats["sent_messages"] += 1
+                self._stats["sent_signals"] += len(batch)
+                now = time.monotonic()
+                for enqueued_at, _ in batch:
+                    TELEGRAM_DELIVERY_SECONDS.observe(now - enqueued_at)
+                self._latency_last = now - batch[0][0]
+                self._latency_max = max(self._latency_max, self._latency_last)
+            except Exception as e:
+                self._stats["failed"] += len(batch)
+                TELEGRAM_DROPPED.inc(len(batch), reason="send_failed")
+                logger.error(f"Telegram send error, сигналов потеряно {len(batch)}: {e}")
+            finally:
+                self._last_sent = time.monotonic()
+                for _ in batch:
+                    self._queue.task_done()
+                TELEGRAM_QUEUE_DEPTH.set(self.queue_depth())
+
+    async def _send(self, text: str):
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            try:
+                with SEND_SECONDS.time():
+                    await self.bot.send_message(self.chat_id, text, parse_mode="HTML")
+                return
+            except TelegramRetryAfter as e:
+                self._stats["retry_after"] += 1
+                logger.warning(f"Telegram flood control, ждём {e.retry_after} с")
+                if attempt == TELEGRAM_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(e.retry_after)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                # Временные сбои сети и серверов Telegram; ошибки запроса (400, 403) повторять бесполезно
+                if attempt == TELEGRAM_MAX_RETRIES:
+                    raise
+                pause = TELEGRAM_RETRY_BACKOFF_SECONDS * 2 ** attempt
+                logger.warning(f"Telegram недоступен ({e}), повтор через {pause:.0f} с")
+                await asyncio.sleep(pause)
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "latency_last": round(self._latency_last, 2),
+            "latency_max": round(self._latency_max, 2),
+            **self._stats,
+        }
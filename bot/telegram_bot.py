@@ -4,6 +4,8 @@ import os
 from aiogram import Bot
 from dotenv import load_dotenv, find_dotenv
 
+from bot.dispatcher import TelegramDispatcher
+
 load_dotenv(find_dotenv())
 
 
@@ -11,6 +13,7 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 bot = Bot(token=TELEGRAM_TOKEN)
+signal_dispatcher = TelegramDispatcher(bot, TELEGRAM_CHAT_ID)
 
 logger = logging.getLogger("telegram")
 
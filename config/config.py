@@ -4,7 +4,110 @@ VOLUME_RATIO_THRESHOLD = 5.0  # минимальное отношение объ
 TIMEFRAME_MINUTES = 20     # интервал анализа в минутах
 MAX_SIGNALS_PER_DAY = 3     # максимум уведомлений в день по одной монете
 RUN_EVERY_SECONDS = 60     # частота запуска
-EXCHANGES = ["Binance", "ByBit"]  # НЕ МЕНЯТЬ
+TICK_DEADLINE_SECONDS = 50  # дедлайн обхода бирж в тике, недоделанные символы откладываются (None — ждать всех)
+HOT_SYMBOL_TTL_SECONDS = 3600  # сколько символ с недавним сигналом обходится в тике первым
+FAST_LANE_ENABLED = True  # пересканировать символы у порогов чаще общего тика (только в режиме опроса)
+FAST_LANE_INTERVAL_SECONDS = 10  # период пересканирования быстрой полосы
+FAST_LANE_OI_MARGIN_PERCENT = 0.5  # символ попадает в полосу, если рост OI не дальше этого от порога правила
+FAST_LANE_PRICE_MARGIN_PERCENT = 0.5  # и рост цены не дальше этого от порога
+FAST_LANE_COOLDOWN_SECONDS = 300  # символ выходит из полосы, если столько не приближался к порогам
+FAST_LANE_MAX_SYMBOLS = 50  # размер полосы на биржу, при переполнении остаются ближайшие к порогу
+FAST_LANE_MIN_HEADROOM = 0.5  # доля свободного бюджета лимитера, ниже которой пересканирование пропускается
+PREFILTER_ENABLED = True  # запрашивать историю только у символов, которые по срезу тикеров могут дать сигнал
+PREFILTER_OI_MARGIN_PERCENT = 0.5  # допуск к порогу роста OI при отборе по срезам
+PREFILTER_PRICE_MARGIN_PERCENT = 0.5  # допуск к порогу роста цены при отборе по срезам
+EXCHANGES = ["Binance", "ByBit"]  # обходимые биржи, для каждой нужен адаптер в EXCHANGE_ADAPTERS
+
+# Адаптеры бирж: имя -> "модуль:класс". Новая биржа подключается отдельным модулем в data_fetcher и строкой здесь
+EXCHANGE_ADAPTERS = {
+    "Binance": "data_fetcher.binance:BinanceAdapter",
+    "ByBit": "data_fetcher.bybit:BybitAdapter",
+}
+EXCHANGE_WORKER_PROCESSES = False  # True — каждая биржа обходится в своём процессе со своим циклом событий
+SHARD_COUNT = 1  # >1 — символы всех бирж делятся между процессами-шардами (на всех хостах с общей БД)
+SHARD_INDICES = None  # номера шардов, запускаемых на этом хосте, например [0, 1]; None — все SHARD_COUNT
+SIGNAL_CLAIM_TTL_HOURS = 24  # сколько хранить в БД отметки сигналов для дедупликации между шардами
+SIGNAL_PARTITION_INTERVAL = "month"  # секции signal_data в PostgreSQL: "day" или "month"
+SIGNAL_PARTITIONS_AHEAD = 2  # сколько будущих секций создавать заранее
+SIGNAL_RETENTION_DAYS = 365  # сколько хранить сырые сигналы (None — бессрочно); дневные сводки не удаляются
+
+# Наборы правил: каждый проверяется на одних и тех же данных, история запрашивается один раз под самое длинное окно.
+# Ключи: name, window (минуты), oi, price (проценты), volume (отношение объемов), max_signals (в день по монете)
+# Необязательные ключи режима аномалий (статистика символа по закрытым барам, logic/rolling_stats.py):
+# oi_z, volume_z — минимальные z-оценки изменения OI и логарифма объёма последнего закрытого бара,
+# rank — символ должен входить в эту долю биржи с наибольшей z-оценкой OI (0.05 — топ 5%; не работает при SHARD_COUNT > 1),
+# horizon — период полураспада EWMA в барах из STATS_HALF_LIVES_BARS или 0 — вся история символа.
+# Ключи oi, price, volume в таком наборе можно не задавать — тогда проверяется только статистика.
+RULE_SETS = [
+    {
+        "name": f"{TIMEFRAME_MINUTES}m",
+        "window": TIMEFRAME_MINUTES,
+        "oi": OI_THRESHOLD_PERCENT,
+        "price": PRICE_THRESHOLD_PERCENT,
+        "volume": VOLUME_RATIO_THRESHOLD,
+        "max_signals": MAX_SIGNALS_PER_DAY,
+    },
+]
 
 DEPOSIT = 1000.00  # баланс на бирже в USDT
-RISK = 1  # потери при срабатывании стоп-лосса в процентах
\ No newline at end of file
+RISK = 1  # потери при срабатывании стоп-лосса в процентах
+
+# Параметры HTTP-пула (один долгоживущий клиент на биржу)
+HTTP_LIMIT_PER_HOST = 50  # максимум одновременных соединений к одному хосту
+HTTP_KEEPALIVE_SECONDS = 60  # сколько держать простаивающее соединение открытым
+HTTP_DNS_CACHE_SECONDS = 300  # время жизни DNS-кэша
+HTTP_TIMEOUT_SECONDS = 10  # общий таймаут запроса
+HTTP_CONNECT_TIMEOUT_SECONDS = 5  # таймаут установки соединения
+HTTP_MAX_CONCURRENT_REQUESTS = 10  # стартовое число одновременных HTTP-запросов к одной бирже
+HTTP_MIN_CONCURRENT_REQUESTS = 2  # нижняя граница адаптивной параллельности
+HTTP_CONCURRENCY_CEILING = 50  # верхняя граница адаптивной параллельности
+HTTP_MAX_RETRIES = 3  # повторов запроса после HTTP 429/418
+RATE_LIMIT_BACKOFF_SECONDS = 1.0  # базовая пауза после 429, если биржа не прислала Retry-After
+RATE_LIMIT_LOW_WATERMARK = 0.2  # доля оставшегося бюджета, ниже которой параллельность снижается
+RATE_LIMIT_HIGH_WATERMARK = 0.5  # доля оставшегося бюджета, выше которой параллельность растёт
+
+MERGE_GAP_POLICY = "ffill"  # бар свечей без точки OI: "ffill" — OI с предыдущего бара, "drop" — бар отбрасывается
+MERGE_MAX_FILL_BARS = 1  # сколько баров подряд можно заполнить прошлым OI, дальше бары отбрасываются
+
+STATS_ENABLED = True  # вести скользящую статистику символов по закрытым барам (для правил с oi_z/volume_z/rank)
+STATS_HALF_LIVES_BARS = [12, 48, 288]  # горизонты EWMA в барах: час, 4 часа, сутки
+STATS_MIN_BARS = 48  # сколько баров истории нужно символу, прежде чем его z-оценки используются
+STATS_MIN_CROSS_SECTION = 20  # минимум символов с z-оценкой по тому же бару для кросс-секционного ранга
+STATS_CHECKPOINT_DIR = "stats"  # снимки статистики (.npz по бирже), из них состояние поднимается при старте
+STATS_CHECKPOINT_SECONDS = 300  # как часто сохранять снимок
+
+BAR_CACHE_MAX_BARS = 288  # сколько 5-минутных баров держать в памяти на символ (сутки)
+BAR_STORE_DIR = "bars"  # локальное хранилище закрытых баров (по файлу на биржу и сутки)
+BAR_STORE_ENABLED = True  # писать бары в хранилище и прогревать из него кеш при старте
+BAR_STORE_FLUSH_SECONDS = 30  # как часто сбрасывать накопленные бары на диск
+
+INGESTION_MODE = "poll"  # "poll" — опрос REST раз в RUN_EVERY_SECONDS, "stream" — WebSocket-потоки бирж
+STREAM_MAX_TOPICS_PER_CONNECTION = 200  # потоков на одно WebSocket-соединение
+STREAM_RECONNECT_SECONDS = 5  # пауза перед переподключением оборванного потока
+SIGNAL_FLUSH_SECONDS = 5  # как часто записывать накопленные сигналы в БД в режиме stream
+
+# Доставка в Telegram
+TELEGRAM_QUEUE_SIZE = 1000  # максимум сообщений в очереди на отправку
+TELEGRAM_MIN_INTERVAL_SECONDS = 3.0  # пауза между сообщениями в чат (в группах Telegram допускает ~20 в минуту)
+TELEGRAM_MAX_RETRIES = 3  # повторов отправки после 429 Too Many Requests, сетевой ошибки или 5xx
+TELEGRAM_RETRY_BACKOFF_SECONDS = 2.0  # первая пауза перед повтором после сетевой ошибки или 5xx, дальше удваивается
+TELEGRAM_DRAIN_TIMEOUT_SECONDS = 30  # сколько ждать отправки очереди при остановке
+
+# Реестр символов
+SYMBOLS_TTL_SECONDS = 3600  # как часто обновлять список контрактов бирж
+SYMBOL_QUOTE_ASSETS = None  # например ["USDT"]; None — сканировать все котируемые активы
+MIN_TURNOVER_24H = 0  # минимальный оборот за 24ч в котируемой валюте; 0 — без фильтра
+
+# Метрики и профилирование
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9100  # None — не поднимать /metrics
+PROFILE_DIR = "profiles"  # куда сохранять профили тиков
+
+# API чтения истории сигналов (python -m api.server), отдельный процесс со своим пулом соединений
+API_HOST = "127.0.0.1"
+API_PORT = 9200
+API_PAGE_SIZE = 100  # сигналов на страницу по умолчанию
+API_MAX_PAGE_SIZE = 1000
+API_EXPORT_CHUNK = 1000  # строк на один запрос к БД при выгрузке CSV/NDJSON
+API_MAX_DAYS = 90  # наибольший период агрегатов
+API_CACHE_TTL_SECONDS = 60  # сколько держать в памяти результаты агрегатов
@@ -0,0 +1,60 @@
+import importlib
+from typing import Protocol
+
+from config.config import EXCHANGE_ADAPTERS
+from data_fetcher.bar import Bar
+from data_fetcher.http_client import HttpClient
+from data_fetcher.rate_limiter import RateLimiter
+from data_fetcher.streams import ExchangeStream
+
+
+class ExchangeAdapter(Protocol):
+    """
+    Всё, что планировщику нужно знать о бирже.
+
+    Бары (Bar) возвращаются по возрастанию времени, OI — в стоимости в котируемой валюте (переводит oi_value);
+    fetch_oi_values отдаёт ту же стоимость OI рядом (timestamp, oi). Биржа без WebSocket-потоков
+    задаёт stream = None и работает только в режиме опроса.
+    """
+
+    name: str
+    base_url: str
+    stream: type[ExchangeStream] | None
+    stream_has_oi: bool  # приходит ли OI в потоке или его нужно дозапрашивать по закрытию бара
+    snapshot_has_oi: bool  # есть ли OI в срезе fetch_snapshot
+
+    def create_rate_limiter(self, share: float = 1.0) -> RateLimiter:
+        """Лимитер на долю share лимитов биржи (процессы-шарды с одного IP делят бюджет)."""
+        ...
+
+    async def fetch_instruments(self, client: HttpClient, with_turnover: bool = False) -> list[dict] | None: ...
+
+    async def fetch_bars(self, client: HttpClient, symbol: str, limit: int) -> list[Bar] | None: ...
+
+    async def fetch_oi_values(self, client: HttpClient, symbol: str, limit: int) -> list[tuple[int, float]] | None: ...
+
+    async def fetch_snapshot(self, client: HttpClient) -> dict[str, dict] | None:
+        """Срез {symbol: {"price", "oi"}} по всем контрактам одним запросом; oi = None, если биржа его не отдаёт."""
+        ...
+
+    @staticmethod
+    def oi_value(oi: float, price: float) -> float: ...
+
+
+def load_adapters(config: dict[str, str] = EXCHANGE_ADAPTERS) -> dict[str, ExchangeAdapter]:
+    """Создаёт адаптеры по путям вида "пакет.модуль:Класс"."""
+    adapters = {}
+    for exchange, path in config.items():
+        module_name, class_name = path.split(":")
+        adapter = getattr(importlib.import_module(module_name), class_name)()
+        if adapter.name != exchange:
+            raise ValueError(f"Adapter {path} is registered as {exchange} but named {adapter.name}")
+        adapters[exchange] = adapter
+    return adapters
+
+
+ADAPTERS = load_adapters()
+
+
+def get_adapter(exchange: str) -> ExchangeAdapter:
+    return ADAPTERS[exchange]
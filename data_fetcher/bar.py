@@ -0,0 +1,45 @@
+class Bar:
+    """
+    5-минутный бар: время открытия (мс), стоимость OI в котируемой валюте, цена закрытия и объём.
+
+    Занимает заметно меньше памяти, чем dict на бар. Поля читаются и как атрибуты, и как ключи
+    (bar["oi"], {**bar}), поэтому код, написанный под dict-бары, работает без изменений.
+    """
+
+    FIELDS = ("symbol", "timestamp", "oi", "price", "volume")
+    # oi_filled: OI подставлен с предыдущего бара при склейке (merge_bars), а не получен с биржи
+    __slots__ = (*FIELDS, "oi_filled")
+
+    def __init__(self, symbol: str, timestamp: int, oi: float, price: float, volume: float, oi_filled: bool = False):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.oi = oi
+        self.price = price
+        self.volume = volume
+        self.oi_filled = oi_filled
+
+    def __getitem__(self, key: str):
+        if key not in Bar.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in Bar.FIELDS else default
+
+    def keys(self) -> tuple[str, ...]:
+        return Bar.FIELDS
+
+    def replace(self, **fields) -> "Bar":
+        # Новое значение OI — уже настоящее, если явно не сказано обратное
+        oi_filled = fields.pop("oi_filled", False if "oi" in fields else self.oi_filled)
+        bar = Bar(self.symbol, self.timestamp, self.oi, self.price, self.volume, oi_filled)
+        for key, value in fields.items():
+            setattr(bar, key, value)
+        return bar
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Bar) and all(getattr(self, key) == getattr(other, key) for key in Bar.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"Bar({self.symbol!r}, {self.timestamp}, oi={self.oi}, "
+                f"price={self.price}, volume={self.volume})")
@@ -0,0 +1,105 @@
+import time
+from collections import deque
+
+from config.config import BAR_CACHE_MAX_BARS
+from data_fetcher.bar import Bar
+
+
+class BarCache:
+    """
+    Скользящее окно последних баров по каждой паре (биржа, символ).
+
+    После первичного прогрева с биржи запрашиваются только бары новее последнего закешированного
+    (плюс последний — он мог ещё формироваться). Разрыв или устаревание ряда приводят к полному перезаполнению.
+    """
+
+    def __init__(self, interval_minutes: int = 5, max_bars: int = BAR_CACHE_MAX_BARS):
+        self.interval_ms = interval_minutes * 60 * 1000
+        self.max_bars = max_bars
+        self._series: dict[tuple[str, str], deque[Bar]] = {}
+
+    def fetch_limit(self, exchange: str, symbol: str, bars_needed: int) -> int:
+        """Сколько баров нужно запросить, чтобы в кеше оказалось не меньше bars_needed актуальных баров."""
+        series = self._series.get((exchange, symbol))
+        if not series or len(series) < bars_needed:
+            return bars_needed
+
+        current_bar = int(time.time() * 1000) // self.interval_ms * self.interval_ms
+        missing = (current_bar - series[-1]["timestamp"]) // self.interval_ms
+        # Перезапрашиваем и последний бар из кеша — так проверяется непрерывность ряда
+        limit = max(missing + 1, 2)
+        return bars_needed if limit >= bars_needed else limit
+
+    def update(self, exchange: str, symbol: str, bars: list[Bar]) -> bool:
+        """
+        Вливает свежие бары в кеш. Возвращает False, если между кешем и новыми барами разрыв:
+        тогда окно нужно перезаполнить через reset(). Пустой список кеш не меняет.
+        """
+        key = (exchange, symbol)
+        series = self._series.get(key)
+        if not bars:
+            return True
+        if not series:
+            self.reset(exchange, symbol, bars)
+            return True
+
+        if bars[0]["timestamp"] > series[-1]["timestamp"] + self.interval_ms:
+            del self._series[key]
+            return False
+
+        for bar in bars:
+            last_ts = series[-1]["timestamp"]
+            if bar["timestamp"] > last_ts:
+                series.append(bar)
+            elif bar["timestamp"] == last_ts:
+                series[-1] = bar  # бар ещё формировался — обновляем
+            else:
+                # Бар внутри окна: заменяем, если он есть в кеше
+                for i in range(len(series) - 2, -1, -1):
+                    if series[i]["timestamp"] == bar["timestamp"]:
+                        series[i] = bar
+                        break
+        return True
+
+    def upsert(self, exchange: str, symbol: str, timestamp: int, **fields) -> bool:
+        """
+        Обновляет поля одного бара из потока (например, price/volume из kline или oi из tickers).
+
+        Новый бар, следующий сразу за последним, наследует от предыдущего OI и цену, а объём начинает с нуля;
+        унаследованный OI помечается oi_filled до прихода настоящего значения.
+        Возвращает False, если бар оторван от кеша: окно нужно перезаполнить через REST.
+        """
+        series = self._series.get((exchange, symbol))
+        if not series:
+            return False
+
+        last_ts = series[-1]["timestamp"]
+        if timestamp == last_ts:
+            series[-1] = series[-1].replace(**fields)
+        elif timestamp == last_ts + self.interval_ms:
+            series.append(series[-1].replace(**{"volume": 0.0, "oi_filled": "oi" not in fields, **fields},
+                                             timestamp=timestamp))
+        elif timestamp > last_ts:
+            del self._series[(exchange, symbol)]
+            return False
+        else:
+            for i in range(len(series) - 2, -1, -1):
+                if series[i]["timestamp"] == timestamp:
+                    series[i] = series[i].replace(**fields)
+                    break
+        return True
+
+    def reset(self, exchange: str, symbol: str, bars: list[Bar]):
+        self._series[(exchange, symbol)] = deque(sorted(bars, key=lambda x: x["timestamp"]), maxlen=self.max_bars)
+
+    def window(self, exchange: str, symbol: str, bars: int) -> list[Bar]:
+        series = self._series.get((exchange, symbol))
+        if not series:
+            return []
+        return list(series)[-bars:]
+
+    def invalidate(self, exchange: str, symbol: str):
+        self._series.pop((exchange, symbol), None)
+
+
+BAR_CACHE = BarCache()
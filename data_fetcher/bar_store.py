@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config.config import BAR_STORE_DIR, BAR_STORE_FLUSH_SECONDS
+from data_fetcher.bar import Bar
+
+BAR_MS = 5 * 60 * 1000
+BAR_DTYPE = np.dtype([
+    ("symbol", "S24"),
+    ("timestamp", "i8"),
+    ("oi", "f8"),
+    ("price", "f8"),
+    ("volume", "f8"),
+])
+
+logger = logging.getLogger("bar_store")
+
+
+def _day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp / 1000, timezone.utc).strftime("%Y-%m-%d")
+
+
+class BarStore:
+    """
+    Локальное хранилище закрытых баров: по файлу на (биржа, сутки UTC) из записей BAR_DTYPE.
+    Процессы-шарды пишут каждый в свой файл суток (writer), при чтении файлы суток объединяются.
+
+    Файлы только дописываются и читаются через np.memmap без копирования. Запись идёт пачками
+    в фоне; каждый бар пишется один раз, после закрытия. Если бар всё же записан повторно,
+    при чтении побеждает последняя запись.
+    """
+
+    def __init__(self, root: str = BAR_STORE_DIR, flush_seconds: float = BAR_STORE_FLUSH_SECONDS, writer: str = ""):
+        self.root = root
+        self.writer = writer
+        self.flush_seconds = flush_seconds
+        self._pending: list[tuple[str, str, Bar]] = []
+        self._last_written: dict[tuple[str, str], int] = {}
+        self._lock = asyncio.Lock()
+        self._worker: asyncio.Task | None = None
+
+    def path(self, exchange: str, day: str) -> str:
+        name = f"{day}.{self.writer}.bars" if self.writer else f"{day}.bars"
+        return os.path.join(self.root, exchange, name)
+
+    def _day_files(self, exchange: str, day: str) -> list[str]:
+        directory = os.path.join(self.root, exchange)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.endswith(".bars") and name.split(".", 1)[0] == day)
+
+    def add(self, exchange: str, symbol: str, bars: list[Bar]):
+        """
+        Ставит в очередь на запись закрытые бары, которые ещё не записаны. Бары с подставленным OI (oi_filled)
+        и всё после них ждут следующего запроса: бар пишется один раз, и в хранилище должен попасть настоящий OI.
+        """
+        closed_before = int(time.time() * 1000) // BAR_MS * BAR_MS
+        key = (exchange, symbol)
+        last = self._last_written.get(key, 0)
+        for bar in bars:
+            if bar.oi_filled:
+                break
+            if last < bar["timestamp"] < closed_before:
+                self._pending.append((exchange, symbol, bar))
+                last = bar["timestamp"]
+        self._last_written[key] = last
+
+    # Запись
+
+    async def flush(self) -> int:
+        async with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+            try:
+                await asyncio.to_thread(self._write, pending)
+            except Exception as e:
+                logger.error(f"Не удалось записать бары: {e}")
+                self._pending = pending + self._pending
+                return 0
+            return len(pending)
+
+    def _write(self, pending: list[tuple[str, str, Bar]]):
+        files: dict[str, list[tuple]] = {}
+        for exchange, symbol, bar in pending:
+            record = (symbol, bar["timestamp"], bar["oi"], bar["price"], bar["volume"])
+            files.setdefault(self.path(exchange, _day(bar["timestamp"])), []).append(record)
+
+        for path, records in files.items():
+            records = np.array(records, dtype=BAR_DTYPE)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as f:
+                records.tofile(f)
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        await self.flush()
+
+    # Чтение
+
+    def day(self, exchange: str, day: str) -> np.ndarray:
+        """
+        Все записи биржи за сутки как memmap (без копирования); пустой массив, если файла нет.
+        Если сутки записаны несколькими шардами, их файлы склеиваются в один массив (с копированием).
+        """
+        chunks = []
+        for path in self._day_files(exchange, day):
+            # Хвост от прерванной записи отбрасываем
+            count = os.path.getsize(path) // BAR_DTYPE.itemsize
+            if count:
+                chunks.append(np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,)))
+        if not chunks:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+    def days(self, exchange: str) -> list[str]:
+        directory = os.path.join(self.root, exchange)
+        if not os.path.isdir(directory):
+            return []
+        return sorted({name.split(".", 1)[0] for name in os.listdir(directory) if name.endswith(".bars")})
+
+    def read(self, exchange: str, symbol: str | None = None, start: int | None = None,
+             end: int | None = None, symbols: list[str] | None = None) -> np.ndarray:
+        """
+        Бары биржи за [start, end) (миллисекунды), по возрастанию (symbol, timestamp), без повторов.
+        symbol и symbols не заданы — все символы.
+        """
+        first_day = _day(start) if start is not None else None
+        last_day = _day(end - 1) if end is not None else None
+        chunks = []
+        for day in self.days(exchange):
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            records = self.day(exchange, day)
+            mask = np.ones(len(records), dtype=bool)
+            if symbol is not None:
+                mask &= records["symbol"] == symbol.encode()
+            if symbols is not None:
+                mask &= np.isin(records["symbol"], [name.encode() for name in symbols])
+            if start is not None:
+                mask &= records["timestamp"] >= start
+            if end is not None:
+                mask &= records["timestamp"] < end
+            chunks.append(records[mask])
+
+        if not chunks:
+            return np.empty(0, dtype=BAR_DTYPE)
+        bars = np.concatenate(chunks)
+        # Устойчивая сортировка сохраняет порядок записи — из повторов берём последний
+        order = np.lexsort((bars["timestamp"], bars["symbol"]))
+        bars = bars[order]
+        last = np.ones(len(bars), dtype=bool)
+        last[:-1] = (bars["symbol"][1:] != bars["symbol"][:-1]) | (bars["timestamp"][1:] != bars["timestamp"][:-1])
+        return bars[last]
+
+    def warm_start(self, cache, exchange: str, max_bars: int) -> int:
+        """Заполняет кеш баров последними max_bars барами каждого символа. Возвращает число символов."""
+        now = int(time.time() * 1000)
+        bars = self.read(exchange, start=now - max_bars * BAR_MS)
+        if not len(bars):
+            return 0
+
+        symbols, starts = np.unique(bars["symbol"], return_index=True)
+        bounds = list(starts[1:]) + [len(bars)]
+        for symbol, first, last in zip(symbols, starts, bounds):
+            timestamps = bars["timestamp"][first:last]
+            # Кеш рассчитывает на непрерывный ряд — берём хвост без пропусков
+            gaps = np.flatnonzero(np.diff(timestamps) != BAR_MS)
+            if len(gaps):
+                first += gaps[-1] + 1
+
+            name = symbol.decode()
+            series = [Bar(name, ts, oi, price, volume) for _, ts, oi, price, volume in bars[first:last].tolist()]
+            cache.reset(exchange, name, series)
+            self._last_written[(exchange, name)] = series[-1].timestamp
+        return len(symbols)
+
+
+BAR_STORE = BarStore()
+
+
+if __name__ == "__main__":
+    # Сводка по хранилищу: python -m data_fetcher.bar_store
+    store = BarStore()
+    for exchange in sorted(os.listdir(store.root)) if os.path.isdir(store.root) else []:
+        for day in store.days(exchange):
+            records = store.day(exchange, day)
+            print(exchange, day, f"записей {len(records)}, символов {len(np.unique(records['symbol']))}")
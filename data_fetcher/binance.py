@@ -1,103 +1,185 @@
-import aiohttp
 import logging
+import os
 
-from sqlalchemy.util import symbol
+from data_fetcher.bar import Bar
+from data_fetcher.http_client import HttpClient
+from data_fetcher.rate_limiter import RateLimiter
+from data_fetcher.streams import BinanceStream
+from data_fetcher.merge import merge_bars
+from data_fetcher.utils import gather_or_cancel
+from monitoring.metrics import EMPTY_RESPONSES, ERRORS
 
-BINANCE_BASE_URL = "https://fapi.binance.com"
+BINANCE_BASE_URL = os.getenv("BINANCE_BASE_URL", "https://fapi.binance.com")
 logger = logging.getLogger("binance")
 
+# Лимиты IP: общий вес запросов в минуту и отдельный лимит на эндпоинты /futures/data
+BINANCE_RATE_LIMITS = {
+    "weight": (2400, 60),
+    "futures_data": (1000, 300),
+}
+
+
+def _klines_weight(params: dict | None) -> int:
+    limit = int((params or {}).get("limit", 500))
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+BINANCE_ENDPOINT_WEIGHTS = {
+    "/fapi/v1/klines": {"weight": _klines_weight},
+    "/futures/data/openInterestHist": {"futures_data": 1},
+    "/fapi/v1/exchangeInfo": {"weight": 1},
+    "/fapi/v1/ticker/24hr": {"weight": 40},  # без symbol — сразу по всем контрактам
+}
+
+
+def _budget_from_headers(headers) -> dict[str, float]:
+    used = headers.get("X-MBX-USED-WEIGHT-1M")
+    if used is None:
+        return {}
+    return {"weight": BINANCE_RATE_LIMITS["weight"][0] - int(used)}
+
+
+def create_rate_limiter(share: float = 1.0) -> RateLimiter:
+    return RateLimiter("Binance", BINANCE_RATE_LIMITS, BINANCE_ENDPOINT_WEIGHTS, _budget_from_headers, share=share)
+
+
 # Получение истории Open Interest
-async def fetch_open_interest(symbol: str, period: str = "5m", limit: int = 5) -> list[dict] | None:
-    url = f"{BINANCE_BASE_URL}/futures/data/openInterestHist"
+async def fetch_open_interest(client: HttpClient, symbol: str, period: str = "5m",
+                              limit: int = 5) -> list[tuple[int, float]] | None:
     params = {
         "symbol": symbol,
         "period": period,
         "limit": limit
     }
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as response:
-            data = await response.json()
-            if not data:
-                logger.warning(f"No OI data for {symbol}")
-                return None
-
-            result = [
-                {
-                    "timestamp": int(item["timestamp"]),
-                    "oi": float(item["sumOpenInterestValue"])
-                }
-                for item in data
-            ]
-            return result
+    data = await client.get_json("/futures/data/openInterestHist", params=params)
+    if not data:
+        logger.warning(f"No OI data for {symbol}")
+        EMPTY_RESPONSES.inc(exchange="Binance", endpoint="open_interest")
+        return None
+
+    # (timestamp, стоимость OI) — кортежи вместо словарей на каждую точку
+    return [(int(item["timestamp"]), float(item["sumOpenInterestValue"])) for item in data]
 
 # Получение истории цены и объёма
-async def fetch_price_and_volume(symbol: str, interval: str = "5m", limit: int = 5) -> list[dict] | None:
-    url = f"{BINANCE_BASE_URL}/fapi/v1/klines"
+async def fetch_price_and_volume(client: HttpClient, symbol: str, interval: str = "5m",
+                                 limit: int = 5) -> list[tuple[int, float, float]] | None:
     params = {
         "symbol": symbol,
         "interval": interval,
         "limit": limit
     }
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as response:
-            data = await response.json()
-            if not data:
-                logger.warning(f"No kline data for {symbol}")
-                return None
-
-            result = [
-                {
-                    "timestamp": int(row[0]),
-                    "price": float(row[4]),     # close
-                    "volume": float(row[5])     # volume
-                }
-                for row in data
-            ]
-            return result
-
-# Получение последних N значений OI, цены и объема (объединено по времени)
-async def fetch_binance_data(symbol: str, period: str = "5m", limit: int = 5) -> list[dict] | None:
+    data = await client.get_json("/fapi/v1/klines", params=params)
+    if not data:
+        logger.warning(f"No kline data for {symbol}")
+        EMPTY_RESPONSES.inc(exchange="Binance", endpoint="klines")
+        return None
+
+    # (timestamp, close, volume)
+    return [(int(row[0]), float(row[4]), float(row[5])) for row in data]
+
+# Получение последних N значений OI, цены и объема (склеены по времени открытия бара)
+async def fetch_binance_data(client: HttpClient, symbol: str, period: str = "5m", limit: int = 5) -> list[Bar] | None:
     try:
-        oi_data = await fetch_open_interest(symbol, period, limit)
-        price_volume_data = await fetch_price_and_volume(symbol, period, limit)
+        # Обе серии запрашиваются одновременно; при неудаче одной вторая отменяется
+        legs = await gather_or_cancel(
+            fetch_open_interest(client, symbol, period, limit),
+            fetch_price_and_volume(client, symbol, period, limit),
+        )
 
-        if not oi_data or not price_volume_data:
+        if legs is None:
             logger.warning(f"Failed to fetch full data for {symbol}")
             return None
+        oi_data, price_volume_data = legs
 
-        result = []
-        for oi_point, pv_point in zip(oi_data, price_volume_data):
-            result.append({
-                "symbol": symbol,
-                "timestamp": max(oi_point["timestamp"], pv_point["timestamp"]),
-                "oi": oi_point["oi"],
-                "price": pv_point["price"],
-                "volume": pv_point["volume"]
-            })
-
-        return result
+        return merge_bars(symbol, oi_data, price_volume_data, BinanceAdapter.oi_value)
 
     except Exception as e:
+        ERRORS.inc(exchange="Binance", stage="fetch")
         logger.error(f"Error fetching Binance data for {symbol}: {e}")
         return None
 
-async def get_binance_symbols():
+async def fetch_instruments(client: HttpClient, with_turnover: bool = False) -> list[dict] | None:
+    """Торгуемые бессрочные контракты с метаданными (и оборотом за 24ч в USDT, если with_turnover)."""
     try:
-        url = "https://fapi.binance.com/fapi/v1/exchangeInfo"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                data = await resp.json()
-                symbols = [
-                    item["symbol"] for item in data["symbols"]
-                    if item["contractType"] == "PERPETUAL" and item["status"] == "TRADING"
-                ]
+        data = await client.get_json("/fapi/v1/exchangeInfo")
+        instruments = []
+        for item in data["symbols"]:
+            if item["contractType"] != "PERPETUAL" or item["status"] != "TRADING":
+                continue
+            price_filter = next((f for f in item.get("filters", []) if f["filterType"] == "PRICE_FILTER"), {})
+            instruments.append({
+                "symbol": item["symbol"],
+                "quote_asset": item.get("quoteAsset"),
+                "contract_type": item["contractType"],
+                "tick_size": float(price_filter["tickSize"]) if "tickSize" in price_filter else None,
+                "launch_time": item.get("onboardDate"),
+            })
+
+        if with_turnover:
+            tickers = await client.get_json("/fapi/v1/ticker/24hr")
+            turnover = {ticker["symbol"]: float(ticker["quoteVolume"]) for ticker in tickers}
+            for instrument in instruments:
+                instrument["turnover_24h"] = turnover.get(instrument["symbol"], 0.0)
 
-                return symbols
+        return instruments
 
     except Exception as e:
+        ERRORS.inc(exchange="Binance", stage="symbols")
         logger.error(f"Error fetching Binance symbols: {e}")
         return None
 
+async def fetch_ticker_snapshot(client: HttpClient) -> dict[str, dict] | None:
+    """Последняя цена всех контрактов одним запросом. Массового эндпоинта OI у Binance нет — oi = None."""
+    try:
+        tickers = await client.get_json("/fapi/v1/ticker/24hr")
+        return {ticker["symbol"]: {"price": float(ticker["lastPrice"]), "oi": None} for ticker in tickers}
+    except Exception as e:
+        ERRORS.inc(exchange="Binance", stage="snapshot")
+        logger.error(f"Error fetching Binance tickers: {e}")
+        return None
+
+async def get_binance_symbols(client: HttpClient):
+    instruments = await fetch_instruments(client)
+    if instruments is None:
+        return None
+    return [instrument["symbol"] for instrument in instruments]
+
+
+class BinanceAdapter:
+    """Адаптер Binance USDⓈ-M для общего планировщика: символы, бары, потоки и лимиты биржи."""
+
+    name = "Binance"
+    base_url = BINANCE_BASE_URL
+    stream = BinanceStream
+    stream_has_oi = False  # OI в потоках нет — дозапрашивается по закрытию бара
+    snapshot_has_oi = False  # массового эндпоинта OI нет
+
+    def create_rate_limiter(self, share: float = 1.0) -> RateLimiter:
+        return create_rate_limiter(share)
+
+    async def fetch_instruments(self, client: HttpClient, with_turnover: bool = False) -> list[dict] | None:
+        return await fetch_instruments(client, with_turnover)
+
+    async def fetch_bars(self, client: HttpClient, symbol: str, limit: int) -> list[Bar] | None:
+        return await fetch_binance_data(client, symbol, "5m", limit)
+
+    async def fetch_oi_values(self, client: HttpClient, symbol: str, limit: int) -> list[tuple[int, float]] | None:
+        return await fetch_open_interest(client, symbol, "5m", limit)
+
+    async def fetch_snapshot(self, client: HttpClient) -> dict[str, dict] | None:
+        return await fetch_ticker_snapshot(client)
+
+    @staticmethod
+    def oi_value(oi: float, price: float) -> float:
+        # sumOpenInterestValue уже в USDT
+        return oi
+
 
 
 if __name__ == "__main__":
@@ -106,9 +188,14 @@ if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
     async def test():
-        result = await fetch_binance_data("BTCUSDT")
-        symbols = await get_binance_symbols()
-        print(result)
-        print(symbols)
+        client = HttpClient("Binance", BINANCE_BASE_URL, create_rate_limiter())
+        await client.start()
+        try:
+            result = await fetch_binance_data(client, "BTCUSDT")
+            symbols = await get_binance_symbols(client)
+            print(result)
+            print(symbols)
+        finally:
+            await client.close()
 
     asyncio.run(test())
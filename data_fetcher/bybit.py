@@ -1,7 +1,15 @@
-import aiohttp
 import logging
+import os
 
-BYBIT_BASE_URL = "https://api.bybit.com"
+from data_fetcher.bar import Bar
+from data_fetcher.http_client import HttpClient
+from data_fetcher.rate_limiter import RateLimiter
+from data_fetcher.streams import BybitStream
+from data_fetcher.merge import merge_bars
+from data_fetcher.utils import gather_or_cancel
+from monitoring.metrics import EMPTY_RESPONSES, ERRORS
+
+BYBIT_BASE_URL = os.getenv("BYBIT_BASE_URL", "https://api.bybit.com")
 INTERVAL_MAPPING = {
     "1": "1min",
     "3": "3min",
@@ -16,9 +24,27 @@ INTERVAL_MAPPING = {
 
 logger = logging.getLogger("bybit")
 
+# Лимит IP на публичные эндпоинты: 600 запросов за 5 секунд, каждый запрос весит 1
+BYBIT_RATE_LIMITS = {
+    "ip": (600, 5),
+}
+
+
+def _budget_from_headers(headers) -> dict[str, float]:
+    # Bybit присылает остаток лимита эндпоинта; пересчитываем его в долю общей корзины
+    remaining = headers.get("X-Bapi-Limit-Status")
+    limit = headers.get("X-Bapi-Limit")
+    if remaining is None or not limit:
+        return {}
+    return {"ip": BYBIT_RATE_LIMITS["ip"][0] * int(remaining) / int(limit)}
+
+
+def create_rate_limiter(share: float = 1.0) -> RateLimiter:
+    return RateLimiter("ByBit", BYBIT_RATE_LIMITS, {}, _budget_from_headers, share=share)
+
 # Получение истории Open Interest
-async def fetch_open_interest(symbol: str, interval: str = "5", limit: int = 5) -> list[dict] | None:
-    url = f"{BYBIT_BASE_URL}/v5/market/open-interest"
+async def fetch_open_interest(client: HttpClient, symbol: str, interval: str = "5",
+                              limit: int = 5) -> list[tuple[int, float]] | None:
     interval_api = INTERVAL_MAPPING.get(interval)
 
     params = {
@@ -27,92 +53,156 @@ async def fetch_open_interest(symbol: str, interval: str = "5", limit: int = 5)
         "intervalTime": interval_api,
         "limit": limit
     }
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as response:
-            data = await response.json()
-            if data.get("retCode") != 0 or not data["result"]["list"]:
-                logger.warning(f"No OI data for {symbol}")
-                return None
-
-            result = [
-                {
-                    "timestamp": int(item["timestamp"]),
-                    "oi": float(item["openInterest"])
-                }
-                for item in reversed(data["result"]["list"])  # по возрастанию времени
-            ]
-            return result
+    data = await client.get_json("/v5/market/open-interest", params=params)
+    if data.get("retCode") != 0 or not data["result"]["list"]:
+        logger.warning(f"No OI data for {symbol}")
+        EMPTY_RESPONSES.inc(exchange="ByBit", endpoint="open_interest")
+        return None
+
+    # (timestamp, OI в контрактах) по возрастанию времени
+    return [(int(item["timestamp"]), float(item["openInterest"])) for item in reversed(data["result"]["list"])]
 
 
 # Получение истории цены и объема (Klines)
-async def fetch_price_and_volume(symbol: str, interval: str = "5", limit: int = 5) -> list[dict] | None:
-    url = f"{BYBIT_BASE_URL}/v5/market/kline"
+async def fetch_price_and_volume(client: HttpClient, symbol: str, interval: str = "5",
+                                 limit: int = 5) -> list[tuple[int, float, float]] | None:
     params = {
         "category": "linear",
         "symbol": symbol,
         "interval": interval,
         "limit": limit
     }
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as response:
-            data = await response.json()
-            if data.get("retCode") != 0 or not data["result"]["list"]:
-                logger.warning(f"No kline data for {symbol}")
-                return None
-
-            result = [
-                {
-                    "timestamp": int(row[0]),
-                    "price": float(row[4]),     # close
-                    "volume": float(row[5])     # volume
-                }
-                for row in reversed(data["result"]["list"])
-            ]
-            return result
+    data = await client.get_json("/v5/market/kline", params=params)
+    if data.get("retCode") != 0 or not data["result"]["list"]:
+        logger.warning(f"No kline data for {symbol}")
+        EMPTY_RESPONSES.inc(exchange="ByBit", endpoint="klines")
+        return None
+
+    # (timestamp, close, volume)
+    return [(int(row[0]), float(row[4]), float(row[5])) for row in reversed(data["result"]["list"])]
 
 
 # Объединённый сборщик
-async def fetch_bybit_data(symbol: str, interval: str = "5", limit: int = 5) -> list[dict] | None:
+async def fetch_bybit_data(client: HttpClient, symbol: str, interval: str = "5", limit: int = 5) -> list[Bar] | None:
     try:
-        oi_data = await fetch_open_interest(symbol, interval, limit)
-        price_data = await fetch_price_and_volume(symbol, interval, limit)
+        # Обе серии запрашиваются одновременно; при неудаче одной вторая отменяется
+        legs = await gather_or_cancel(
+            fetch_open_interest(client, symbol, interval, limit),
+            fetch_price_and_volume(client, symbol, interval, limit),
+        )
 
-        if not oi_data or not price_data:
+        if legs is None:
             logger.warning(f"Failed to fetch full data for {symbol}")
             return None
+        oi_data, price_data = legs
 
-        result = []
-        for oi_point, pv_point in zip(oi_data, price_data):
-            result.append({
-                "symbol": symbol,
-                "timestamp": max(oi_point["timestamp"], pv_point["timestamp"]),
-                "oi": oi_point["oi"] * pv_point["price"],
-                "price": pv_point["price"],
-                "volume": pv_point["volume"]
-            })
-
-        return result
+        return merge_bars(symbol, oi_data, price_data, BybitAdapter.oi_value)
 
     except Exception as e:
+        ERRORS.inc(exchange="ByBit", stage="fetch")
         logger.error(f"Error fetching ByBit data for {symbol}: {e}")
         return None
 
-async def get_bybit_symbols():
+async def fetch_instruments(client: HttpClient, with_turnover: bool = False) -> list[dict] | None:
+    """Торгуемые линейные контракты с метаданными (и оборотом за 24ч, если with_turnover)."""
     try:
-        url = "https://api.bybit.com/v5/market/instruments-info?category=linear"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                data = await resp.json()
-                symbols = [
-                    item["symbol"] for item in data["result"]["list"]
-                    if item["status"] == "Trading"
-                ]
-                return symbols
+        items = []
+        cursor = None
+        # instruments-info отдаёт список постранично
+        while True:
+            params = {"category": "linear", "limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            data = await client.get_json("/v5/market/instruments-info", params=params)
+            items.extend(data["result"]["list"])
+            cursor = data["result"].get("nextPageCursor")
+            if not cursor:
+                break
+
+        instruments = [
+            {
+                "symbol": item["symbol"],
+                "quote_asset": item.get("quoteCoin"),
+                "contract_type": item.get("contractType"),
+                "tick_size": float(item["priceFilter"]["tickSize"]) if "priceFilter" in item else None,
+                "launch_time": int(item["launchTime"]) if item.get("launchTime") else None,
+            }
+            for item in items
+            if item["status"] == "Trading"
+        ]
+
+        if with_turnover:
+            data = await client.get_json("/v5/market/tickers", params={"category": "linear"})
+            turnover = {ticker["symbol"]: float(ticker["turnover24h"]) for ticker in data["result"]["list"]}
+            for instrument in instruments:
+                instrument["turnover_24h"] = turnover.get(instrument["symbol"], 0.0)
+
+        return instruments
 
     except Exception as e:
+        ERRORS.inc(exchange="ByBit", stage="symbols")
         logger.error(f"Error fetching ByBit symbols: {e}")
         return None
 
+async def fetch_ticker_snapshot(client: HttpClient) -> dict[str, dict] | None:
+    """Последняя цена и стоимость OI всех линейных контрактов одним запросом."""
+    try:
+        data = await client.get_json("/v5/market/tickers", params={"category": "linear"})
+        if data.get("retCode") != 0:
+            logger.warning(f"ByBit tickers error: {data.get('retMsg')}")
+            return None
+        return {
+            ticker["symbol"]: {
+                "price": float(ticker["lastPrice"]),
+                "oi": float(ticker["openInterestValue"]) if ticker.get("openInterestValue") else None,
+            }
+            for ticker in data["result"]["list"]
+        }
+    except Exception as e:
+        ERRORS.inc(exchange="ByBit", stage="snapshot")
+        logger.error(f"Error fetching ByBit tickers: {e}")
+        return None
+
+async def get_bybit_symbols(client: HttpClient):
+    instruments = await fetch_instruments(client)
+    if instruments is None:
+        return None
+    return [instrument["symbol"] for instrument in instruments]
+
+
+class BybitAdapter:
+    """Адаптер Bybit (линейные контракты) для общего планировщика: символы, бары, потоки и лимиты биржи."""
+
+    name = "ByBit"
+    base_url = BYBIT_BASE_URL
+    stream = BybitStream
+    stream_has_oi = True
+    snapshot_has_oi = True
+
+    def create_rate_limiter(self, share: float = 1.0) -> RateLimiter:
+        return create_rate_limiter(share)
+
+    async def fetch_instruments(self, client: HttpClient, with_turnover: bool = False) -> list[dict] | None:
+        return await fetch_instruments(client, with_turnover)
+
+    async def fetch_bars(self, client: HttpClient, symbol: str, limit: int) -> list[Bar] | None:
+        return await fetch_bybit_data(client, symbol, "5", limit)
+
+    async def fetch_oi_values(self, client: HttpClient, symbol: str, limit: int) -> list[tuple[int, float]] | None:
+        # Отдельного ряда стоимости OI у Bybit нет — берём его из баров
+        bars = await fetch_bybit_data(client, symbol, "5", limit)
+        if bars is None:
+            return None
+        return [(bar.timestamp, bar.oi) for bar in bars]
+
+    async def fetch_snapshot(self, client: HttpClient) -> dict[str, dict] | None:
+        return await fetch_ticker_snapshot(client)
+
+    @staticmethod
+    def oi_value(oi: float, price: float) -> float:
+        # open-interest отдаётся в контрактах
+        return oi * price
+
 
 
 if __name__ == "__main__":
@@ -121,9 +211,14 @@ if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
     async def test():
-        result = await fetch_bybit_data("BTCUSDT")
-        symbols = await get_bybit_symbols()
-        print(result)
-        print(symbols)
+        client = HttpClient("ByBit", BYBIT_BASE_URL, create_rate_limiter())
+        await client.start()
+        try:
+            result = await fetch_bybit_data(client, "BTCUSDT")
+            symbols = await get_bybit_symbols(client)
+            print(result)
+            print(symbols)
+        finally:
+            await client.close()
 
     asyncio.run(test())
\ No newline at end of file
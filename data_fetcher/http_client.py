@@ -0,0 +1,123 @@
+import json
+import logging
+
+import aiohttp
+
+from config.config import HTTP_LIMIT_PER_HOST, HTTP_KEEPALIVE_SECONDS, HTTP_DNS_CACHE_SECONDS, \
+    HTTP_TIMEOUT_SECONDS, HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_MAX_RETRIES
+from data_fetcher.rate_limiter import RateLimiter
+from monitoring.metrics import FETCH_SECONDS, RATE_LIMIT_WAIT_SECONDS, HTTP_REQUESTS
+
+logger = logging.getLogger("http")
+
+# Быстрый разбор JSON прямо из байтов ответа, если установлен orjson или msgspec
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+
+        json_loads = msgspec.json.decode
+    except ImportError:
+        json_loads = json.loads
+
+
+class HttpClient:
+    """
+    Долгоживущий HTTP-клиент одной биржи.
+
+    Держит одну ClientSession с настроенным пулом соединений (keep-alive, лимит на хост, DNS-кэш),
+    чтобы запросы переиспользовали уже открытые TLS-соединения, а не открывали новые.
+    Каждый запрос проходит через RateLimiter биржи, который ограничивает вес и число одновременных запросов.
+    """
+
+    def __init__(self, exchange: str, base_url: str, rate_limiter: RateLimiter | None = None):
+        self.exchange = exchange
+        self.base_url = base_url
+        self.session: aiohttp.ClientSession | None = None
+        # Без политики биржи лимитер работает только как ограничитель параллельности
+        self.rate_limiter = rate_limiter or RateLimiter(exchange, limits={}, endpoint_weights={})
+        self._stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+
+    async def start(self):
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+        connector = aiohttp.TCPConnector(
+            limit=0,  # общий лимит не нужен — клиент обслуживает один хост
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+            ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+        )
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[trace_config])
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get_json(self, path: str, params: dict | None = None):
+        if self.session is None:
+            raise RuntimeError(f"HTTP client for {self.exchange} is not started")
+
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            with RATE_LIMIT_WAIT_SECONDS.time(exchange=self.exchange):
+                await self.rate_limiter.acquire(path, params)
+            try:
+                self._stats["requests"] += 1
+                with FETCH_SECONDS.time(exchange=self.exchange, endpoint=path):
+                    async with self.session.get(f"{self.base_url}{path}", params=params) as response:
+                        HTTP_REQUESTS.inc(exchange=self.exchange, endpoint=path, status=response.status)
+                        pause = await self.rate_limiter.observe(response.status, response.headers, attempt)
+                        if pause is None:
+                            # Тело ошибки (4xx/5xx) — не данные, разборщики его не увидят
+                            response.raise_for_status()
+                            return json_loads(await response.read())
+                        if attempt == HTTP_MAX_RETRIES:
+                            response.raise_for_status()
+            finally:
+                self.rate_limiter.release()
+
+    def pop_stats(self) -> dict:
+        """Возвращает статистику пула с прошлого вызова и обнуляет счётчики."""
+        stats = dict(self._stats)
+        for key in self._stats:
+            self._stats[key] = 0
+        return stats
+
+    async def _on_connection_created(self, session, context, params):
+        self._stats["connections_opened"] += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        self._stats["connections_reused"] += 1
+
+
+_clients: dict[str, HttpClient] = {}
+
+
+async def init_http_clients(clients: list[HttpClient]):
+    for client in clients:
+        await client.start()
+        _clients[client.exchange] = client
+
+
+async def close_http_clients():
+    for client in _clients.values():
+        await client.close()
+    _clients.clear()
+
+
+def get_http_client(exchange: str) -> HttpClient:
+    return _clients[exchange]
+
+
+def pop_pool_stats() -> dict[str, dict]:
+    return {exchange: client.pop_stats() for exchange, client in _clients.items()}
+
+
+def get_rate_limiter_states() -> dict[str, dict]:
+    return {exchange: client.rate_limiter.state() for exchange, client in _clients.items()}
@@ -0,0 +1,47 @@
+from typing import Callable
+
+from config.config import MERGE_GAP_POLICY, MERGE_MAX_FILL_BARS
+from data_fetcher.bar import Bar
+
+GAP_POLICIES = ("ffill", "drop")
+
+
+def merge_bars(symbol: str, oi_data: list[tuple[int, float]], price_volume_data: list[tuple[int, float, float]],
+               oi_value: Callable[[float, float], float], policy: str = MERGE_GAP_POLICY,
+               max_fill: int = MERGE_MAX_FILL_BARS) -> list[Bar]:
+    """
+    Склеивает ряды (timestamp, oi) и (timestamp, price, volume) в бары по времени открытия бара.
+
+    Оба ряда должны идти по возрастанию времени — склейка проходит их за один проход.
+    Основа — свечи: точки OI без свечи отбрасываются. Свече без точки OI (например, openInterestHist
+    Binance ещё не отдал последний бар) policy="ffill" подставляет OI предыдущего бара, но не больше
+    max_fill баров подряд, и помечает такой бар oi_filled; policy="drop" или превышение max_fill выбрасывает бар,
+    и окно с ним анализатор пометит неполным.
+
+    oi_value(oi, price) переводит OI биржи в стоимость в котируемой валюте.
+    """
+    if policy not in GAP_POLICIES:
+        raise ValueError(f"Unknown gap policy {policy!r}, expected one of {GAP_POLICIES}")
+    if policy == "drop":
+        max_fill = 0
+
+    bars = []
+    oi_count = len(oi_data)
+    i = 0
+    last_oi = None
+    filled = 0
+    for timestamp, price, volume in price_volume_data:
+        while i < oi_count and oi_data[i][0] < timestamp:
+            i += 1
+        if i < oi_count and oi_data[i][0] == timestamp:
+            last_oi = oi_data[i][1]
+            filled = 0
+            i += 1
+        elif last_oi is not None and filled < max_fill:
+            filled += 1
+        else:
+            # Пропуск: следующий бар уже не может наследовать OI через него
+            last_oi = None
+            continue
+        bars.append(Bar(symbol, timestamp, oi_value(last_oi, price), price, volume, oi_filled=filled > 0))
+    return bars
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Mapping
+
+from config.config import HTTP_MAX_CONCURRENT_REQUESTS, HTTP_MIN_CONCURRENT_REQUESTS, \
+    HTTP_CONCURRENCY_CEILING, RATE_LIMIT_LOW_WATERMARK, RATE_LIMIT_HIGH_WATERMARK, RATE_LIMIT_BACKOFF_SECONDS
+
+logger = logging.getLogger("rate_limiter")
+
+# Вес запроса: число или функция от параметров запроса (у Binance вес klines зависит от limit)
+Weight = int | Callable[[dict | None], int]
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, window_seconds: float):
+        self.capacity = capacity
+        self.rate = capacity / window_seconds
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, weight: int) -> float:
+        if self.tokens >= weight:
+            return 0.0
+        return (weight - self.tokens) / self.rate
+
+    def sync(self, remaining: float):
+        # Биржа видит и чужие запросы с нашего IP, поэтому доверяем ей только в сторону уменьшения
+        self.tokens = min(self.tokens, max(remaining, 0.0))
+
+
+def _resolve(waiter: asyncio.Future, woken: bool):
+    if not waiter.done():
+        waiter.set_result(woken)
+
+
+def _woken(waiter: asyncio.Future) -> bool:
+    """Ожидание завершил _wake (а не таймер и не отмена)."""
+    return waiter.done() and not waiter.cancelled() and waiter.result()
+
+
+class RateLimiter:
+    """
+    Лимитер запросов одной биржи: token bucket по весам эндпоинтов + адаптивный лимит параллельности.
+
+    Остаток бюджета синхронизируется по заголовкам ответов (budget_from_headers),
+    параллельность растёт, пока бюджета много, и сокращается при его нехватке или HTTP 429/418.
+
+    Несколько процессов с одного IP делят бюджет долями share: ёмкость корзин — доля лимита,
+    а остаток из заголовков (он общий для IP) урезается до той же доли, так что вместе процессы
+    не выходят за лимит биржи.
+    """
+
+    def __init__(
+            self,
+            exchange: str,
+            limits: Mapping[str, tuple[int, float]],
+            endpoint_weights: Mapping[str, Mapping[str, Weight]],
+            budget_from_headers: Callable[[Mapping[str, str]], dict[str, float]] | None = None,
+            concurrency: int = HTTP_MAX_CONCURRENT_REQUESTS,
+            min_concurrency: int = HTTP_MIN_CONCURRENT_REQUESTS,
+            max_concurrency: int = HTTP_CONCURRENCY_CEILING,
+            share: float = 1.0,
+    ):
+        """
+        :param limits: Корзины лимитов: имя -> (ёмкость, окно в секундах)
+        :param endpoint_weights: Путь эндпоинта -> {имя корзины: вес}; неизвестные пути весят 1 в каждой корзине
+        :param budget_from_headers: Разбор заголовков ответа в остаток бюджета по корзинам
+        :param share: Доля лимитов биржи, доступная этому процессу
+        """
+        self.exchange = exchange
+        self.share = share
+        self.buckets = {name: TokenBucket(capacity * share, window) for name, (capacity, window) in limits.items()}
+        self.endpoint_weights = endpoint_weights
+        self.budget_from_headers = budget_from_headers
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(concurrency)
+
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._rate_limited = 0
+        # Ожидающие слота или бюджета; будятся без блокировки, чтобы release мог быть синхронным
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def _weights(self, path: str, params: dict | None) -> dict[str, int]:
+        rule = self.endpoint_weights.get(path)
+        if rule is None:
+            return {name: 1 for name in self.buckets}
+        return {name: weight(params) if callable(weight) else weight for name, weight in rule.items()}
+
+    async def acquire(self, path: str, params: dict | None = None):
+        weights = self._weights(path, params)
+
+        while True:
+            now = time.monotonic()
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+
+            if now < self._paused_until:
+                delay = self._paused_until - now
+            elif self._in_flight >= int(self.concurrency):
+                delay = None  # ждём освобождения слота
+            else:
+                delay = max(self.buckets[name].wait_time(weight) for name, weight in weights.items()) \
+                    if weights else 0.0
+                if delay == 0.0:
+                    for name, weight in weights.items():
+                        self.buckets[name].tokens -= weight
+                    self._in_flight += 1
+                    return
+
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            timer = loop.call_later(delay, _resolve, waiter, False) if delay is not None else None
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Пробуждение, доставшееся отменённой задаче, передаётся следующей
+                if _woken(waiter):
+                    self._wake()
+                raise
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                if not _woken(waiter):
+                    # Разбуженных снимает с очереди _wake; по таймеру или отмене — снимаем сами, если ещё там
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+
+    def _wake(self, count: int = 1):
+        while count and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                count -= 1
+
+    def release(self):
+        """
+        Возвращает слот. Синхронный: вызывается из finally запроса, и await здесь мог бы прерваться
+        отменой задачи (отмена соседней ноги, дедлайн тика) — слот терялся бы навсегда.
+        """
+        self._in_flight -= 1
+        self._wake()
+
+    async def observe(self, status: int, headers: Mapping[str, str], attempt: int = 0) -> float | None:
+        """
+        Учитывает ответ биржи. Возвращает паузу в секундах, если запрос надо повторить (429/418).
+        """
+        if status in (429, 418):
+            retry_after = headers.get("Retry-After")
+            pause = float(retry_after) if retry_after else RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt
+            self._rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            self.concurrency = self.min_concurrency if status == 418 \
+                else max(self.min_concurrency, self.concurrency / 2)
+            logger.warning(f"{self.exchange}: HTTP {status}, пауза {pause:.1f} с, "
+                           f"параллельность {int(self.concurrency)}")
+            return pause
+
+        if self.budget_from_headers is None:
+            return None
+
+        budget = self.budget_from_headers(headers)
+        if not budget:
+            return None
+
+        fractions = []
+        for name, remaining in budget.items():
+            bucket = self.buckets.get(name)
+            if bucket is None:
+                continue
+            bucket.sync(remaining * self.share)
+            fractions.append(remaining * self.share / bucket.capacity)
+
+        if not fractions:
+            return None
+
+        previous = int(self.concurrency)
+        fraction = min(fractions)
+        if fraction < RATE_LIMIT_LOW_WATERMARK:
+            self.concurrency = max(self.min_concurrency, self.concurrency * 0.7)
+        elif fraction > RATE_LIMIT_HIGH_WATERMARK:
+            # Аддитивный рост: примерно +1 слот на каждые concurrency успешных ответов
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+
+        if int(self.concurrency) > previous:
+            self._wake(int(self.concurrency) - previous)
+        return None
+
+    def headroom(self) -> float:
+        """Наименьшая по корзинам доля свободного бюджета (1.0, если корзин нет)."""
+        now = time.monotonic()
+        fractions = []
+        for bucket in self.buckets.values():
+            bucket.refill(now)
+            fractions.append(bucket.tokens / bucket.capacity)
+        if now < self._paused_until:
+            return 0.0
+        return min(fractions, default=1.0)
+
+    def state(self) -> dict:
+        now = time.monotonic()
+        return {
+            "concurrency": int(self.concurrency),
+            "in_flight": self._in_flight,
+            "paused_for": round(max(0.0, self._paused_until - now), 2),
+            "rate_limited": self._rate_limited,
+            "buckets": {
+                name: {"tokens": round(bucket.tokens, 1), "capacity": bucket.capacity}
+                for name, bucket in self.buckets.items()
+            },
+        }
+
+
+if __name__ == "__main__":
+    # Прогон лимитера против локального мок-сервера: python -m data_fetcher.rate_limiter
+    from aiohttp import web
+
+    from benchmarks.mock_exchange import create_app, MockSettings
+    from data_fetcher.binance import create_rate_limiter, fetch_binance_data
+    from data_fetcher.http_client import HttpClient
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def test():
+        settings = MockSettings(symbols=200, weight_limit=600, rate_limit_every=150)
+        runner = web.AppRunner(create_app(settings), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 8081)
+        await site.start()
+
+        client = HttpClient("Binance", "http://127.0.0.1:8081", create_rate_limiter())
+        await client.start()
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                fetch_binance_data(client, f"SYM{i}USDT", limit=5) for i in range(settings.symbols)
+            ))
+            duration = time.perf_counter() - start
+            print(f"Получено {sum(r is not None for r in results)}/{len(results)} за {duration:.2f} с")
+            print(client.rate_limiter.state())
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(test())
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Callable
+
+import aiohttp
+
+from config.config import STREAM_MAX_TOPICS_PER_CONNECTION, STREAM_RECONNECT_SECONDS
+
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://fstream.binance.com")
+BYBIT_WS_URL = os.getenv("BYBIT_WS_URL", "wss://stream.bybit.com")
+BAR_MS = 5 * 60 * 1000
+
+logger = logging.getLogger("streams")
+
+# on_update(symbol, timestamp бара, поля бара, бар закрыт)
+UpdateCallback = Callable[[str, int, dict, bool], None]
+
+
+class ExchangeStream:
+    """
+    Подписка на потоки одной биржи через несколько мультиплексированных WebSocket-соединений.
+
+    Символы раскладываются по соединениям с учётом лимита потоков на соединение;
+    оборванное соединение переподключается и заново подписывается на свои потоки.
+    """
+
+    exchange = ""
+    topics_per_symbol = 1
+
+    def __init__(self, session: aiohttp.ClientSession, symbols: list[str], on_update: UpdateCallback,
+                 max_topics: int = STREAM_MAX_TOPICS_PER_CONNECTION):
+        self.session = session
+        self.symbols = symbols
+        self.on_update = on_update
+        self.symbols_per_connection = max(1, max_topics // self.topics_per_symbol)
+        self.reconnects = 0
+
+    def shards(self) -> list[list[str]]:
+        step = self.symbols_per_connection
+        return [self.symbols[i:i + step] for i in range(0, len(self.symbols), step)]
+
+    async def run(self):
+        shards = self.shards()
+        logger.info(f"{self.exchange}: {len(self.symbols)} символов в {len(shards)} соединениях")
+        await asyncio.gather(*(self._run_connection(shard) for shard in shards))
+
+    async def _run_connection(self, symbols: list[str]):
+        while True:
+            try:
+                async with self.session.ws_connect(self.url, heartbeat=20) as ws:
+                    await self.subscribe(ws, symbols)
+                    keepalive = asyncio.create_task(self.keepalive(ws))
+                    try:
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self.handle_message(json.loads(msg.data))
+                            elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                                break
+                    finally:
+                        keepalive.cancel()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.exchange}: ошибка потока: {e}")
+
+            self.reconnects += 1
+            logger.info(f"{self.exchange}: переподключение через {STREAM_RECONNECT_SECONDS} с")
+            await asyncio.sleep(STREAM_RECONNECT_SECONDS)
+
+    @property
+    def url(self) -> str:
+        raise NotImplementedError
+
+    async def subscribe(self, ws: aiohttp.ClientWebSocketResponse, symbols: list[str]):
+        raise NotImplementedError
+
+    async def keepalive(self, ws: aiohttp.ClientWebSocketResponse):
+        pass
+
+    def handle_message(self, message: dict):
+        raise NotImplementedError
+
+
+class BinanceStream(ExchangeStream):
+    """Потоки kline_5m фьючерсов Binance. OI в потоках Binance нет — его дозапрашивают по закрытию бара."""
+
+    exchange = "Binance"
+
+    @property
+    def url(self) -> str:
+        return f"{BINANCE_WS_URL}/stream"
+
+    async def subscribe(self, ws, symbols):
+        params = [f"{symbol.lower()}@kline_5m" for symbol in symbols]
+        await ws.send_json({"method": "SUBSCRIBE", "params": params, "id": 1})
+
+    def handle_message(self, message: dict):
+        data = message.get("data")
+        if not data or data.get("e") != "kline":
+            return
+        kline = data["k"]
+        self.on_update(
+            data["s"],
+            int(kline["t"]),
+            {"price": float(kline["c"]), "volume": float(kline["v"])},
+            kline["x"],
+        )
+
+
+class BybitStream(ExchangeStream):
+    """Потоки kline.5 и tickers линейных контрактов Bybit v5 (tickers несут openInterestValue)."""
+
+    exchange = "ByBit"
+    topics_per_symbol = 2
+
+    @property
+    def url(self) -> str:
+        return f"{BYBIT_WS_URL}/v5/public/linear"
+
+    async def subscribe(self, ws, symbols):
+        topics = [topic for symbol in symbols for topic in (f"kline.5.{symbol}", f"tickers.{symbol}")]
+        # Bybit принимает не больше 10 топиков в одном запросе подписки
+        for i in range(0, len(topics), 10):
+            await ws.send_json({"op": "subscribe", "args": topics[i:i + 10]})
+
+    async def keepalive(self, ws):
+        while True:
+            await asyncio.sleep(20)
+            await ws.send_json({"op": "ping"})
+
+    def handle_message(self, message: dict):
+        topic = message.get("topic", "")
+        if topic.startswith("kline."):
+            symbol = topic.rsplit(".", 1)[1]
+            for kline in message["data"]:
+                self.on_update(
+                    symbol,
+                    int(kline["start"]),
+                    {"price": float(kline["close"]), "volume": float(kline["volume"])},
+                    kline["confirm"],
+                )
+        elif topic.startswith("tickers."):
+            data = message["data"]
+            # В delta-сообщениях приходят только изменившиеся поля
+            if "openInterestValue" in data:
+                timestamp = int(message["ts"]) // BAR_MS * BAR_MS
+                self.on_update(data["symbol"], timestamp, {"oi": float(data["openInterestValue"])}, False)
+
+
+if __name__ == "__main__":
+    # Печать обновлений из потоков мок-сервера: python -m benchmarks.mock_exchange, затем
+    # BINANCE_WS_URL=ws://127.0.0.1:8081 BYBIT_WS_URL=ws://127.0.0.1:8081 python -m data_fetcher.streams
+    logging.basicConfig(level=logging.INFO)
+
+    async def test():
+        async with aiohttp.ClientSession() as session:
+            def print_update(symbol, timestamp, fields, closed):
+                print(symbol, timestamp, fields, closed)
+
+            await asyncio.wait_for(asyncio.gather(
+                BinanceStream(session, ["SYM0USDT", "SYM1USDT"], print_update).run(),
+                BybitStream(session, ["SYM0USDT"], print_update).run(),
+            ), timeout=10)
+
+    try:
+        asyncio.run(test())
+    except asyncio.TimeoutError:
+        pass
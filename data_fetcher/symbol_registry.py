@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from config.config import SYMBOLS_TTL_SECONDS, SYMBOL_QUOTE_ASSETS, MIN_TURNOVER_24H
+from data_fetcher.adapters import ADAPTERS
+from data_fetcher.http_client import HttpClient, get_http_client
+
+logger = logging.getLogger("symbols")
+
+InstrumentsLoader = Callable[[HttpClient, bool], Awaitable[list[dict] | None]]
+
+
+class SymbolRegistry:
+    """
+    Кеш торгуемых символов бирж с метаданными (шаг цены, тип контракта, дата запуска).
+
+    Список обновляется в фоне раз в ttl секунд; пока идёт обновление или если оно не удалось,
+    отдаётся последний известный список. Неликвидные символы отсекаются фильтрами.
+    """
+
+    def __init__(self, loaders: dict[str, InstrumentsLoader], ttl: float = SYMBOLS_TTL_SECONDS,
+                 quote_assets: list[str] | None = SYMBOL_QUOTE_ASSETS, min_turnover: float = MIN_TURNOVER_24H):
+        self.loaders = loaders
+        self.ttl = ttl
+        self.quote_assets = set(quote_assets) if quote_assets else None
+        self.min_turnover = min_turnover
+        self._instruments: dict[str, dict[str, dict]] = {}
+        self._updated: dict[str, float] = {}
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    async def get_symbols(self, exchange: str) -> list[str]:
+        if exchange not in self._instruments:
+            await self.refresh(exchange)
+        elif time.monotonic() - self._updated[exchange] > self.ttl:
+            self._refresh_in_background(exchange)
+
+        return [
+            symbol for symbol, instrument in self._instruments.get(exchange, {}).items()
+            if self._accepts(instrument)
+        ]
+
+    def metadata(self, exchange: str, symbol: str) -> dict | None:
+        return self._instruments.get(exchange, {}).get(symbol)
+
+    async def refresh(self, exchange: str):
+        instruments = await self.loaders[exchange](get_http_client(exchange), self.min_turnover > 0)
+        if instruments is None:
+            logger.warning(f"{exchange}: не удалось обновить список символов, используется последний известный")
+            return
+        self._instruments[exchange] = {instrument["symbol"]: instrument for instrument in instruments}
+        self._updated[exchange] = time.monotonic()
+        logger.info(f"{exchange}: список символов обновлён, контрактов {len(instruments)}")
+
+    def _refresh_in_background(self, exchange: str):
+        task = self._refreshing.get(exchange)
+        if task is None or task.done():
+            self._refreshing[exchange] = asyncio.create_task(self.refresh(exchange))
+
+    def _accepts(self, instrument: dict) -> bool:
+        if self.quote_assets is not None and instrument.get("quote_asset") not in self.quote_assets:
+            return False
+        if self.min_turnover > 0 and instrument.get("turnover_24h", 0.0) < self.min_turnover:
+            return False
+        return True
+
+
+SYMBOL_REGISTRY = SymbolRegistry({exchange: adapter.fetch_instruments for exchange, adapter in ADAPTERS.items()})
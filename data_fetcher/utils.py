@@ -0,0 +1,24 @@
+import asyncio
+from typing import Any, Awaitable
+
+
+async def gather_or_cancel(*aws: Awaitable) -> list[Any] | None:
+    """
+    Запускает запросы параллельно и возвращает их результаты в исходном порядке.
+
+    Если любой из запросов вернул пустой результат или упал, остальные отменяются:
+    в первом случае возвращается None, во втором исключение пробрасывается дальше.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            if not await next_done:
+                return None
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Дожидаемся отменённых задач, чтобы не оставлять их висеть в цикле событий
+        await asyncio.gather(*tasks, return_exceptions=True)
+
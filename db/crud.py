@@ -1,28 +1,182 @@
-from sqlalchemy import select
+from collections import Counter
+from datetime import date, datetime
+
+from sqlalchemy import select, func, insert, delete, tuple_, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from db.models import SignalData
-from datetime import datetime
+from db.models import SignalData, SignalDailyCount, SignalClaim, utc_now, utc_today
+
+
+def _upsert(session: AsyncSession):
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Daily signal rollups need INSERT ... ON CONFLICT, unsupported for {dialect}")
+
+
+async def _add_daily_counts(session: AsyncSession, signals: list[dict]):
+    # Сутки сводки — по timestamp сырой строки, чтобы сводки совпадали с backfill_daily_counts
+    counts = Counter((signal["timestamp"].date(), signal["exchange"], signal["symbol"], signal.get("rule", ""))
+                     for signal in signals)
+    rows = [{"day": day, "exchange": exchange, "symbol": symbol, "rule": rule, "signals": count}
+            for (day, exchange, symbol, rule), count in counts.items()]
+    stmt = _upsert(session)(SignalDailyCount).values(rows)
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["day", "exchange", "symbol", "rule"],
+        set_={"signals": SignalDailyCount.signals + stmt.excluded.signals},
+    ))
+
 
 async def save_signal(session: AsyncSession, signal: dict):
-    db_signal = SignalData(**signal)
-    session.add(db_signal)
-    await session.commit()
+    await save_signals(session, [signal])
 
-async def get_daily_signal_count(session: AsyncSession, symbol: str, exchange: str) -> int:
-    now = datetime.now()
-    today_start = datetime(now.year, now.month, now.day)
+async def save_signals(session: AsyncSession, signals: list[dict]):
+    """Пакетная вставка сигналов одним INSERT ... VALUES и обновление дневных сводок в одной транзакции."""
+    if not signals:
+        return
+    now = utc_now()
+    signals = [{"timestamp": now, **signal} for signal in signals]
+    await session.execute(insert(SignalData).values(signals))
+    await _add_daily_counts(session, signals)
+    await session.commit()
 
-    stmt = select(SignalData).filter(
-        SignalData.symbol == symbol,
-        SignalData.exchange == exchange,
-        SignalData.timestamp >= today_start
+async def get_daily_signal_count(session: AsyncSession, symbol: str, exchange: str, rule: str | None = None) -> int:
+    stmt = select(func.coalesce(func.sum(SignalDailyCount.signals), 0)).filter(
+        SignalDailyCount.day == utc_today(),
+        SignalDailyCount.symbol == symbol,
+        SignalDailyCount.exchange == exchange,
     )
+    if rule is not None:
+        stmt = stmt.filter(SignalDailyCount.rule == rule)
+    return await session.scalar(stmt)
+
+async def get_daily_signal_counts(
+        session: AsyncSession,
+        exchange: str | None = None,
+        symbols: list[str] | None = None,
+        day: date | None = None,
+) -> dict[tuple[str, str, str], int]:
+    """Число сигналов за сутки day (по умолчанию сегодня, UTC) по (биржа, символ, набор правил) из дневных сводок."""
+    stmt = select(SignalDailyCount.exchange, SignalDailyCount.symbol, SignalDailyCount.rule,
+                  SignalDailyCount.signals).filter(SignalDailyCount.day == (day or utc_today()))
+    if exchange is not None:
+        stmt = stmt.filter(SignalDailyCount.exchange == exchange)
+    if symbols is not None:
+        stmt = stmt.filter(SignalDailyCount.symbol.in_(symbols))
+
     result = await session.execute(stmt)
-    return len(result.scalars().all())
+    return {(row_exchange, symbol, rule): count for row_exchange, symbol, rule, count in result.all()}
+
+async def get_signal_rollup(
+        session: AsyncSession,
+        start: date,
+        end: date,
+        exchange: str | None = None,
+        symbol: str | None = None,
+) -> list[tuple[date, str, str, str, int]]:
+    """Дневные сводки за [start, end) — для отчётов без чтения сырых сигналов."""
+    stmt = select(SignalDailyCount.day, SignalDailyCount.exchange, SignalDailyCount.symbol, SignalDailyCount.rule,
+                  SignalDailyCount.signals).filter(SignalDailyCount.day >= start, SignalDailyCount.day < end)
+    if exchange is not None:
+        stmt = stmt.filter(SignalDailyCount.exchange == exchange)
+    if symbol is not None:
+        stmt = stmt.filter(SignalDailyCount.symbol == symbol)
+    stmt = stmt.order_by(SignalDailyCount.day, SignalDailyCount.exchange, SignalDailyCount.symbol)
+
+    result = await session.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+async def get_signals_page(
+        session: AsyncSession,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        exchange: str | None = None,
+        symbol: str | None = None,
+        rule: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+) -> list[SignalData]:
+    """
+    Сигналы от новых к старым, страница за страницей: after — (timestamp, id) последнего сигнала предыдущей
+    страницы. Условие по ключу вместо OFFSET не заставляет БД пропускать уже выданные строки.
+    """
+    stmt = select(SignalData)
+    if after is not None:
+        # Параметры с типами колонок: в SQLite время сравнивается строкой в формате колонки
+        cursor = tuple_(literal(after[0], SignalData.timestamp.type), literal(after[1], SignalData.id.type))
+        stmt = stmt.filter(tuple_(SignalData.timestamp, SignalData.id) < cursor)
+    if exchange is not None:
+        stmt = stmt.filter(SignalData.exchange == exchange)
+    if symbol is not None:
+        stmt = stmt.filter(SignalData.symbol == symbol)
+    if rule is not None:
+        stmt = stmt.filter(SignalData.rule == rule)
+    if since is not None:
+        stmt = stmt.filter(SignalData.timestamp >= since)
+    if until is not None:
+        stmt = stmt.filter(SignalData.timestamp < until)
+    stmt = stmt.order_by(SignalData.timestamp.desc(), SignalData.id.desc()).limit(limit)
+    return list(await session.scalars(stmt))
+
+async def get_signal_totals(
+        session: AsyncSession,
+        start: date,
+        end: date,
+        exchange: str | None = None,
+        rule: str | None = None,
+        limit: int | None = None,
+) -> list[tuple[str, str, str, int]]:
+    """Сигналов за [start, end) по (биржа, символ, набор правил) из дневных сводок, самые частые первыми."""
+    total = func.sum(SignalDailyCount.signals).label("signals")
+    stmt = select(SignalDailyCount.exchange, SignalDailyCount.symbol, SignalDailyCount.rule, total) \
+        .filter(SignalDailyCount.day >= start, SignalDailyCount.day < end)
+    if exchange is not None:
+        stmt = stmt.filter(SignalDailyCount.exchange == exchange)
+    if rule is not None:
+        stmt = stmt.filter(SignalDailyCount.rule == rule)
+    stmt = stmt.group_by(SignalDailyCount.exchange, SignalDailyCount.symbol, SignalDailyCount.rule) \
+        .order_by(total.desc(), SignalDailyCount.symbol).limit(limit)
+
+    result = await session.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+async def get_signal_times(
+        session: AsyncSession,
+        since: datetime,
+        exchange: str | None = None,
+) -> list[tuple[str, str, str, datetime]]:
+    """(биржа, символ, набор правил, время) сигналов начиная с since — для оценки качества по барам."""
+    stmt = select(SignalData.exchange, SignalData.symbol, SignalData.rule, SignalData.timestamp) \
+        .filter(SignalData.timestamp >= since)
+    if exchange is not None:
+        stmt = stmt.filter(SignalData.exchange == exchange)
+
+    result = await session.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+async def claim_signal(session: AsyncSession, exchange: str, symbol: str, rule: str, bar_time: int) -> bool:
+    """Записывает отметку сигнала по бару. False — отметка уже есть (сигнал отправил другой процесс)."""
+    try:
+        await session.execute(insert(SignalClaim).values(exchange=exchange, symbol=symbol, rule=rule,
+                                                         bar_time=bar_time))
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        return False
+    return True
+
+async def delete_signal_claims(session: AsyncSession, before_bar_time: int) -> int:
+    result = await session.execute(delete(SignalClaim).where(SignalClaim.bar_time < before_bar_time))
+    await session.commit()
+    return result.rowcount
 
 
 if __name__ == "__main__":
     import asyncio
+    from datetime import timedelta
     from engine import async_session
 
     async def main():
@@ -30,7 +184,6 @@ if __name__ == "__main__":
             signal = {
                 "symbol": "BTCUSDT",
                 "exchange": "Binance",
-                "timestamp": datetime.now(),
                 "oi_growth": 6.2,
                 "price_growth": 0.89,
                 "volume_growth_ratio": 10.1,
@@ -39,5 +192,8 @@ if __name__ == "__main__":
             await save_signal(session, signal)
             signals_count = await get_daily_signal_count(session, "BTCUSDT", "Binance")
             print(signals_count)
+            print(await get_daily_signal_counts(session, "Binance"))
+            today = utc_today()
+            print(await get_signal_rollup(session, today.replace(day=1), today + timedelta(days=1)))
 
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
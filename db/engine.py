@@ -1,22 +1,58 @@
 import os
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from dotenv import load_dotenv, find_dotenv
 
-from db.models import Base
+from db.models import Base, SignalData
+from db.partitions import ensure_partitioned_table, backfill_daily_counts, LEGACY_RULE
 
 load_dotenv(find_dotenv())
 
-db_url = (
+# DB_URL целиком переопределяет адрес базы, например sqlite+aiosqlite:///screener.db для локальных прогонов
+db_url = os.getenv("DB_URL") or (
     f'{os.getenv("DB_TYPE")}+{os.getenv("DB_ENGINE")}://{os.getenv("DB_USER")}:{os.getenv("DB_PASSWORD")}\
 @{os.getenv("DB_HOST")}:{os.getenv("DB_PORT")}/{os.getenv("DB_NAME")}'
 )
 
-engine = create_async_engine(db_url, echo=False)
+
+def make_engine(url: str, pool_size: int, max_overflow: int, **options) -> AsyncEngine:
+    # У SQLite свой пул соединений без этих параметров
+    pool_options = {} if url.startswith("sqlite") else {"pool_size": pool_size, "max_overflow": max_overflow}
+    return create_async_engine(url, echo=False, **pool_options, **options)
+
+
+engine = make_engine(db_url, int(os.getenv("DB_POOL_SIZE", 5)), int(os.getenv("DB_MAX_OVERFLOW", 10)))
 async_session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+def _add_missing_columns(sync_conn):
+    # create_all не меняет уже существующие таблицы — добавляем новые колонки сами
+    table = SignalData.__table__
+    existing = {column["name"] for column in inspect(sync_conn).get_columns(table.name)}
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        column_type = column.type.compile(dialect=sync_conn.dialect)
+        default = f" DEFAULT '{column.server_default.arg}'" if column.server_default is not None else ""
+        sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{default}"))
+        if column.name == "rule":
+            # Иначе старые сигналы считались бы под пустым именем и не входили в дневной лимит набора
+            sync_conn.execute(text(f"UPDATE {table.name} SET rule = :rule"), {"rule": LEGACY_RULE})
+
+
+def _create_missing_indexes(sync_conn):
+    # create_all не добавляет новые индексы к уже существующим таблицам
+    for index in SignalData.__table__.indexes:
+        index.create(sync_conn, checkfirst=True)
+
+
 async def init_db():
     async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.run_sync(ensure_partitioned_table)
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+        await conn.run_sync(backfill_daily_counts)
 
 
 if __name__ == "__main__":
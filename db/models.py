@@ -1,6 +1,23 @@
-from sqlalchemy import String, DateTime, Float
+from sqlalchemy import String, DateTime, Date, Float, Integer, Index, BigInteger, UniqueConstraint, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime, timezone
+
+
+# SQLite пишет CURRENT_TIMESTAMP строкой с точностью до секунды; параметры сравнения нужны в том же формате,
+# иначе равные моменты сравниваются как строки разной длины
+SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
+
+def utc_now() -> datetime:
+    # Время сигналов хранится без пояса, в UTC; по нему же считаются сутки для сводок, счётчика и секций
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def utc_today() -> date:
+    return utc_now().date()
 
 
 class Base(DeclarativeBase):
@@ -8,12 +25,53 @@ class Base(DeclarativeBase):
 
 
 class SignalData(Base):
+    """
+    Сырые сигналы. В PostgreSQL таблица секционирована по timestamp (db/partitions.py) и создаётся там же,
+    в остальных БД это обычная таблица.
+    """
+
     __tablename__ = "signal_data"
+    __table_args__ = (
+        # Выборки по символу с фильтром по времени и лента последних сигналов (api/server.py)
+        Index("ix_signal_data_exchange_symbol_timestamp", "exchange", "symbol", "timestamp"),
+        Index("ix_signal_data_timestamp", "timestamp"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     symbol: Mapped[str] = mapped_column(String(30))
     exchange: Mapped[str] = mapped_column(String(10))  # 'Binance' or 'ByBit'
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
+    rule: Mapped[str] = mapped_column(String(20), server_default="")  # имя набора правил из config.RULE_SETS
+    # Время ставит скринер (utc_now): в таблицах прежних версий у колонки нет значения по умолчанию
+    timestamp: Mapped[datetime] = mapped_column(DateTime().with_variant(SQLITE_TIMESTAMP, "sqlite"),
+                                                default=utc_now, server_default=func.now())
     oi_growth: Mapped[float] = mapped_column(Float(2))
     price_growth: Mapped[float] = mapped_column(Float(2))
     volume_growth_ratio: Mapped[float] = mapped_column(Float(2))
+
+
+class SignalDailyCount(Base):
+    """Дневная сводка: число сигналов по (сутки, биржа, символ, набор правил), обновляется при каждой записи."""
+
+    __tablename__ = "signal_daily_counts"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    exchange: Mapped[str] = mapped_column(String(10), primary_key=True)
+    symbol: Mapped[str] = mapped_column(String(30), primary_key=True)
+    rule: Mapped[str] = mapped_column(String(20), primary_key=True)
+    signals: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SignalClaim(Base):
+    """Отметка «сигнал по бару уже отправлен»: уникальный ключ не даёт шардам продублировать уведомление."""
+
+    __tablename__ = "signal_claims"
+    __table_args__ = (
+        UniqueConstraint("exchange", "symbol", "rule", "bar_time", name="uq_signal_claims_signal"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    exchange: Mapped[str] = mapped_column(String(10))
+    symbol: Mapped[str] = mapped_column(String(30))
+    rule: Mapped[str] = mapped_column(String(20))
+    bar_time: Mapped[int] = mapped_column(BigInteger)  # время открытия последнего бара окна, мс
+    claimed_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,169 @@
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Connection, inspect, text, select, insert, delete, func
+from sqlalchemy.schema import CreateColumn
+
+from config.config import SIGNAL_PARTITION_INTERVAL, SIGNAL_PARTITIONS_AHEAD, RULE_SETS
+from db.models import SignalData, SignalDailyCount, utc_today
+
+logger = logging.getLogger("db")
+
+TABLE = SignalData.__tablename__
+LEGACY_TABLE = f"{TABLE}_unpartitioned"
+# Сигналы, записанные до появления наборов правил, относятся к первому набору — он повторяет прежние пороги
+LEGACY_RULE = RULE_SETS[0]["name"]
+
+
+def _period_start(day: date, interval: str) -> date:
+    return day if interval == "day" else day.replace(day=1)
+
+
+def _next_period(start: date, interval: str) -> date:
+    if interval == "day":
+        return start + timedelta(days=1)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    return f"{TABLE}_p{start:%Y%m%d}" if interval == "day" else f"{TABLE}_p{start:%Y%m}"
+
+
+def partition_range(name: str) -> tuple[date, date] | None:
+    """Границы [начало, конец) секции по её имени; None для секции по умолчанию и чужих таблиц."""
+    suffix = name.removeprefix(f"{TABLE}_p")
+    try:
+        if len(suffix) == 8:
+            start = datetime.strptime(suffix, "%Y%m%d").date()
+            return start, _next_period(start, "day")
+        if len(suffix) == 6:
+            start = datetime.strptime(suffix, "%Y%m").date()
+            return start, _next_period(start, "month")
+    except ValueError:
+        pass
+    return None
+
+
+def _partitions(conn: Connection) -> list[str]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": TABLE})
+    return [name for name, in rows]
+
+
+def create_partitions(conn: Connection, first: date, last: date, interval: str = SIGNAL_PARTITION_INTERVAL) -> int:
+    """Секции, покрывающие даты first..last (существующие и пересекающиеся с ними пропускаются)."""
+    existing = [bounds for bounds in map(partition_range, _partitions(conn)) if bounds]
+    created = 0
+    start = _period_start(first, interval)
+    while start <= last:
+        end = _next_period(start, interval)
+        if not any(start < other_end and other_start < end for other_start, other_end in existing):
+            # Шарды поднимаются одновременно: секцию мог только что создать другой процесс
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(start, interval)} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
+            existing.append((start, end))
+            created += 1
+        start = end
+    # Сюда попадают строки вне созданных секций, чтобы вставка не падала, если обслуживание не запускалось
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {TABLE}_default PARTITION OF {TABLE} DEFAULT"))
+    return created
+
+
+def _create_partitioned_table(conn: Connection):
+    # Колонки берутся из модели; в первичный ключ секционированной таблицы обязан входить ключ секционирования
+    columns = ",\n    ".join(str(CreateColumn(column).compile(dialect=conn.dialect))
+                             for column in SignalData.__table__.columns)
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} (\n    {columns},\n    PRIMARY KEY (id, timestamp)\n) PARTITION BY RANGE (timestamp)"
+    ))
+
+
+def _migrate_unpartitioned(conn: Connection, interval: str, ahead: int):
+    """Переносит строки обычной таблицы signal_data (из прежних версий) в секционированную."""
+    inspector = inspect(conn)
+    legacy_columns = {column["name"] for column in inspector.get_columns(TABLE)}
+    # Имена индексов и первичного ключа заняты старой таблицей — переименовываем вместе с ней
+    for index in inspector.get_indexes(TABLE):
+        conn.execute(text(f"ALTER INDEX {index['name']} RENAME TO {index['name']}_unpartitioned"))
+    primary_key = inspector.get_pk_constraint(TABLE).get("name")
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}"))
+    if primary_key:
+        conn.execute(text(f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {primary_key} TO {primary_key}_unpartitioned"))
+
+    _create_partitioned_table(conn)
+    first = conn.execute(text(f"SELECT min(timestamp) FROM {LEGACY_TABLE}")).scalar()
+    today = utc_today()
+    create_partitions(conn, first.date() if first else today, _ahead(today, interval, ahead), interval)
+
+    columns = [column.name for column in SignalData.__table__.columns if column.name in legacy_columns]
+    values = ["COALESCE(timestamp, now())" if name == "timestamp" else name for name in columns]
+    if "rule" not in legacy_columns:
+        columns.append("rule")
+        values.append(":legacy_rule")
+    moved = conn.execute(text(
+        f"INSERT INTO {TABLE} ({', '.join(columns)}) SELECT {', '.join(values)} FROM {LEGACY_TABLE}"
+    ), {"legacy_rule": LEGACY_RULE}).rowcount
+    conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(max(id), 1)) FROM {TABLE}"))
+    conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    logger.info(f"{TABLE}: перенесено в секционированную таблицу строк {moved}")
+
+
+def _ahead(today: date, interval: str, ahead: int) -> date:
+    last = _period_start(today, interval)
+    for _ in range(ahead):
+        last = _next_period(last, interval)
+    return last
+
+
+def ensure_partitioned_table(conn: Connection, interval: str = SIGNAL_PARTITION_INTERVAL,
+                             ahead: int = SIGNAL_PARTITIONS_AHEAD):
+    """
+    PostgreSQL: signal_data — таблица, секционированная по timestamp (по суткам или месяцам), с секциями
+    до ahead периодов вперёд. Вызывается до create_all, чтобы тот не создал обычную таблицу.
+    """
+    relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+                           {"table": TABLE}).scalar()
+    if relkind is None:
+        _create_partitioned_table(conn)
+    elif relkind != "p":
+        _migrate_unpartitioned(conn, interval, ahead)
+        return
+
+    today = utc_today()
+    created = create_partitions(conn, today, _ahead(today, interval, ahead), interval)
+    if created:
+        logger.info(f"{TABLE}: создано секций {created}")
+
+
+def drop_expired(conn: Connection, retention_days: int, today: date | None = None) -> int:
+    """
+    Удаляет сырые сигналы старше retention_days суток: в PostgreSQL — целыми секциями,
+    в остальных БД — DELETE. Возвращает число удалённых секций или строк.
+    """
+    cutoff = (today or utc_today()) - timedelta(days=retention_days)
+    if conn.dialect.name != "postgresql":
+        return conn.execute(delete(SignalData).where(SignalData.timestamp < datetime.combine(cutoff, datetime.min.time()))).rowcount
+
+    dropped = 0
+    for name in _partitions(conn):
+        bounds = partition_range(name)
+        if bounds is not None and bounds[1] <= cutoff:
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped += 1
+    conn.execute(text(f"DELETE FROM {TABLE}_default WHERE timestamp < :cutoff"), {"cutoff": cutoff})
+    return dropped
+
+
+def backfill_daily_counts(conn: Connection):
+    """Строит дневные сводки по сырым сигналам, если сводок ещё нет (первый запуск после обновления)."""
+    if conn.execute(select(SignalDailyCount.day).limit(1)).first() is not None:
+        return
+    day = func.date(SignalData.timestamp)
+    rows = select(day, SignalData.exchange, SignalData.symbol, SignalData.rule, func.count()) \
+        .where(SignalData.timestamp.is_not(None)) \
+        .group_by(day, SignalData.exchange, SignalData.symbol, SignalData.rule)
+    conn.execute(insert(SignalDailyCount).from_select(["day", "exchange", "symbol", "rule", "signals"], rows))
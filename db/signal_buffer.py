@@ -0,0 +1,47 @@
+import logging
+
+from db.crud import save_signals
+from db.engine import async_session
+from db.models import utc_now
+from monitoring.metrics import DB_SECONDS
+
+logger = logging.getLogger("db")
+
+
+class SignalBuffer:
+    """
+    Копит сигналы, найденные за тик, и записывает их в БД одной пачкой в одной транзакции.
+
+    Номер сигнала за сутки выдаётся счётчиком в памяти в момент срабатывания, поэтому отложенная запись
+    не влияет на нумерацию; время сигнала тоже ставится при срабатывании, чтобы сигнал у полуночи
+    попал в те же сутки, что и в счётчике.
+    """
+
+    def __init__(self):
+        self._pending: list[dict] = []
+
+    def add(self, signal: dict):
+        self._pending.append({"timestamp": utc_now(), **signal})
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, []
+        try:
+            with DB_SECONDS.time():
+                async with async_session() as session:
+                    await save_signals(session, batch)
+        except Exception as e:
+            # Не теряем сигналы: вернём их в очередь до следующей записи
+            self._pending = batch + self._pending
+            logger.error(f"Не удалось сохранить {len(batch)} сигналов: {e}")
+            return 0
+
+        return len(batch)
+
+
+SIGNAL_BUFFER = SignalBuffer()
@@ -0,0 +1,36 @@
+import logging
+import time
+
+from config.config import SIGNAL_CLAIM_TTL_HOURS
+from db.crud import claim_signal, delete_signal_claims
+from db.engine import async_session
+
+logger = logging.getLogger("db")
+
+
+async def claim(exchange: str, symbol: str, rule: str, bar_time: int) -> bool:
+    """
+    Центральная дедупликация сигналов между шардами через общую БД: по (биржа, символ, правило, бар)
+    уведомление отправляет только процесс, первым записавший отметку.
+
+    Если БД недоступна, сигнал пропускается дальше — лучше дубль, чем потерянное уведомление.
+    """
+    try:
+        async with async_session() as session:
+            return await claim_signal(session, exchange, symbol, rule, bar_time)
+    except Exception as e:
+        logger.error(f"Не удалось записать отметку сигнала {symbol} на {exchange}: {e}")
+        return True
+
+
+async def purge_signal_claims(ttl_hours: float = SIGNAL_CLAIM_TTL_HOURS) -> int:
+    before = int((time.time() - ttl_hours * 3600) * 1000)
+    try:
+        async with async_session() as session:
+            deleted = await delete_signal_claims(session, before)
+    except Exception as e:
+        logger.error(f"Не удалось удалить старые отметки сигналов: {e}")
+        return 0
+    if deleted:
+        logger.info(f"Удалено старых отметок сигналов: {deleted}")
+    return deleted
@@ -0,0 +1,45 @@
+from datetime import date
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.crud import get_daily_signal_counts
+from db.models import utc_today
+
+
+class DailySignalCounter:
+    """
+    Счётчик сигналов за текущие сутки по (биржа, символ, набор правил) в памяти процесса.
+
+    Засеивается из БД при старте, дальше обновляется на горячем пути без запросов к базе.
+    При смене даты (UTC, как у времени сигналов в БД) счётчики обнуляются.
+    """
+
+    def __init__(self, today: Callable[[], date] = utc_today):
+        self.today = today
+        self._day: date | None = None
+        self._counts: dict[tuple[str, str, str], int] = {}
+
+    async def seed(self, session: AsyncSession):
+        self._day = self.today()
+        self._counts = await get_daily_signal_counts(session, day=self._day)
+
+    def _roll_day(self):
+        today = self.today()
+        if self._day != today:
+            self._day = today
+            self._counts.clear()
+
+    def increment(self, exchange: str, symbol: str, rule: str = "") -> int:
+        """Учитывает новый сигнал и возвращает его номер за сутки."""
+        self._roll_day()
+        key = (exchange, symbol, rule)
+        self._counts[key] = self._counts.get(key, 0) + 1
+        return self._counts[key]
+
+    def get(self, exchange: str, symbol: str, rule: str = "") -> int:
+        self._roll_day()
+        return self._counts.get((exchange, symbol, rule), 0)
+
+
+SIGNAL_COUNTER = DailySignalCounter()
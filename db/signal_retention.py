@@ -0,0 +1,27 @@
+import logging
+
+from config.config import SIGNAL_RETENTION_DAYS
+from db.engine import engine
+from db.partitions import ensure_partitioned_table, drop_expired
+
+logger = logging.getLogger("db")
+
+
+async def maintain_signal_storage(retention_days: int | None = SIGNAL_RETENTION_DAYS) -> int:
+    """
+    Суточное обслуживание signal_data: в PostgreSQL заранее создаёт следующие секции и удаляет секции
+    старше retention_days, в остальных БД удаляет старые строки. Дневные сводки не трогаются.
+    """
+    try:
+        async with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                await conn.run_sync(ensure_partitioned_table)
+            if retention_days is None:
+                return 0
+            dropped = await conn.run_sync(drop_expired, retention_days)
+    except Exception as e:
+        logger.error(f"Не удалось обслужить хранилище сигналов: {e}")
+        return 0
+    if dropped:
+        logger.info(f"Удалено устаревших сигналов (секций в PostgreSQL, строк в остальных БД): {dropped}")
+    return dropped
@@ -1,6 +1,34 @@
 import asyncio
 
 
+def window_metrics(symbol_data: list[dict], window: int = 20, interval: int = 5) -> dict | None:
+    """
+    Рост OI и цены (в процентах) и отношение объёмов последнего бара к первому за окно, без проверки порогов.
+
+    :param symbol_data: Список баров (Bar или словари) с полями oi, price, volume, timestamp по возрастанию времени
+    :return: None, если баров меньше, чем нужно окну; complete=False, если внутри окна есть пропущенные бары
+        и рост посчитан за больший промежуток, чем window
+    """
+    num_bars = window // interval
+
+    if len(symbol_data) < num_bars + 1:
+        return None  # недостаточно данных
+
+    # Ряды уже упорядочены склейкой и кешем баров
+    first = symbol_data[-(num_bars + 1)]  # старый
+    last = symbol_data[-1]  # свежий
+
+    volume_start = first["volume"]
+    return {
+        "oi_growth": ((last["oi"] - first["oi"]) / first["oi"]) * 100,
+        "price_growth": ((last["price"] - first["price"]) / first["price"]) * 100,
+        "volume_growth_ratio": last["volume"] / volume_start if volume_start != 0 else float("inf"),
+        "price_start": first["price"],
+        "price_end": last["price"],
+        "complete": last["timestamp"] - first["timestamp"] == num_bars * interval * 60 * 1000,
+    }
+
+
 def analyze_signal(
         symbol_data: list[dict],
         min_growth_oi: float = 3.0,
@@ -14,69 +42,67 @@ def analyze_signal(
     """
     Анализирует рост открытого интереса за заданное количество минут (window).
 
-    :param symbol_data: Список словарей с полями oi, price, volume, timestamp
+    :param symbol_data: Список баров (Bar или словари) с полями oi, price, volume, timestamp по возрастанию времени
     :param min_growth_oi: Минимальный рост OI в процентах для сигнала
     :param window: Временное окно анализа в минутах
     :param interval: Интервал одного бара в минутах (в соответствии с временными метками в symbol_data)
-    :return: dict с параметрами сигнала или None
+    :return: dict с параметрами сигнала или None; complete — как в window_metrics;
+        stop_loss и position_sum — None, если цена за окно не выросла
     """
-    num_bars = window // interval
-
-    if len(symbol_data) < num_bars + 1:
-        return None  # недостаточно данных
+    metrics = window_metrics(symbol_data, window, interval)
+    if metrics is None:
+        return None
 
-    # Сортируем по времени
-    sorted_data = sorted(symbol_data, key=lambda x: x["timestamp"])
-
-    first = sorted_data[-(num_bars + 1)]  # старый
-    last = sorted_data[-1]  # свежий
-
-    oi_start = first["oi"]
-    oi_end = last["oi"]
-    price_start = first["price"]
-    price_end = last["price"]
-    volume_start = first["volume"]
-    volume_end = last["volume"]
-
-    # Вычисляем изменения
-    oi_growth = ((oi_end - oi_start) / oi_start) * 100
-    price_growth = ((price_end - price_start) / price_start) * 100
-    volume_growth_ratio = volume_end / volume_start if volume_start != 0 else float("inf")
+    oi_growth = metrics["oi_growth"]
+    price_growth = metrics["price_growth"]
+    volume_growth_ratio = metrics["volume_growth_ratio"]
 
     if oi_growth >= min_growth_oi\
             and price_growth >= min_growth_price\
             and volume_growth_ratio >= min_volume_ratio:
 
-        stop_loss = price_start
+        stop_loss = metrics["price_start"]
         risk_usdt = (risk / 100) * balance
-        stop_loss_distance = (1 - stop_loss/price_end)
-        position_sum = risk_usdt / stop_loss_distance
+        stop_loss_distance = (1 - stop_loss/metrics["price_end"])
+        # Стоп ставится на цену начала окна — он имеет смысл только при росте цены за окно
+        # (правила без порога цены, например режима аномалий, пропускают и падение)
+        if stop_loss_distance > 0:
+            position_sum = round(risk_usdt / stop_loss_distance, 2)
+        else:
+            stop_loss = position_sum = None
 
         return {
-            "symbol": last.get("symbol"),
+            "symbol": symbol_data[-1].get("symbol"),
             "oi_growth": round(oi_growth, 2),
             "price_growth": round(price_growth, 2),
             "volume_growth_ratio": round(volume_growth_ratio, 2),
             "stop_loss": stop_loss,
-            "position_sum": round(position_sum, 2),
+            "position_sum": position_sum,
+            "complete": metrics["complete"],
         }
 
     return None
 
 
 if __name__ == "__main__":
-    from data_fetcher.binance import fetch_binance_data
+    from data_fetcher.binance import BINANCE_BASE_URL, fetch_binance_data, create_rate_limiter
+    from data_fetcher.http_client import HttpClient
 
     async def test():
-        # Получаем последние 10 баров по 5 минут
-        symbol_data = await fetch_binance_data("BTCUSDT", period="5m", limit=10)
+        client = HttpClient("Binance", BINANCE_BASE_URL, create_rate_limiter())
+        await client.start()
+        try:
+            # Получаем последние 10 баров по 5 минут
+            symbol_data = await fetch_binance_data(client, "BTCUSDT", period="5m", limit=10)
+        finally:
+            await client.close()
 
         # Анализируем рост OI за последние 15 минут
-        signal = analyze_signal(symbol_data, window=15)
+        signal = analyze_signal(symbol_data, window=15) if symbol_data else None
 
         if signal:
             print("Сигнал:", signal)
         else:
             print("Нет сигнала")
 
-    asyncio.run(test())
\ No newline at end of file
+    asyncio.run(test())
@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from data_fetcher.bar import Bar
+
+RESULT_DTYPE = np.dtype([
+    ("symbol", "U30"),
+    ("oi_growth", "f8"),
+    ("price_growth", "f8"),
+    ("volume_growth_ratio", "f8"),
+    ("stop_loss", "f8"),
+    ("position_sum", "f8"),
+    ("complete", "?"),
+])
+
+
+@dataclass
+class BarBlock:
+    """Колоночный блок (символы × бары) одной биржи: бары по возрастанию времени, недостающие слева — NaN."""
+
+    symbols: list[str]
+    timestamp: np.ndarray
+    oi: np.ndarray
+    price: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def empty(cls, symbols: list[str], n_bars: int) -> "BarBlock":
+        return cls(symbols, *(np.full((len(symbols), n_bars), np.nan) for _ in range(4)))
+
+
+def block_from_bars(symbol_series: dict[str, list[Bar]], n_bars: int) -> BarBlock:
+    """
+    Блок из последних n_bars баров каждого ряда (кеш баров, BarCache.window). Время уходит на чтение
+    атрибутов Bar; если бары уже лежат в массивах, быстрее block_from_records.
+    """
+    block = BarBlock.empty(list(symbol_series), n_bars)
+    for row, series in enumerate(symbol_series.values()):
+        series = series[-n_bars:]
+        if not series:
+            continue
+        values = np.array([(bar.timestamp, bar.oi, bar.price, bar.volume) for bar in series], dtype=float)
+        offset = n_bars - len(series)
+        block.timestamp[row, offset:], block.oi[row, offset:], block.price[row, offset:], \
+            block.volume[row, offset:] = values.T
+    return block
+
+
+def block_from_records(records: np.ndarray, n_bars: int) -> BarBlock:
+    """
+    Блок из записей хранилища баров (BarStore.read: по возрастанию (symbol, timestamp), без повторов)
+    целиком без цикла по символам.
+    """
+    names, starts, counts = np.unique(records["symbol"], return_index=True, return_counts=True)
+    block = BarBlock.empty([name.decode() for name in names], n_bars)
+    rows = np.repeat(np.arange(len(names)), counts)
+    # Номер бара с конца ряда символа: 0 — последний
+    from_end = np.repeat(starts + counts, counts) - np.arange(len(records)) - 1
+    keep = from_end < n_bars
+    rows, columns = rows[keep], n_bars - 1 - from_end[keep]
+    for field in ("timestamp", "oi", "price", "volume"):
+        getattr(block, field)[rows, columns] = records[field][keep]
+    return block
+
+
+def analyze_batch(
+        block: BarBlock,
+        min_growth_oi: float = 3.0,
+        min_growth_price: float = 0,
+        min_volume_ratio: float = 1,
+        balance: float = 1000,
+        risk: float = 1,
+        window: int = 20,
+        interval: int = 5
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Векторный аналог analyze_signal сразу для всех символов блока.
+
+    :return: (маска сигналов, структурированный массив RESULT_DTYPE по каждому символу). Метрики в массиве
+        не округлены; complete — как в window_metrics, окна с пропусками маска не исключает, как и analyze_signal.
+        stop_loss и position_sum — NaN, если цена за окно не выросла.
+
+    Символы, для которых analyze_signal упал бы с делением на ноль (нулевой OI или цена на старте окна),
+    в маску не попадают.
+    """
+    num_bars = window // interval
+    result = np.zeros(len(block.symbols), dtype=RESULT_DTYPE)
+    result["symbol"] = block.symbols
+    if block.oi.shape[1] < num_bars + 1:
+        for field in RESULT_DTYPE.names[1:-1]:
+            result[field] = np.nan
+        return np.zeros(len(block.symbols), dtype=bool), result
+
+    start, end = -(num_bars + 1), -1
+    oi_start, oi_end = block.oi[:, start], block.oi[:, end]
+    price_start, price_end = block.price[:, start], block.price[:, end]
+    volume_start, volume_end = block.volume[:, start], block.volume[:, end]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Тот же порядок операций, что в window_metrics и analyze_signal, — результаты совпадают побитово
+        oi_growth = ((oi_end - oi_start) / oi_start) * 100
+        price_growth = ((price_end - price_start) / price_start) * 100
+        volume_growth_ratio = np.where(volume_start != 0, volume_end / volume_start, np.inf)
+        stop_loss_distance = 1 - price_start / price_end
+        rising = stop_loss_distance > 0
+        position_sum = np.where(rising, (risk / 100) * balance / stop_loss_distance, np.nan)
+
+    mask = (oi_growth >= min_growth_oi) \
+        & (price_growth >= min_growth_price) \
+        & (volume_growth_ratio >= min_volume_ratio) \
+        & (oi_start != 0) & (price_start != 0)
+
+    result["oi_growth"] = oi_growth
+    result["price_growth"] = price_growth
+    result["volume_growth_ratio"] = volume_growth_ratio
+    result["stop_loss"] = np.where(rising, price_start, np.nan)
+    result["position_sum"] = position_sum
+    result["complete"] = block.timestamp[:, end] - block.timestamp[:, start] == num_bars * interval * 60 * 1000
+    return mask, result
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else value
+
+
+def hits_to_signals(mask: np.ndarray, result: np.ndarray) -> list[dict]:
+    """Сработавшие строки в виде словарей analyze_signal (с тем же округлением)."""
+    return [
+        {
+            "symbol": str(row["symbol"]),
+            "oi_growth": round(float(row["oi_growth"]), 2),
+            "price_growth": round(float(row["price_growth"]), 2),
+            "volume_growth_ratio": round(float(row["volume_growth_ratio"]), 2),
+            "stop_loss": _optional(float(row["stop_loss"])),
+            "position_sum": _optional(round(float(row["position_sum"]), 2)),
+            "complete": bool(row["complete"]),
+        }
+        for row in result[mask]
+    ]
@@ -29,8 +29,10 @@ def format_signal_message(
     price_growth: float,
     volume_growth_ratio: float,
     signal_number: int,
-    position_sum: float,
-    stop_loss: float,
+    position_sum: float | None,
+    stop_loss: float | None,
+    oi_zscore: float | None = None,
+    volume_zscore: float | None = None,
 ) -> str:
     coinglass_link = f"https://www.coinglass.com/tv/{exchange}_{symbol}"
     message = (
@@ -38,8 +40,16 @@ def format_signal_message(
         f"ОИ вырос на <b>{oi_growth:.2f}%</b>\n"
         f"Изменение цены: <b>{price_growth:+.2f}%</b>\n"
         f"Изменение объема: <b>x{volume_growth_ratio:.2f}</b>\n"
-        f"Сигнал за сутки: <b>{signal_number}</b>\n\n"
-        f"Сумма в позицию: <b>{position_sum:.2f}</b> USDT\n"
-        f"Стоп-лосс: <b>{stop_loss}</b>\n"
+        f"Сигнал за сутки: <b>{signal_number}</b>\n"
     )
+    if oi_zscore is not None:
+        # Сигнал режима аномалий: насколько последний бар выбивается из истории символа
+        message += f"Аномалия: OI <b>z={oi_zscore:.1f}</b>, объём <b>z={volume_zscore:.1f}</b>\n"
+    if position_sum is not None:
+        # Без роста цены за окно стоп на цене начала окна не ставится
+        message += (
+            "\n"
+            f"Сумма в позицию: <b>{position_sum:.2f}</b> USDT\n"
+            f"Стоп-лосс: <b>{stop_loss}</b>\n"
+        )
     return message
\ No newline at end of file
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+
+from config.config import DEPOSIT, RISK
+from data_fetcher.bar import Bar
+from logic.analyzer import analyze_signal
+from logic.formatter import format_signal_message
+from logic.rolling_stats import RollingStats, BAR_MS
+from logic.rules import RuleSet, BAR_MINUTES
+
+
+@dataclass
+class SignalEvent:
+    rule: RuleSet
+    signal: dict  # результат analyze_signal
+    number: int  # номер сигнала за сутки по (биржа, символ, набор правил)
+    message: str | None  # None — дневной лимит исчерпан, уведомление не отправляется
+
+
+def stats_pass(rule: RuleSet, scores: dict | None, last_bar: int) -> bool:
+    """Проходит ли символ пороги режима аномалий. scores — RollingStats.scores для горизонта правила."""
+    # z-оценки должны относиться к последнему закрытому бару окна, а не к бару до пропуска в ряду
+    if scores is None or scores["timestamp"] < last_bar - BAR_MS:
+        return False
+    if rule.min_oi_zscore is not None and not scores["oi_delta_z"] >= rule.min_oi_zscore:
+        return False
+    if rule.min_volume_zscore is not None and not scores["volume_z"] >= rule.min_volume_zscore:
+        return False
+    if rule.max_oi_rank is not None and (scores["oi_rank"] is None or scores["oi_rank"] > rule.max_oi_rank):
+        return False
+    return True
+
+
+def evaluate_symbol(symbol: str, exchange: str, symbol_data: list[Bar], rules: list[RuleSet], counter,
+                    balance: float = DEPOSIT, risk: float = RISK, stats: RollingStats | None = None) -> list[SignalEvent]:
+    """
+    Проверка окна баров всеми наборами правил: анализ, номер сигнала за сутки и текст уведомления.
+
+    Общая часть боевого тика и офлайн-прогона; counter — DailySignalCounter или совместимый объект
+    с методом increment(exchange, symbol, rule). Наборы правил режима аномалий срабатывают
+    только при переданной статистике stats.
+    """
+    events = []
+    for rule in rules:
+        scores = None
+        if rule.uses_stats:
+            scores = stats.scores(exchange, symbol, rule.stats_horizon) if stats is not None else None
+            if not stats_pass(rule, scores, symbol_data[-1].timestamp):
+                continue
+
+        signal_raw = analyze_signal(symbol_data, window=rule.window, interval=BAR_MINUTES,
+                                    min_growth_oi=rule.min_growth_oi, min_growth_price=rule.min_growth_price,
+                                    min_volume_ratio=rule.min_volume_ratio,
+                                    balance=balance, risk=risk)
+        if signal_raw is None or not signal_raw["complete"]:
+            continue  # по окну с пропущенными барами сигнал не выдаётся
+        if scores is not None:
+            signal_raw["oi_zscore"] = round(scores["oi_delta_z"], 2)
+            signal_raw["volume_zscore"] = round(scores["volume_z"], 2)
+
+        count = counter.increment(exchange, symbol, rule.name)
+        message = None
+        if count <= rule.max_signals_per_day:
+            message = format_signal_message(
+                symbol=symbol,
+                exchange=exchange,
+                interval_minutes=rule.window,
+                oi_growth=signal_raw["oi_growth"],
+                price_growth=signal_raw["price_growth"],
+                volume_growth_ratio=signal_raw["volume_growth_ratio"],
+                signal_number=count,
+                position_sum=signal_raw["position_sum"],
+                stop_loss=signal_raw["stop_loss"],
+                oi_zscore=signal_raw.get("oi_zscore"),
+                volume_zscore=signal_raw.get("volume_zscore"),
+            )
+        events.append(SignalEvent(rule, signal_raw, count, message))
+    return events
@@ -0,0 +1,291 @@
+import logging
+import os
+import time
+
+import numpy as np
+
+from config.config import STATS_HALF_LIVES_BARS, STATS_MIN_BARS, STATS_MIN_CROSS_SECTION, STATS_CHECKPOINT_DIR
+from data_fetcher.bar import Bar
+
+BAR_MS = 5 * 60 * 1000
+# Признаки закрытого бара: изменение OI и цены к предыдущему бару (%), логарифм объёма
+FEATURES = ("oi_delta", "return", "volume")
+
+logger = logging.getLogger("rolling_stats")
+
+
+class SymbolTable:
+    """
+    Состояние статистики всех символов одной биржи в массивах (строка на символ).
+
+    Для каждого признака ведутся среднее и дисперсия по всей истории (Welford) и EWMA-среднее и дисперсия
+    по горизонтам half_lives. Обновление на новый бар — O(1). Для каждого бара сохраняется его z-оценка
+    относительно состояния до этого бара, чтобы аномальный бар не размывал собственную оценку.
+    Горизонт 0 в horizons — вся история.
+
+    Место символа на бирже считается по срезу z-оценок OI предыдущего бара: срез фиксируется, когда
+    приходит первая оценка нового бара, и к этому моменту полон — ранг не зависит от порядка символов в тике.
+    """
+
+    ARRAYS = ("last_ts", "last_oi", "last_price", "count", "mean", "m2", "ewm_mean", "ewm_var", "z_ts", "z")
+
+    def __init__(self, half_lives: list[int], capacity: int = 256):
+        self.horizons = (0, *half_lives)
+        self.alpha = 1 - 0.5 ** (1 / np.array(half_lives, dtype=float))
+        self.symbols: list[str] = []
+        self.index: dict[str, int] = {}
+        features, horizons = len(FEATURES), len(half_lives)
+        self.last_ts = np.zeros(capacity, dtype=np.int64)
+        self.last_oi = np.zeros(capacity)
+        self.last_price = np.zeros(capacity)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros((capacity, features))
+        self.m2 = np.zeros((capacity, features))
+        self.ewm_mean = np.zeros((capacity, features, horizons))
+        self.ewm_var = np.zeros((capacity, features, horizons))
+        self.z_ts = np.zeros(capacity, dtype=np.int64)
+        self.z = np.full((capacity, features, horizons + 1), np.nan)
+        # Самый свежий бар с z-оценками и отсортированные z-оценки OI бара перед ним по горизонтам
+        self.latest_ts = 0
+        self.reference = [np.empty(0)] * (horizons + 1)
+
+    def row(self, symbol: str) -> int:
+        row = self.index.get(symbol)
+        if row is None:
+            row = len(self.symbols)
+            if row == len(self.last_ts):
+                self._grow()
+            self.symbols.append(symbol)
+            self.index[symbol] = row
+        return row
+
+    def _grow(self):
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            grown = np.zeros((len(array) * 2, *array.shape[1:]), dtype=array.dtype)
+            if name == "z":
+                grown.fill(np.nan)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def update(self, symbol: str, timestamp: int, oi: float, price: float, volume: float, min_bars: int):
+        row = self.row(symbol)
+        if timestamp <= self.last_ts[row]:
+            return
+
+        # Приращения считаются только между соседними барами; после пропуска ряд начинается заново
+        if self.last_ts[row] == timestamp - BAR_MS and self.last_oi[row] > 0 and self.last_price[row] > 0:
+            x = np.array([
+                (oi / self.last_oi[row] - 1) * 100,
+                (price / self.last_price[row] - 1) * 100,
+                np.log1p(volume),
+            ])
+            if timestamp > self.latest_ts:
+                self._freeze_reference()
+                self.latest_ts = timestamp
+            n = self.count[row]
+            if n >= min_bars:
+                mean = np.column_stack((self.mean[row], self.ewm_mean[row]))
+                var = np.column_stack((self.m2[row] / (n - 1), self.ewm_var[row]))
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    self.z[row] = np.where(var > 0, (x[:, None] - mean) / np.sqrt(var), np.nan)
+            else:
+                self.z[row] = np.nan
+            self.z_ts[row] = timestamp
+
+            # Welford
+            n += 1
+            delta = x - self.mean[row]
+            self.mean[row] += delta / n
+            self.m2[row] += delta * (x - self.mean[row])
+            self.count[row] = n
+            # EWMA: среднее и дисперсия с весом alpha на новое наблюдение
+            if n == 1:
+                self.ewm_mean[row] = x[:, None]
+            else:
+                diff = x[:, None] - self.ewm_mean[row]
+                increment = self.alpha * diff
+                self.ewm_mean[row] += increment
+                self.ewm_var[row] = (1 - self.alpha) * (self.ewm_var[row] + diff * increment)
+
+        self.last_ts[row] = timestamp
+        self.last_oi[row] = oi
+        self.last_price[row] = price
+
+    def _freeze_reference(self):
+        rows = len(self.symbols)
+        oi_z = self.z[:rows, 0][self.z_ts[:rows] == self.latest_ts]
+        self.reference = [np.sort(column[np.isfinite(column)]) for column in oi_z.T]
+
+    def scores(self, symbol: str, horizon: int, min_cross_section: int) -> dict | None:
+        """
+        z-оценки признаков последнего закрытого бара и его место на бирже по z-оценке OI:
+        oi_rank — доля символов со z-оценкой OI не ниже этой (0.01 — топ 1%) среди полного среза предыдущего бара.
+        None — по символу ещё нет z-оценок (мало истории или ряд прерывался).
+        """
+        row = self.index.get(symbol)
+        if row is None or self.z_ts[row] == 0:
+            return None
+        k = self.horizons.index(horizon)
+        z = self.z[row, :, k]
+        if np.isnan(z).all():
+            return None
+
+        result = {"timestamp": int(self.z_ts[row])}
+        result.update({f"{feature}_z": float(value) for feature, value in zip(FEATURES, z)})
+
+        reference = self.reference[k]
+        total = len(reference)
+        oi_z = z[0]
+        if total >= min_cross_section and np.isfinite(oi_z):
+            # Символ считается вместе со срезом: у самого сильного ранг 1 / (total + 1), как и прежде
+            above = total - np.searchsorted(reference, oi_z, "left")
+            result["oi_rank"] = float((above + 1) / (total + 1))
+        else:
+            result["oi_rank"] = None
+        return result
+
+    def state(self) -> dict[str, np.ndarray]:
+        rows = len(self.symbols)
+        arrays = {name: getattr(self, name)[:rows].copy() for name in self.ARRAYS}
+        # Срезы горизонтов разной длины — дополняются NaN до общей
+        reference = np.full((len(self.horizons), max(map(len, self.reference))), np.nan)
+        for k, values in enumerate(self.reference):
+            reference[k, :len(values)] = values
+        return {"symbols": np.array(self.symbols, dtype=str), "horizons": np.array(self.horizons),
+                "latest_ts": np.array(self.latest_ts), "reference": reference, **arrays}
+
+    @classmethod
+    def from_state(cls, state, half_lives: list[int]) -> "SymbolTable | None":
+        if tuple(state["horizons"].tolist()) != (0, *half_lives):
+            return None  # горизонты в конфиге поменялись — такой снимок не подходит
+        symbols = state["symbols"].tolist()
+        table = cls(half_lives, capacity=max(256, len(symbols)))
+        for name in cls.ARRAYS:
+            getattr(table, name)[:len(symbols)] = state[name]
+        table.symbols = symbols
+        table.index = {symbol: row for row, symbol in enumerate(symbols)}
+        if "reference" in state:
+            table.latest_ts = int(state["latest_ts"])
+            table.reference = [values[np.isfinite(values)] for values in state["reference"]]
+        else:
+            # Снимок прежней версии без среза: до следующего бара ранг считается по последнему
+            table.latest_ts = int(table.z_ts[:len(symbols)].max(initial=0))
+            table._freeze_reference()
+        return table
+
+
+class RollingStats:
+    """
+    Скользящая статистика символов по закрытым барам, по таблице на биржу.
+
+    Состояние сохраняется снимками .npz (save) и поднимается при старте (load), поэтому после перезапуска
+    z-оценки доступны сразу, без прогрева историей.
+    """
+
+    def __init__(self, half_lives: list[int] = STATS_HALF_LIVES_BARS, min_bars: int = STATS_MIN_BARS,
+                 min_cross_section: int = STATS_MIN_CROSS_SECTION, root: str = STATS_CHECKPOINT_DIR, writer: str = ""):
+        self.half_lives = list(half_lives)
+        self.min_bars = min_bars
+        self.min_cross_section = min_cross_section
+        self.root = root
+        self.writer = writer
+        self._tables: dict[str, SymbolTable] = {}
+
+    def table(self, exchange: str) -> SymbolTable:
+        table = self._tables.get(exchange)
+        if table is None:
+            table = self._tables[exchange] = SymbolTable(self.half_lives)
+        return table
+
+    def add(self, exchange: str, symbol: str, bars: list[Bar]):
+        """
+        Учитывает закрытые бары, которые новее уже учтённых. На баре с подставленным OI (oi_filled) учёт
+        останавливается: нулевое изменение OI исказило бы статистику, а бар с настоящим OI придёт позже.
+        """
+        closed_before = int(time.time() * 1000) // BAR_MS * BAR_MS
+        table = self.table(exchange)
+        for bar in bars:
+            if bar.timestamp >= closed_before or bar.oi_filled:
+                break
+            table.update(symbol, bar.timestamp, bar.oi, bar.price, bar.volume, self.min_bars)
+
+    def scores(self, exchange: str, symbol: str, horizon: int = 0) -> dict | None:
+        table = self._tables.get(exchange)
+        if table is None:
+            return None
+        return table.scores(symbol, horizon, self.min_cross_section)
+
+    # Снимки
+
+    def path(self, exchange: str) -> str:
+        name = f"{exchange}.{self.writer}.npz" if self.writer else f"{exchange}.npz"
+        return os.path.join(self.root, name)
+
+    def snapshot(self) -> dict[str, dict[str, np.ndarray]]:
+        """Копия состояния всех бирж; её можно записывать в другом потоке, пока статистика обновляется."""
+        return {exchange: table.state() for exchange, table in self._tables.items()}
+
+    def write(self, snapshot: dict[str, dict[str, np.ndarray]]) -> int:
+        """Записывает снимки (во временный файл и замена). Возвращает число символов."""
+        os.makedirs(self.root, exist_ok=True)
+        for exchange, state in snapshot.items():
+            path = self.path(exchange)
+            with open(path + ".tmp", "wb") as f:
+                np.savez(f, **state)
+            os.replace(path + ".tmp", path)
+        return sum(len(state["symbols"]) for state in snapshot.values())
+
+    def save(self) -> int:
+        return self.write(self.snapshot())
+
+    def load(self, exchange: str) -> int:
+        """Поднимает состояние биржи из снимка. Возвращает число символов (0, если снимка нет или он не подходит)."""
+        path = self.path(exchange)
+        if not os.path.exists(path):
+            return 0
+        try:
+            with np.load(path) as state:
+                table = SymbolTable.from_state(state, self.half_lives)
+        except Exception as e:
+            logger.warning(f"{exchange}: не удалось прочитать снимок статистики {path}: {e}")
+            return 0
+        if table is None:
+            logger.warning(f"{exchange}: горизонты статистики изменились, снимок {path} не используется")
+            return 0
+        self._tables[exchange] = table
+        return len(table.symbols)
+
+
+ROLLING_STATS = RollingStats()
+
+
+if __name__ == "__main__":
+    # Скорость обновления и размер снимка на синтетических рядах: python -m logic.rolling_stats
+    import tempfile
+
+    n_symbols, n_bars = 2000, 288
+    rng = np.random.default_rng(42)
+    oi = 1e6 * np.cumprod(1 + rng.normal(0, 0.01, (n_symbols, n_bars)), axis=1)
+    price = 10 * np.cumprod(1 + rng.normal(0, 0.005, (n_symbols, n_bars)), axis=1)
+    volume = rng.lognormal(7, 1, (n_symbols, n_bars))
+    oi[0, -1] *= 1.08  # всплеск OI на последнем баре у первого символа
+
+    with tempfile.TemporaryDirectory() as root:
+        stats = RollingStats(root=root)
+        table = stats.table("Binance")
+        started = time.perf_counter()
+        for j in range(n_bars):
+            for i in range(n_symbols):
+                table.update(f"SYM{i}USDT", (j + 1) * BAR_MS, oi[i, j], price[i, j], volume[i, j], stats.min_bars)
+        elapsed = time.perf_counter() - started
+        print(f"{n_symbols} символов × {n_bars} баров: {elapsed / (n_symbols * n_bars) * 1e6:.1f} мкс на обновление")
+
+        for horizon in table.horizons:
+            print(f"горизонт {horizon:>3}: SYM0USDT {stats.scores('Binance', 'SYM0USDT', horizon)}")
+
+        stats.save()
+        restored = RollingStats(root=root)
+        restored.load("Binance")
+        print(f"снимок {os.path.getsize(stats.path('Binance')) / 2 ** 20:.1f} МБ, после загрузки совпадает: "
+              f"{restored.scores('Binance', 'SYM0USDT') == stats.scores('Binance', 'SYM0USDT')}")
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+
+from config.config import RULE_SETS, STATS_HALF_LIVES_BARS, SHARD_COUNT
+
+BAR_MINUTES = 5
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    window: int  # окно анализа в минутах
+    min_growth_oi: float
+    min_growth_price: float
+    min_volume_ratio: float
+    max_signals_per_day: int
+    # Режим аномалий: пороги по статистике символа (logic/rolling_stats.py), None — не проверяются
+    min_oi_zscore: float | None = None
+    min_volume_zscore: float | None = None
+    max_oi_rank: float | None = None  # доля биржи с наибольшей z-оценкой OI
+    stats_horizon: int = 0  # период полураспада EWMA в барах, 0 — вся история
+
+    @property
+    def bars_needed(self) -> int:
+        return self.window // BAR_MINUTES + 1
+
+    @property
+    def uses_stats(self) -> bool:
+        return self.min_oi_zscore is not None or self.min_volume_zscore is not None or self.max_oi_rank is not None
+
+
+def load_rule_sets(configs: list[dict] = RULE_SETS, shard_count: int = SHARD_COUNT) -> list[RuleSet]:
+    rules = [
+        RuleSet(
+            name=config["name"],
+            window=config["window"],
+            # Набор только по статистике может не задавать пороги роста
+            min_growth_oi=config.get("oi", float("-inf")),
+            min_growth_price=config.get("price", float("-inf")),
+            min_volume_ratio=config.get("volume", 0.0),
+            max_signals_per_day=config["max_signals"],
+            min_oi_zscore=config.get("oi_z"),
+            min_volume_zscore=config.get("volume_z"),
+            max_oi_rank=config.get("rank"),
+            stats_horizon=config.get("horizon", 0),
+        )
+        for config in configs
+    ]
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Rule set names must be unique: {names}")
+    for rule in rules:
+        if rule.stats_horizon not in (0, *STATS_HALF_LIVES_BARS):
+            raise ValueError(f"Rule set {rule.name}: horizon must be 0 or one of {STATS_HALF_LIVES_BARS}")
+        # Статистику ведёт каждый шард по своим символам — ранг считался бы по доле биржи
+        if rule.max_oi_rank is not None and shard_count > 1:
+            raise ValueError(f"Rule set {rule.name}: rank needs the whole exchange in one process, "
+                             f"it is not supported with SHARD_COUNT={shard_count}")
+    return rules
+
+
+RULES = load_rule_sets()
+MAX_BARS_NEEDED = max(rule.bars_needed for rule in RULES)
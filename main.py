@@ -1,31 +1,176 @@
 import asyncio
 import logging
+import multiprocessing
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from db.engine import init_db
-from scheduler.job import run_signal_job
-from config.config import RUN_EVERY_SECONDS
+from bot.telegram_bot import signal_dispatcher
+from data_fetcher.adapters import ADAPTERS
+from data_fetcher.bar_cache import BAR_CACHE
+from data_fetcher.bar_store import BAR_STORE
+from data_fetcher.http_client import HttpClient, init_http_clients, close_http_clients
+from db.engine import init_db, async_session
+from db.signal_buffer import SIGNAL_BUFFER
+from db.signal_claims import purge_signal_claims
+from db.signal_retention import maintain_signal_storage
+from logic.rolling_stats import ROLLING_STATS
+from db.signal_counter import SIGNAL_COUNTER
+from monitoring.server import start_metrics_server
+from scheduler.job import run_signal_job, run_fast_lane
+from scheduler.sharding import SHARD, local_shards
+from scheduler.stream import run_streaming
+from config.config import RUN_EVERY_SECONDS, INGESTION_MODE, EXCHANGES, SIGNAL_FLUSH_SECONDS, METRICS_HOST, \
+    METRICS_PORT, EXCHANGE_WORKER_PROCESSES, BAR_STORE_ENABLED, SHARD_COUNT, FAST_LANE_ENABLED, \
+    FAST_LANE_INTERVAL_SECONDS, STATS_ENABLED, STATS_CHECKPOINT_SECONDS
 
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    format="%(asctime)s | %(levelname)s | %(processName)s | %(name)s | %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
-async def main():
+
+async def checkpoint_stats():
+    # Копия состояния снимается в цикле событий, запись на диск — в отдельном потоке
+    try:
+        await asyncio.to_thread(ROLLING_STATS.write, ROLLING_STATS.snapshot())
+    except Exception as e:
+        logging.error(f"Не удалось сохранить снимок статистики: {e}")
+
+
+async def main(exchanges: list[str] = EXCHANGES, metrics_port: int | None = METRICS_PORT, rate_share: float = 1.0,
+               maintain_storage: bool = True):
     await init_db()
+    async with async_session() as session:
+        await SIGNAL_COUNTER.seed(session)
+    await init_http_clients([
+        HttpClient(exchange, ADAPTERS[exchange].base_url, ADAPTERS[exchange].create_rate_limiter(rate_share))
+        for exchange in exchanges
+    ])
+
+    if BAR_STORE_ENABLED:
+        # Окна поднимаются из локального хранилища, с биржи догружаются только недостающие бары
+        for exchange in exchanges:
+            warmed = BAR_STORE.warm_start(BAR_CACHE, exchange, BAR_CACHE.max_bars)
+            logging.info(f"{exchange}: окна прогреты из хранилища баров, символов {warmed}")
+        BAR_STORE.start()
+
+    if STATS_ENABLED:
+        for exchange in exchanges:
+            loaded = ROLLING_STATS.load(exchange)
+            logging.info(f"{exchange}: статистика символов поднята из снимка, символов {loaded}")
+
+    signal_dispatcher.start()
+    metrics_runner = await start_metrics_server(METRICS_HOST, metrics_port) if metrics_port else None
 
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(run_signal_job, "interval", seconds=RUN_EVERY_SECONDS)
+    if INGESTION_MODE == "stream":
+        # Данные приходят из WebSocket-потоков, периодический опрос REST не нужен
+        workers = [asyncio.create_task(run_streaming(exchange)) for exchange in exchanges]
+        scheduler.add_job(SIGNAL_BUFFER.flush, "interval", seconds=SIGNAL_FLUSH_SECONDS)
+    else:
+        workers = []
+        # Не больше одного тика одновременно; пропущенные из-за долгого тика запуски схлопываются в один
+        scheduler.add_job(run_signal_job, "interval", args=[exchanges], seconds=RUN_EVERY_SECONDS,
+                          max_instances=1, coalesce=True, misfire_grace_time=RUN_EVERY_SECONDS)
+        if FAST_LANE_ENABLED:
+            # Символы у порогов — своей задачей, независимо от длинного общего тика
+            scheduler.add_job(run_fast_lane, "interval", args=[exchanges], seconds=FAST_LANE_INTERVAL_SECONDS,
+                              max_instances=1, coalesce=True, misfire_grace_time=FAST_LANE_INTERVAL_SECONDS)
+    if STATS_ENABLED:
+        scheduler.add_job(checkpoint_stats, "interval", seconds=STATS_CHECKPOINT_SECONDS)
+    if SHARD.enabled and SHARD.index == 0:
+        scheduler.add_job(purge_signal_claims, "interval", hours=1)
+    if maintain_storage and (not SHARD.enabled or SHARD.index == 0):
+        # Секции и удаление старых сигналов — один процесс на общую БД
+        scheduler.add_job(maintain_signal_storage, "interval", days=1)
     scheduler.start()
 
     print("Scheduler started. Press Ctrl+C to exit.")
     try:
         while True:
             await asyncio.sleep(3600)
-    except (KeyboardInterrupt, SystemExit):
+    except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
         print("Scheduler stopped.")
+    finally:
+        for worker in workers:
+            worker.cancel()
+        scheduler.shutdown(wait=False)
+        await SIGNAL_BUFFER.flush()
+        await BAR_STORE.stop()
+        if STATS_ENABLED:
+            await checkpoint_stats()
+        await signal_dispatcher.stop()
+        await close_http_clients()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+
+
+def run_worker(exchange: str, metrics_port: int | None):
+    # Чат Telegram общий на все процессы бирж, поэтому пауза между сообщениями растёт, как у шардов
+    signal_dispatcher.min_interval *= len(EXCHANGES)
+    asyncio.run(main([exchange], metrics_port, maintain_storage=exchange == EXCHANGES[0]))
+
+
+def run_worker_processes():
+    """
+    Каждая биржа в своём процессе: разбор JSON одной биржи не задерживает цикл событий другой.
+    Процессы независимы (свои HTTP-пулы, очередь Telegram, счётчики сигналов), метрики — на соседних портах;
+    обслуживание таблицы сигналов запускает только процесс первой биржи.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(exchange, METRICS_PORT and METRICS_PORT + i), name=exchange)
+        for i, exchange in enumerate(EXCHANGES)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Ctrl+C получает вся группа процессов, воркеры завершаются сами
+        for process in processes:
+            process.join()
+
+
+def run_shard(index: int, rate_share: float, metrics_port: int | None):
+    SHARD.configure(index, SHARD_COUNT)
+    # Файлы баров у каждого шарда свои; чат Telegram общий на все шарды, поэтому пауза между сообщениями растёт
+    BAR_STORE.writer = ROLLING_STATS.writer = SHARD.name
+    signal_dispatcher.min_interval *= SHARD_COUNT
+    asyncio.run(main(EXCHANGES, metrics_port, rate_share))
+
+
+def run_shard_processes():
+    """
+    Символы всех бирж делятся между SHARD_COUNT процессами (шарды этого хоста — SHARD_INDICES).
+
+    У каждого шарда свой цикл событий и HTTP-пулы. Лимиты бирж делятся поровну между шардами хоста
+    (у них общий IP) и дополнительно урезаются по остатку из заголовков ответов. Сигналы дедуплицируются
+    через общую БД, счётчики сигналов за сутки ведёт шард, за которым закреплён символ.
+    """
+    indices = local_shards()
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_shard, args=(index, 1 / len(indices), METRICS_PORT and METRICS_PORT + index),
+                        name=f"shard{index}")
+        for index in indices
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if SHARD_COUNT > 1:
+        run_shard_processes()
+    elif EXCHANGE_WORKER_PROCESSES:
+        run_worker_processes()
+    else:
+        asyncio.run(main())
@@ -0,0 +1,153 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        return super().render() + [
+            f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        return super().render() + [
+            f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        # ключ меток -> (счётчики по корзинам, сумма, количество)
+        self._values: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+        index = bisect_left(self.buckets, value)
+        if index < len(counts):
+            counts[index] += 1
+        self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+REGISTRY: list[Metric] = []
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# Стадии тика
+TICK_SECONDS = Histogram("screener_tick_seconds", "Full run_signal_job duration")
+EXCHANGE_SECONDS = Histogram("screener_exchange_seconds", "process_exchange duration", ("exchange",))
+FETCH_SECONDS = Histogram("screener_fetch_seconds", "HTTP request latency", ("exchange", "endpoint"))
+RATE_LIMIT_WAIT_SECONDS = Histogram("screener_rate_limit_wait_seconds", "Time waiting for a rate limiter slot",
+                                    ("exchange",))
+ANALYZE_SECONDS = Histogram("screener_analyze_seconds", "Rule evaluation time per symbol", ("exchange",),
+                            buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05))
+DB_SECONDS = Histogram("screener_db_seconds", "Signal batch write duration")
+SEND_SECONDS = Histogram("screener_send_seconds", "Telegram send duration")
+TELEGRAM_DELIVERY_SECONDS = Histogram("screener_telegram_delivery_seconds",
+                                      "Time from enqueue to delivery of a signal message")
+
+# Счётчики
+HTTP_REQUESTS = Counter("screener_http_requests_total", "HTTP requests by status", ("exchange", "endpoint", "status"))
+ERRORS = Counter("screener_errors_total", "Errors by stage", ("exchange", "stage"))
+EMPTY_RESPONSES = Counter("screener_empty_responses_total", "Empty exchange responses", ("exchange", "endpoint"))
+SIGNALS = Counter("screener_signals_total", "Signals found", ("exchange", "rule"))
+SYMBOLS_DEFERRED = Counter("screener_symbols_deferred_total", "Symbols cancelled at the tick deadline", ("exchange",))
+SIGNALS_DEDUPLICATED = Counter("screener_signals_deduplicated_total", "Signals already sent by another shard",
+                               ("exchange",))
+FAST_LANE_SKIPPED = Counter("screener_fast_lane_skipped_total", "Fast lane rescans skipped for low rate budget",
+                            ("exchange",))
+TELEGRAM_DROPPED = Counter("screener_telegram_dropped_total", "Signal messages not delivered to Telegram",
+                           ("reason",))
+TICK_OVERRUNS = Counter("screener_tick_overruns_total", "Ticks longer than the scheduling interval")
+
+# Состояние
+SYMBOLS_SCANNED = Gauge("screener_symbols_scanned", "Symbols scanned in the last tick", ("exchange",))
+PREFILTER_SKIPPED = Gauge("screener_prefilter_skipped", "Symbols skipped by the ticker snapshot prefilter",
+                          ("exchange",))
+TICK_COVERAGE = Gauge("screener_tick_coverage", "Share of symbols with fresh data in the last tick", ("exchange",))
+TELEGRAM_QUEUE_DEPTH = Gauge("screener_telegram_queue_depth", "Messages waiting for delivery")
+FAST_LANE_SYMBOLS = Gauge("screener_fast_lane_symbols", "Symbols near thresholds rescanned in the fast lane",
+                          ("exchange",))
+RATE_LIMIT_CONCURRENCY = Gauge("screener_rate_limit_concurrency", "Current adaptive concurrency", ("exchange",))
@@ -0,0 +1,62 @@
+import cProfile
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from config.config import PROFILE_DIR
+
+logger = logging.getLogger("profiler")
+
+
+class TickProfiler:
+    """
+    Профилирование одного тика по запросу: переменная окружения PROFILE_TICK=1 при старте
+    или POST /profile на сервере метрик. Использует pyinstrument, если он установлен, иначе cProfile.
+    """
+
+    def __init__(self, output_dir: str = PROFILE_DIR):
+        self.output_dir = output_dir
+        self._requested = os.getenv("PROFILE_TICK") == "1"
+
+    def request(self):
+        self._requested = True
+
+    @asynccontextmanager
+    async def maybe_profile(self):
+        if not self._requested:
+            yield
+            return
+        self._requested = False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"tick-{datetime.now():%Y%m%d-%H%M%S}")
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+
+        if Profiler is not None:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                path += ".html"
+                with open(path, "w") as f:
+                    f.write(profiler.output_html())
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                path += ".prof"
+                profiler.dump_stats(path)
+
+        logger.info(f"Профиль тика сохранён в {path}")
+
+
+TICK_PROFILER = TickProfiler()
@@ -0,0 +1,29 @@
+import logging
+
+from aiohttp import web
+
+from monitoring.metrics import render_metrics
+from monitoring.profiler import TICK_PROFILER
+
+logger = logging.getLogger("metrics")
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(text=render_metrics(), content_type="text/plain", charset="utf-8")
+
+
+async def profile_handler(request: web.Request) -> web.Response:
+    TICK_PROFILER.request()
+    return web.Response(text="next tick will be profiled\n")
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    app.router.add_post("/profile", profile_handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Метрики доступны на http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,79 @@
+import time
+
+from config.config import FAST_LANE_OI_MARGIN_PERCENT, FAST_LANE_PRICE_MARGIN_PERCENT, FAST_LANE_COOLDOWN_SECONDS, \
+    FAST_LANE_MAX_SYMBOLS
+from data_fetcher.bar import Bar
+from logic.analyzer import window_metrics
+from logic.rules import RULES, BAR_MINUTES, RuleSet
+
+
+class FastLane:
+    """
+    Символы, у которых по последнему анализу рост OI и цены подошёл к порогам какого-нибудь правила.
+
+    Их пересканирует отдельная частая задача короткими запросами (в кеше уже есть окно, догружаются 1–2 бара).
+    Символ остаётся в полосе, пока приближается к порогам, и выходит через cooldown секунд после последнего
+    приближения. Каждое правило срабатывает по бару не больше одного раза на обе полосы, иначе частые
+    пересканирования исчерпали бы дневной лимит сигналов за минуту.
+    """
+
+    def __init__(self, rules: list[RuleSet] = RULES, oi_margin: float = FAST_LANE_OI_MARGIN_PERCENT,
+                 price_margin: float = FAST_LANE_PRICE_MARGIN_PERCENT, cooldown: float = FAST_LANE_COOLDOWN_SECONDS,
+                 max_symbols: int = FAST_LANE_MAX_SYMBOLS):
+        self.rules = rules
+        self.oi_margin = oi_margin
+        self.price_margin = price_margin
+        self.cooldown = cooldown
+        self.max_symbols = max_symbols
+        self._until: dict[tuple[str, str], float] = {}  # (биржа, символ) -> до какого момента держать в полосе
+        self._gap: dict[tuple[str, str], float] = {}  # отставание роста OI от порога при последнем приближении
+        self._signalled_bar: dict[tuple[str, str, str], int] = {}  # (биржа, символ, правило) -> бар с сигналом
+
+    def gap(self, symbol_data: list[Bar]) -> float | None:
+        """
+        Наименьшее по правилам отставание роста OI от порога (п.п., отрицательное — порог пройден),
+        если рост цены тоже у порога. None — символ далеко от всех правил.
+        """
+        best = None
+        for rule in self.rules:
+            try:
+                metrics = window_metrics(symbol_data, rule.window, BAR_MINUTES)
+            except ZeroDivisionError:
+                continue
+            if metrics is None or not metrics["complete"]:
+                continue
+            oi_gap = rule.min_growth_oi - metrics["oi_growth"]
+            if oi_gap <= self.oi_margin and rule.min_growth_price - metrics["price_growth"] <= self.price_margin:
+                best = oi_gap if best is None else min(best, oi_gap)
+        return best
+
+    def observe(self, exchange: str, symbol: str, symbol_data: list[Bar]):
+        gap = self.gap(symbol_data)
+        if gap is not None:
+            self._until[(exchange, symbol)] = time.monotonic() + self.cooldown
+            self._gap[(exchange, symbol)] = gap
+
+    def symbols(self, exchange: str) -> list[str]:
+        """Символы полосы, ближайшие к порогам первыми; остывшие символы удаляются."""
+        now = time.monotonic()
+        for key in [key for key, until in self._until.items() if until <= now]:
+            del self._until[key]
+            del self._gap[key]
+        for key in [key for key in self._signalled_bar if key[:2] not in self._until]:
+            del self._signalled_bar[key]
+
+        hot = sorted((symbol for (name, symbol) in self._until if name == exchange),
+                     key=lambda symbol: self._gap[(exchange, symbol)])
+        return hot[:self.max_symbols]
+
+    def note_signal(self, exchange: str, symbol: str, rule: str, bar_time: int):
+        # Символы вне полосы пересканируются только общим тиком, для них отметка не нужна
+        if (exchange, symbol) in self._until:
+            self._signalled_bar[(exchange, symbol, rule)] = bar_time
+
+    def pending_rules(self, exchange: str, symbol: str, bar_time: int) -> list[RuleSet]:
+        """Правила, которые ещё не срабатывали по бару bar_time."""
+        return [rule for rule in self.rules if self._signalled_bar.get((exchange, symbol, rule.name)) != bar_time]
+
+
+FAST_LANE = FastLane()
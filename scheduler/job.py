@@ -1,106 +1,237 @@
 import asyncio
 import time
 import logging
-from asyncio import Semaphore
-from datetime import datetime
-
-from bot.telegram_bot import send_signal_to_telegram
-from config.config import TIMEFRAME_MINUTES, OI_THRESHOLD_PERCENT, EXCHANGES, MAX_SIGNALS_PER_DAY, \
-    PRICE_THRESHOLD_PERCENT, VOLUME_RATIO_THRESHOLD, DEPOSIT, RISK
-from data_fetcher.binance import fetch_binance_data, get_binance_symbols
-from data_fetcher.bybit import fetch_bybit_data, get_bybit_symbols
-from db.crud import save_signal, get_daily_signal_count
-from db.engine import async_session
-from logic.analyzer import analyze_signal
-from logic.formatter import format_signal_message
-
-
-# Настроим лимиты по биржам
-SEMAPHORES = {
-    "Binance": Semaphore(10),
-    "ByBit": Semaphore(10)
-}
 
-logger = logging.getLogger("job")
-
-
-async def process_symbol(symbol: str, exchange: str):
-    semaphore = SEMAPHORES[exchange]
-
-    async with semaphore:
-        try:
-            # 1. Получение данных с биржи
-            if exchange == "Binance":
-                symbol_data = await fetch_binance_data(symbol, period="5m", limit=TIMEFRAME_MINUTES // 5 + 1)
-            else:
-                symbol_data = await fetch_bybit_data(symbol, interval="5", limit=TIMEFRAME_MINUTES // 5 + 1)
-
-            # 2. Анализ на наличие сигнала
-            signal_raw = analyze_signal(symbol_data, window=TIMEFRAME_MINUTES, interval=5,
-                                        min_growth_oi=OI_THRESHOLD_PERCENT, min_growth_price=PRICE_THRESHOLD_PERCENT,
-                                        min_volume_ratio=VOLUME_RATIO_THRESHOLD,
-                                        balance=DEPOSIT, risk=RISK)
-
-            if signal_raw is None:
-                return
-
-            async with async_session() as session:
-                # 3. Сохранение в БД
-                await save_signal(session, {
-                    "symbol": signal_raw["symbol"],
-                    "exchange": exchange,
-                    "timestamp": datetime.now(),
-                    "oi_growth": signal_raw["oi_growth"],
-                    "price_growth": signal_raw["price_growth"],
-                    "volume_growth_ratio": signal_raw["volume_growth_ratio"]
-                })
-
-                # 4. Получение номера сигнала за сутки
-                count = await get_daily_signal_count(session, symbol, exchange)
-
-            # 5. Проверка лимита
-            if count > MAX_SIGNALS_PER_DAY:
-                return
+from bot.telegram_bot import signal_dispatcher
+from config.config import EXCHANGES, RUN_EVERY_SECONDS, TICK_DEADLINE_SECONDS, PREFILTER_ENABLED, \
+    BAR_STORE_ENABLED, FAST_LANE_MIN_HEADROOM, STATS_ENABLED
+from data_fetcher.adapters import get_adapter
+from data_fetcher.bar import Bar
+from data_fetcher.bar_cache import BAR_CACHE
+from data_fetcher.bar_store import BAR_STORE
+from data_fetcher.http_client import get_http_client, pop_pool_stats, get_rate_limiter_states
+from data_fetcher.symbol_registry import SYMBOL_REGISTRY
+from db.signal_buffer import SIGNAL_BUFFER
+from db.signal_claims import claim
+from db.signal_counter import SIGNAL_COUNTER
+from logic.pipeline import evaluate_symbol
+from logic.rolling_stats import ROLLING_STATS
+from logic.rules import RULES, MAX_BARS_NEEDED, RuleSet
+from monitoring.metrics import TICK_SECONDS, EXCHANGE_SECONDS, ANALYZE_SECONDS, ERRORS, SIGNALS, SYMBOLS_SCANNED, \
+    RATE_LIMIT_CONCURRENCY, TICK_COVERAGE, SYMBOLS_DEFERRED, TICK_OVERRUNS, PREFILTER_SKIPPED, \
+    SIGNALS_DEDUPLICATED, FAST_LANE_SYMBOLS, FAST_LANE_SKIPPED
+from monitoring.profiler import TICK_PROFILER
+from scheduler.fast_lane import FAST_LANE
+from scheduler.prefilter import SNAPSHOT_PREFILTER
+from scheduler.priority import SYMBOL_PRIORITY
+from scheduler.sharding import SHARD
 
-            # 6. Формирование полной информации
-            signal_full = {
-                "symbol": symbol,
-                "exchange": exchange,
-                "interval_minutes": TIMEFRAME_MINUTES,
-                "oi_growth": signal_raw["oi_growth"],
-                "price_growth": signal_raw["price_growth"],
-                "volume_growth_ratio": signal_raw["volume_growth_ratio"],
-                "signal_number": count,
-                "position_sum": signal_raw["position_sum"],
-                "stop_loss": signal_raw["stop_loss"],
-            }
 
-            message = format_signal_message(**signal_full)
-
-            # 7. Отправка уведомления
-            await send_signal_to_telegram(message)
-
-        except Exception as e:
-            logger.exception(f"Ошибка при обработке {symbol} на {exchange}: {e}")
-
-
-
-async def process_exchange(exchange: str):
-    if exchange == "Binance":
-        symbols = await get_binance_symbols()
-    else:
-        symbols = await get_bybit_symbols()
-
-    tasks = [process_symbol(symbol, exchange) for symbol in symbols]
-    await asyncio.gather(*tasks)
+logger = logging.getLogger("job")
 
 
-async def run_signal_job():
+async def fetch_symbol_data(exchange: str, symbol: str, limit: int) -> list[Bar] | None:
+    # Число одновременных запросов ограничивается внутри HTTP-клиента биржи
+    return await get_adapter(exchange).fetch_bars(get_http_client(exchange), symbol, limit)
+
+
+async def load_symbol_window(exchange: str, symbol: str, bars_needed: int) -> list[Bar]:
+    """Дополняет кеш баров только новыми барами и возвращает окно из bars_needed последних."""
+    limit = BAR_CACHE.fetch_limit(exchange, symbol, bars_needed)
+    fresh = await fetch_symbol_data(exchange, symbol, limit)
+    if fresh is None:
+        return []
+
+    if not BAR_CACHE.update(exchange, symbol, fresh):
+        # Разрыв между кешем и новыми барами: окно начинается заново со свежих баров, без второго запроса
+        # в этом же тике — короткий кеш на следующем тике сам запросит bars_needed баров
+        BAR_CACHE.reset(exchange, symbol, fresh)
+
+    if BAR_STORE_ENABLED:
+        BAR_STORE.add(exchange, symbol, fresh)
+    if STATS_ENABLED:
+        ROLLING_STATS.add(exchange, symbol, fresh)
+    return BAR_CACHE.window(exchange, symbol, bars_needed)
+
+
+async def process_symbol(symbol: str, exchange: str) -> bool:
+    """Возвращает True, если окно символа обновлено и проанализировано."""
+    try:
+        # 1. Получение данных с биржи (через кеш последних баров) — один раз под самое длинное окно
+        symbol_data = await load_symbol_window(exchange, symbol, MAX_BARS_NEEDED)
+        if not symbol_data:
+            return False
+        SYMBOL_PRIORITY.observe(exchange, symbol, symbol_data)
+        FAST_LANE.observe(exchange, symbol, symbol_data)
+        # Правила, уже сработавшие по этому бару в быстрой полосе, не повторяются
+        await handle_symbol_data(symbol, exchange, symbol_data,
+                                 FAST_LANE.pending_rules(exchange, symbol, symbol_data[-1].timestamp))
+        return True
+
+    except Exception as e:
+        ERRORS.inc(exchange=exchange, stage="process_symbol")
+        logger.exception(f"Ошибка при обработке {symbol} на {exchange}: {e}")
+        return False
+
+
+async def handle_symbol_data(symbol: str, exchange: str, symbol_data: list[Bar],
+                             rules: list[RuleSet] = RULES) -> list[str]:
+    """
+    Анализ окна баров по каждому набору правил, сохранение сигналов и отправка уведомлений —
+    общий путь для опроса и потоков. Возвращает имена сработавших наборов правил.
+    """
+    # 2. Анализ, номер сигнала за сутки (счётчик в памяти, засеян из БД при старте) и текст уведомления
+    with ANALYZE_SECONDS.time(exchange=exchange):
+        events = evaluate_symbol(symbol, exchange, symbol_data, rules, SIGNAL_COUNTER,
+                                 stats=ROLLING_STATS if STATS_ENABLED else None)
+
+    if SHARD.enabled and events:
+        # Шарды делят символы по хешу, но при смене SHARD_COUNT на части хостов символ может обходиться дважды:
+        # по бару каждое правило срабатывает один раз на все процессы
+        bar_time = symbol_data[-1].timestamp
+        claimed = [event for event in events if await claim(exchange, symbol, event.rule.name, bar_time)]
+        if len(claimed) < len(events):
+            SIGNALS_DEDUPLICATED.inc(len(events) - len(claimed), exchange=exchange)
+        events = claimed
+
+    for event in events:
+        SIGNALS.inc(exchange=exchange, rule=event.rule.name)
+        SYMBOL_PRIORITY.note_hit(exchange, symbol)
+        FAST_LANE.note_signal(exchange, symbol, event.rule.name, symbol_data[-1].timestamp)
+
+        # 3. Сохранение в БД — пачкой в конце тика
+        SIGNAL_BUFFER.add({
+            "symbol": event.signal["symbol"],
+            "exchange": exchange,
+            "rule": event.rule.name,
+            "oi_growth": event.signal["oi_growth"],
+            "price_growth": event.signal["price_growth"],
+            "volume_growth_ratio": event.signal["volume_growth_ratio"]
+        })
+
+        # 4. Отправка уведомления, если не исчерпан дневной лимит (фоновая очередь, не задерживает сканирование)
+        if event.message is not None:
+            signal_dispatcher.enqueue(event.message)
+
+    return [event.rule.name for event in events]
+
+
+async def rescan_hot_symbol(symbol: str, exchange: str):
+    try:
+        # Окно уже в кеше — с биржи догружаются только последние бары
+        symbol_data = await load_symbol_window(exchange, symbol, MAX_BARS_NEEDED)
+        if not symbol_data:
+            return
+        FAST_LANE.observe(exchange, symbol, symbol_data)
+        rules = FAST_LANE.pending_rules(exchange, symbol, symbol_data[-1].timestamp)
+        if rules:
+            await handle_symbol_data(symbol, exchange, symbol_data, rules)
+    except Exception as e:
+        ERRORS.inc(exchange=exchange, stage="fast_lane")
+        logger.exception(f"Ошибка при пересканировании {symbol} на {exchange}: {e}")
+
+
+async def run_fast_lane(exchanges: list[str] = EXCHANGES):
+    """
+    Частое пересканирование символов у порогов. Запросы идут через тот же лимитер, что и общий тик;
+    если свободного бюджета биржи меньше FAST_LANE_MIN_HEADROOM, проход по бирже пропускается.
+    """
+    for exchange in exchanges:
+        symbols = FAST_LANE.symbols(exchange)
+        FAST_LANE_SYMBOLS.set(len(symbols), exchange=exchange)
+        if not symbols:
+            continue
+        if get_http_client(exchange).rate_limiter.headroom() < FAST_LANE_MIN_HEADROOM:
+            FAST_LANE_SKIPPED.inc(exchange=exchange)
+            logger.info(f"{exchange}: мало бюджета лимитера, быстрая полоса пропущена")
+            continue
+        await asyncio.gather(*(rescan_hot_symbol(symbol, exchange) for symbol in symbols))
+
+    saved = await SIGNAL_BUFFER.flush()
+    if saved:
+        logger.info(f"Быстрая полоса: сохранено сигналов {saved}")
+
+
+async def get_symbols(exchange: str) -> list[str]:
+    # В шардированном режиме процесс обходит только закреплённые за ним символы
+    return SHARD.select(exchange, await SYMBOL_REGISTRY.get_symbols(exchange))
+
+
+async def process_exchange(exchange: str, deadline: float | None = None):
+    """
+    Обход символов биржи в порядке приоритета. Если к deadline (время цикла событий) обход не закончен,
+    оставшиеся символы отменяются и в следующем тике идут раньше остальных.
+    """
+    symbols = await get_symbols(exchange)
+    if not symbols:
+        logger.error(f"Нет списка символов для {exchange}, биржа пропущена")
+        return
+
+    with EXCHANGE_SECONDS.time(exchange=exchange):
+        if PREFILTER_ENABLED:
+            candidates = await SNAPSHOT_PREFILTER.select(exchange, symbols)
+            PREFILTER_SKIPPED.set(len(symbols) - len(candidates), exchange=exchange)
+            symbols = candidates
+        if not symbols:
+            SYMBOL_PRIORITY.set_deferred(exchange, [])
+            SYMBOLS_SCANNED.set(0, exchange=exchange)
+            TICK_COVERAGE.set(1.0, exchange=exchange)
+            logger.info(f"{exchange}: по срезу тикеров кандидатов нет")
+            return
+
+        # Задачи создаются по приоритету, в том же порядке они встают в очередь лимитера
+        tasks = {
+            asyncio.create_task(process_symbol(symbol, exchange)): symbol
+            for symbol in SYMBOL_PRIORITY.order(exchange, symbols)
+        }
+        timeout = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    deferred = [tasks[task] for task in pending]
+    SYMBOL_PRIORITY.set_deferred(exchange, deferred)
+    fresh = sum(1 for task in done if task.result())
+    coverage = fresh / len(symbols)
+
+    SYMBOLS_SCANNED.set(len(symbols), exchange=exchange)
+    TICK_COVERAGE.set(coverage, exchange=exchange)
+    if deferred:
+        SYMBOLS_DEFERRED.inc(len(deferred), exchange=exchange)
+        logger.warning(f"{exchange}: дедлайн тика, отложено символов {len(deferred)}")
+    logger.info(f"{exchange}: покрытие {fresh}/{len(symbols)} ({coverage:.0%})")
+
+
+async def run_signal_job(exchanges: list[str] = EXCHANGES):
     logger.info("Запуск run_signal_job")
     start_time = time.perf_counter()
+    deadline = None
+    if TICK_DEADLINE_SECONDS is not None:
+        deadline = asyncio.get_running_loop().time() + TICK_DEADLINE_SECONDS
+
+    async with TICK_PROFILER.maybe_profile():
+        # Запуск обработки обеих бирж одновременно
+        await asyncio.gather(*(process_exchange(exchange, deadline) for exchange in exchanges))
 
-    # Запуск обработки обеих бирж одновременно
-    await asyncio.gather(*(process_exchange(exchange) for exchange in EXCHANGES))
+        # Все сигналы тика записываются одной транзакцией
+        saved = await SIGNAL_BUFFER.flush()
+        if saved:
+            logger.info(f"Сохранено сигналов: {saved}")
 
     duration = time.perf_counter() - start_time
-    logger.info(f"Завершено run_signal_job за {duration:.2f} секунд")
\ No newline at end of file
+    TICK_SECONDS.observe(duration)
+    logger.info(f"Завершено run_signal_job за {duration:.2f} секунд")
+    if duration > RUN_EVERY_SECONDS:
+        TICK_OVERRUNS.inc()
+        logger.warning(f"Тик длиннее интервала запуска ({RUN_EVERY_SECONDS} с), следующий запуск будет пропущен")
+
+    for exchange, stats in pop_pool_stats().items():
+        logger.info(
+            f"HTTP-пул {exchange}: запросов {stats['requests']}, "
+            f"соединений открыто {stats['connections_opened']}, переиспользовано {stats['connections_reused']}"
+        )
+    for exchange, state in get_rate_limiter_states().items():
+        RATE_LIMIT_CONCURRENCY.set(state["concurrency"], exchange=exchange)
+        logger.info(f"Лимитер {exchange}: {state}")
+    logger.info(f"Очередь Telegram: {signal_dispatcher.metrics()}")
\ No newline at end of file
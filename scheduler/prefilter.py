@@ -0,0 +1,98 @@
+import logging
+import time
+from collections import deque
+
+from config.config import PREFILTER_OI_MARGIN_PERCENT, PREFILTER_PRICE_MARGIN_PERCENT
+from data_fetcher.adapters import get_adapter
+from data_fetcher.http_client import get_http_client
+from logic.rules import RULES, BAR_MINUTES, RuleSet
+
+logger = logging.getLogger("prefilter")
+
+
+def max_growth(values: list[float]) -> float:
+    """Наибольший рост в процентах между двумя точками ряда (более ранней и более поздней)."""
+    best = float("-inf")
+    low = None
+    for value in values:
+        if low is not None and low > 0:
+            best = max(best, (value - low) / low * 100)
+        if low is None or value < low:
+            low = value
+    return best
+
+
+class SnapshotPrefilter:
+    """
+    Отбор кандидатов по срезам тикеров всех контрактов, до запроса истории по каждому символу.
+
+    Анализатор сравнивает значения на двух барах внутри окна правила, поэтому если ни между какими двумя
+    срезами за окно (с запасом в два бара) рост OI или цены не дотягивает до порога за вычетом допуска,
+    правило сработать не может и символ пропускается. Пока срезов меньше, чем на окно, проходят все символы.
+    """
+
+    def __init__(self, rules: list[RuleSet] = RULES, oi_margin: float = PREFILTER_OI_MARGIN_PERCENT,
+                 price_margin: float = PREFILTER_PRICE_MARGIN_PERCENT):
+        self.rules = rules
+        self.oi_margin = oi_margin
+        self.price_margin = price_margin
+        # Окно правила плюс бар слева (старт окна — закрытие бара) и бар справа (незакрытый текущий)
+        self.lookbacks = {rule.name: (rule.window + 2 * BAR_MINUTES) * 60 for rule in rules}
+        self.history_seconds = max(self.lookbacks.values())
+        self._history: dict[str, deque[tuple[float, dict[str, dict]]]] = {}
+
+    def add_snapshot(self, exchange: str, snapshot: dict[str, dict], timestamp: float | None = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        history = self._history.setdefault(exchange, deque())
+        history.append((timestamp, snapshot))
+        # Самый старый срез оставляем, пока следующий за ним тоже покрывает окно
+        while len(history) > 1 and history[1][0] <= timestamp - self.history_seconds:
+            history.popleft()
+
+    def candidates(self, exchange: str, symbols: list[str]) -> list[str]:
+        history = self._history.get(exchange)
+        if not history:
+            return symbols
+        now = history[-1][0]
+        return [symbol for symbol in symbols if self._may_trigger(history, symbol, now)]
+
+    def _may_trigger(self, history: deque, symbol: str, now: float) -> bool:
+        for rule in self.rules:
+            start = now - self.lookbacks[rule.name]
+            if history[0][0] > start:
+                return True  # срезов ещё не хватает на окно
+
+            points = [snapshot[symbol] for timestamp, snapshot in history if timestamp >= start and symbol in snapshot]
+            if len(points) < 2:
+                return True  # новый символ или пропуски в срезах
+
+            price_growth = max_growth([point["price"] for point in points])
+            if price_growth < rule.min_growth_price - self.price_margin:
+                continue
+
+            oi = [point["oi"] for point in points]
+            if None in oi or max_growth(oi) >= rule.min_growth_oi - self.oi_margin:
+                return True
+        return False
+
+    def can_filter(self, exchange: str) -> bool:
+        """
+        Может ли срез биржи кого-то отсеять. Без OI в срезе остаётся только рост цены, а при порогах цены
+        не выше допуска проходят все символы — тогда тяжёлый запрос среза не нужен.
+        """
+        return get_adapter(exchange).snapshot_has_oi \
+            or any(rule.min_growth_price - self.price_margin > 0 for rule in self.rules)
+
+    async def select(self, exchange: str, symbols: list[str]) -> list[str]:
+        """Снимает новый срез биржи и возвращает символы, которым нужна полная история."""
+        if not self.can_filter(exchange):
+            return symbols
+        snapshot = await get_adapter(exchange).fetch_snapshot(get_http_client(exchange))
+        if snapshot is None:
+            logger.warning(f"{exchange}: срез тикеров недоступен, обходятся все символы")
+            return symbols
+        self.add_snapshot(exchange, snapshot)
+        return self.candidates(exchange, symbols)
+
+
+SNAPSHOT_PREFILTER = SnapshotPrefilter()
@@ -0,0 +1,60 @@
+import time
+
+from config.config import HOT_SYMBOL_TTL_SECONDS
+from data_fetcher.bar import Bar
+from logic.rules import RULES
+
+# OI-скорость считается по самому короткому окну правил
+VELOCITY_BARS = min(rule.bars_needed for rule in RULES) - 1
+
+
+class SymbolPriority:
+    """
+    Порядок обхода символов внутри тика.
+
+    Первыми идут символы с недавним сигналом, затем отложенные в прошлом тике (чтобы они не голодали),
+    затем остальные по убыванию скорости изменения OI. Если тик не укладывается в дедлайн,
+    отменяются именно хвостовые, наименее важные символы.
+    """
+
+    def __init__(self, hot_ttl: float = HOT_SYMBOL_TTL_SECONDS, velocity_bars: int = VELOCITY_BARS):
+        self.hot_ttl = hot_ttl
+        self.velocity_bars = velocity_bars
+        self._last_hit: dict[tuple[str, str], float] = {}
+        self._velocity: dict[tuple[str, str], float] = {}
+        self._deferred: dict[str, set[str]] = {}
+
+    def order(self, exchange: str, symbols: list[str]) -> list[str]:
+        now = time.monotonic()
+        deferred = self._deferred.get(exchange, set())
+
+        def key(symbol: str) -> tuple[int, float]:
+            hit = self._last_hit.get((exchange, symbol))
+            if hit is not None and now - hit < self.hot_ttl:
+                tier = 0
+            elif symbol in deferred:
+                tier = 1
+            else:
+                tier = 2
+            return tier, -self._velocity.get((exchange, symbol), 0.0)
+
+        # sorted устойчив: при равных ключах сохраняется порядок биржи
+        return sorted(symbols, key=key)
+
+    def observe(self, exchange: str, symbol: str, symbol_data: list[Bar]):
+        """Запоминает скорость изменения OI (модуль роста в процентах) по последним барам окна."""
+        if len(symbol_data) <= self.velocity_bars:
+            return
+        oi_start = symbol_data[-1 - self.velocity_bars].oi
+        oi_end = symbol_data[-1].oi
+        if oi_start:
+            self._velocity[(exchange, symbol)] = abs(oi_end - oi_start) / oi_start * 100
+
+    def note_hit(self, exchange: str, symbol: str):
+        self._last_hit[(exchange, symbol)] = time.monotonic()
+
+    def set_deferred(self, exchange: str, symbols: list[str]):
+        self._deferred[exchange] = set(symbols)
+
+
+SYMBOL_PRIORITY = SymbolPriority()
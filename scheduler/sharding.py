@@ -0,0 +1,49 @@
+import zlib
+
+from config.config import SHARD_COUNT, SHARD_INDICES
+
+
+class Shard:
+    """
+    Доля символов, которую обходит этот процесс.
+
+    Символ закрепляется за шардом по crc32 от (биржа, символ), поэтому все процессы, в том числе
+    на разных хостах, делят список символов одинаково без обмена данными — достаточно общих
+    SHARD_COUNT и номера шарда. Новые символы биржи сами попадают в один из шардов.
+    """
+
+    def __init__(self, index: int = 0, count: int = 1):
+        self.configure(index, count)
+
+    def configure(self, index: int, count: int):
+        if not 0 <= index < count:
+            raise ValueError(f"Shard index {index} is out of range for {count} shards")
+        self.index = index
+        self.count = count
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 1
+
+    def owns(self, exchange: str, symbol: str) -> bool:
+        return self.count == 1 or zlib.crc32(f"{exchange}:{symbol}".encode()) % self.count == self.index
+
+    def select(self, exchange: str, symbols: list[str]) -> list[str]:
+        if self.count == 1:
+            return symbols
+        return [symbol for symbol in symbols if self.owns(exchange, symbol)]
+
+    @property
+    def name(self) -> str:
+        return f"shard{self.index}"
+
+
+def local_shards(count: int = SHARD_COUNT, indices: list[int] | None = SHARD_INDICES) -> list[int]:
+    """Номера шардов, которые запускаются на этом хосте."""
+    local = list(range(count)) if indices is None else sorted(set(indices))
+    if not local or any(not 0 <= index < count for index in local):
+        raise ValueError(f"SHARD_INDICES {indices} must be a non-empty subset of range({count})")
+    return local
+
+
+SHARD = Shard()
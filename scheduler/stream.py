@@ -0,0 +1,105 @@
+import asyncio
+import logging
+
+from config.config import BAR_STORE_ENABLED, STATS_ENABLED
+from data_fetcher.adapters import get_adapter
+from data_fetcher.bar_cache import BAR_CACHE
+from data_fetcher.bar_store import BAR_STORE
+from data_fetcher.http_client import get_http_client
+from logic.rolling_stats import ROLLING_STATS
+from logic.rules import RULES, MAX_BARS_NEEDED
+from scheduler.job import load_symbol_window, handle_symbol_data, get_symbols
+
+logger = logging.getLogger("stream")
+
+
+class StreamProcessor:
+    """
+    Связывает поток биржи с кешем баров и общим путём анализа.
+
+    Каждое обновление бара сразу попадает в кеш и запускает анализ окна; по одному бару
+    каждый набор правил срабатывает не больше одного раза. Разрыв ряда перезаполняет окно через REST.
+    """
+
+    def __init__(self, exchange: str):
+        self.exchange = exchange
+        self.adapter = get_adapter(exchange)
+        self._pending: set[tuple[str, str]] = set()  # (символ, задача) уже в работе
+        self._signalled_bar: dict[tuple[str, str], int] = {}  # (символ, правило) -> бар с уже отправленным сигналом
+        self._tasks: set[asyncio.Task] = set()
+
+    def _spawn(self, symbol: str, kind: str, coro):
+        key = (symbol, kind)
+        if key in self._pending:
+            coro.close()
+            return
+        self._pending.add(key)
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: (self._pending.discard(key), self._tasks.discard(t)))
+
+    def on_update(self, symbol: str, timestamp: int, fields: dict, closed: bool):
+        if not BAR_CACHE.upsert(self.exchange, symbol, timestamp, **fields):
+            self._spawn(symbol, "refill", self._refill(symbol))
+            return
+
+        if closed and not self.adapter.stream_has_oi:
+            self._spawn(symbol, "oi", self._refresh_oi(symbol))
+        self._spawn(symbol, "analyze", self._analyze(symbol))
+
+    async def _refill(self, symbol: str):
+        try:
+            await load_symbol_window(self.exchange, symbol, MAX_BARS_NEEDED)
+        except Exception as e:
+            logger.warning(f"Не удалось перезаполнить окно {symbol} на {self.exchange}: {e}")
+
+    async def _refresh_oi(self, symbol: str):
+        try:
+            oi_data = await self.adapter.fetch_oi_values(get_http_client(self.exchange), symbol, 2)
+            for timestamp, oi in oi_data or []:
+                BAR_CACHE.upsert(self.exchange, symbol, timestamp, oi=oi)
+        except Exception as e:
+            logger.warning(f"Не удалось обновить OI {symbol} на {self.exchange}: {e}")
+            return
+        # Скачок OI виден сразу, а не на следующем событии свечи
+        if oi_data:
+            await self._analyze(symbol)
+
+    async def _analyze(self, symbol: str):
+        symbol_data = BAR_CACHE.window(self.exchange, symbol, MAX_BARS_NEEDED)
+        if not symbol_data:
+            return
+        if BAR_STORE_ENABLED:
+            BAR_STORE.add(self.exchange, symbol, symbol_data)
+        if STATS_ENABLED:
+            ROLLING_STATS.add(self.exchange, symbol, symbol_data)
+        bar = symbol_data[-1].timestamp
+        rules = [rule for rule in RULES if self._signalled_bar.get((symbol, rule.name)) != bar]
+        if not rules:
+            return
+        try:
+            for rule_name in await handle_symbol_data(symbol, self.exchange, symbol_data, rules):
+                self._signalled_bar[(symbol, rule_name)] = bar
+        except Exception as e:
+            logger.exception(f"Ошибка при обработке {symbol} на {self.exchange}: {e}")
+
+
+async def run_streaming(exchange: str):
+    stream_class = get_adapter(exchange).stream
+    if stream_class is None:
+        logger.error(f"{exchange}: адаптер не поддерживает потоки")
+        return
+
+    symbols = await get_symbols(exchange)
+    if not symbols:
+        logger.error(f"{exchange}: не удалось получить список символов, потоки не запущены")
+        return
+
+    # Прогрев окон через REST, дальше данные приходят только из потока
+    await asyncio.gather(*(load_symbol_window(exchange, symbol, MAX_BARS_NEEDED) for symbol in symbols),
+                         return_exceptions=True)
+    logger.info(f"{exchange}: окна прогреты, переход на потоки")
+
+    processor = StreamProcessor(exchange)
+    stream = stream_class(get_http_client(exchange).session, symbols, processor.on_update)
+    await stream.run()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Бот и движок БД читают окружение при импорте; тесты с БД подменяют движок на свой файл SQLite
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "1:test")
+os.environ.setdefault("DB_URL", "sqlite+aiosqlite:///:memory:")
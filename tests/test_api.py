@@ -0,0 +1,73 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import api.server
+from api.server import SignalApi
+from db.models import Base, SignalData
+
+SIGNALS = 23
+
+
+async def serve(tmp_path, scenario):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Пачками по секунде: много сигналов с одинаковым временем — ключ страницы должен различать их по id
+        start = datetime(2026, 1, 1, 12)
+        await conn.execute(insert(SignalData).values([
+            {"symbol": f"SYM{i}USDT", "exchange": "Binance", "rule": "default",
+             "timestamp": start + timedelta(seconds=i // 5),
+             "oi_growth": 5.0, "price_growth": 1.0, "volume_growth_ratio": 2.0}
+            for i in range(SIGNALS)
+        ]))
+
+    app = web.Application()
+    SignalApi(async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)).add_routes(app)
+    try:
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+    finally:
+        await engine.dispose()
+
+
+def test_keyset_pages_have_no_duplicates(tmp_path):
+    async def scenario(client):
+        ids, cursor = [], None
+        while True:
+            params = {"limit": 4, **({"after": cursor} if cursor else {})}
+            page = await (await client.get("/signals", params=params)).json()
+            ids.extend(row["id"] for row in page["signals"])
+            cursor = page["next"]
+            if cursor is None:
+                return ids
+
+    ids = asyncio.run(serve(tmp_path, scenario))
+    assert sorted(ids) == list(range(1, SIGNALS + 1))
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_export_streams_every_signal_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(api.server, "API_EXPORT_CHUNK", 5)
+
+    async def scenario(client):
+        ndjson = await (await client.get("/signals/export", params={"format": "ndjson"})).text()
+        csv = await (await client.get("/signals/export", params={"format": "csv"})).text()
+        return ndjson, csv
+
+    ndjson, csv = asyncio.run(serve(tmp_path, scenario))
+    ids = [json.loads(line)["id"] for line in ndjson.splitlines()]
+    assert sorted(ids) == list(range(1, SIGNALS + 1))
+    assert len(csv.splitlines()) == SIGNALS + 1
+
+
+def test_invalid_cursor_is_rejected(tmp_path):
+    async def scenario(client):
+        return (await client.get("/signals", params={"after": "bm90LWEtY3Vyc29y"})).status
+
+    assert asyncio.run(serve(tmp_path, scenario)) == 400
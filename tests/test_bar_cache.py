@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import scheduler.job as job
+from data_fetcher.bar import Bar
+from data_fetcher.bar_cache import BarCache
+
+BAR_MS = 5 * 60 * 1000
+
+
+def bars(first: int, count: int, price: float = 1.0) -> list[Bar]:
+    return [Bar("BTCUSDT", (first + i) * BAR_MS, 100.0, price, 10.0) for i in range(count)]
+
+
+def test_empty_update_keeps_cache():
+    cache = BarCache()
+    assert cache.update("Binance", "BTCUSDT", [])
+    assert cache.window("Binance", "BTCUSDT", 5) == []
+
+    cache.update("Binance", "BTCUSDT", bars(0, 3))
+    assert cache.update("Binance", "BTCUSDT", [])
+    assert len(cache.window("Binance", "BTCUSDT", 5)) == 3
+
+
+def test_update_appends_and_replaces_forming_bar():
+    cache = BarCache()
+    cache.update("Binance", "BTCUSDT", bars(0, 3))
+    assert cache.update("Binance", "BTCUSDT", bars(2, 2, price=2.0))
+
+    window = cache.window("Binance", "BTCUSDT", 10)
+    assert [bar.timestamp for bar in window] == [i * BAR_MS for i in range(4)]
+    assert [bar.price for bar in window] == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_gap_invalidates_series():
+    cache = BarCache()
+    cache.update("Binance", "BTCUSDT", bars(0, 3))
+    assert not cache.update("Binance", "BTCUSDT", bars(5, 2))
+    assert cache.window("Binance", "BTCUSDT", 10) == []
+
+
+def test_fetch_limit():
+    cache = BarCache()
+    assert cache.fetch_limit("Binance", "BTCUSDT", 5) == 5
+
+    current = int(time.time() * 1000) // BAR_MS
+    cache.reset("Binance", "BTCUSDT", bars(current - 9, 10))
+    assert cache.fetch_limit("Binance", "BTCUSDT", 5) == 2  # последний бар ещё формируется
+
+    cache.reset("Binance", "BTCUSDT", bars(current - 20, 10))
+    assert cache.fetch_limit("Binance", "BTCUSDT", 5) == 5  # кеш устарел — окно целиком
+
+
+def test_stale_cache_costs_one_request(monkeypatch):
+    cache = BarCache()
+    current = int(time.time() * 1000) // BAR_MS
+    cache.reset("Binance", "BTCUSDT", bars(current - 30, 10))
+    requests = []
+
+    async def fetch(exchange, symbol, limit):
+        requests.append(limit)
+        return bars(current - limit + 1, limit, price=2.0)
+
+    monkeypatch.setattr(job, "BAR_CACHE", cache)
+    monkeypatch.setattr(job, "fetch_symbol_data", fetch)
+    monkeypatch.setattr(job, "BAR_STORE_ENABLED", False)
+    monkeypatch.setattr(job, "STATS_ENABLED", False)
+
+    window = asyncio.run(job.load_symbol_window("Binance", "BTCUSDT", 5))
+    assert requests == [5]
+    assert [bar.timestamp for bar in window] == [(current - 4 + i) * BAR_MS for i in range(5)]
+
+
+def test_stream_bar_starts_with_zero_volume():
+    cache = BarCache()
+    cache.reset("ByBit", "BTCUSDT", bars(0, 2))
+    assert cache.upsert("ByBit", "BTCUSDT", 2 * BAR_MS, oi=120.0)
+
+    bar = cache.window("ByBit", "BTCUSDT", 1)[0]
+    assert (bar.timestamp, bar.oi, bar.price, bar.volume) == (2 * BAR_MS, 120.0, 1.0, 0.0)
+    assert not cache.upsert("ByBit", "BTCUSDT", 5 * BAR_MS, oi=1.0)  # оторванный бар — перезаполнение
+
+
+def test_inherited_oi_is_marked_filled():
+    cache = BarCache()
+    cache.reset("Binance", "BTCUSDT", bars(0, 2))
+    # Свеча открыла новый бар — OI взят с предыдущего
+    assert cache.upsert("Binance", "BTCUSDT", 2 * BAR_MS, price=2.0, volume=1.0)
+    assert cache.window("Binance", "BTCUSDT", 1)[0].oi_filled
+    assert cache.upsert("Binance", "BTCUSDT", 2 * BAR_MS, price=2.1)
+    assert cache.window("Binance", "BTCUSDT", 1)[0].oi_filled
+    # Настоящий OI снимает отметку
+    assert cache.upsert("Binance", "BTCUSDT", 2 * BAR_MS, oi=120.0)
+    assert not cache.window("Binance", "BTCUSDT", 1)[0].oi_filled
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from data_fetcher.bar import Bar
+from data_fetcher.bar_cache import BarCache
+from data_fetcher.bar_store import BarStore, BAR_MS
+
+
+def closed_bars(symbol: str, count: int, oi: float = 100.0) -> list[Bar]:
+    # Последние count закрытых баров перед текущим
+    current = int(time.time() * 1000) // BAR_MS * BAR_MS
+    return [Bar(symbol, current - (count - i) * BAR_MS, oi + i, 10.0, 5.0) for i in range(count)]
+
+
+def test_roundtrip_writes_each_bar_once(tmp_path):
+    store = BarStore(root=str(tmp_path))
+    bars = closed_bars("BTCUSDT", 4)
+    store.add("Binance", "BTCUSDT", bars)
+    store.add("Binance", "BTCUSDT", bars)  # повторный запрос тех же баров
+    store.add("Binance", "ETHUSDT", closed_bars("ETHUSDT", 2))
+    assert asyncio.run(store.flush()) == 6
+
+    records = store.read("Binance", "BTCUSDT")
+    assert records["timestamp"].tolist() == [bar.timestamp for bar in bars]
+    assert records["oi"].tolist() == [bar.oi for bar in bars]
+    assert len(store.read("Binance")) == 6
+
+
+def test_forming_and_filled_bars_are_not_written(tmp_path):
+    store = BarStore(root=str(tmp_path))
+    bars = closed_bars("BTCUSDT", 3)
+    forming = Bar("BTCUSDT", bars[-1].timestamp + BAR_MS, 200.0, 10.0, 5.0)
+    store.add("Binance", "BTCUSDT", [*bars[:2], bars[2].replace(oi_filled=True), forming])
+    asyncio.run(store.flush())
+    assert store.read("Binance", "BTCUSDT")["timestamp"].tolist() == [bar.timestamp for bar in bars[:2]]
+
+    # Настоящий OI по бару пришёл следующим запросом
+    store.add("Binance", "BTCUSDT", bars[1:])
+    asyncio.run(store.flush())
+    assert store.read("Binance", "BTCUSDT")["oi"].tolist() == [bar.oi for bar in bars]
+
+
+def test_warm_start_fills_cache_with_gapless_tail(tmp_path):
+    store = BarStore(root=str(tmp_path))
+    bars = closed_bars("BTCUSDT", 6)
+    store.add("Binance", "BTCUSDT", bars[:2] + bars[3:])  # пропуск третьего бара
+    asyncio.run(store.flush())
+
+    cache = BarCache()
+    assert BarStore(root=str(tmp_path)).warm_start(cache, "Binance", 10) == 1
+    assert cache.window("Binance", "BTCUSDT", 10) == bars[3:]
@@ -0,0 +1,29 @@
+import numpy as np
+
+from benchmarks.bench_analyzer import generate_series, to_records, loop_signals, THRESHOLDS, INTERVAL, WINDOWS
+from logic.batch_analyzer import analyze_batch, block_from_bars, block_from_records, hits_to_signals
+
+N_BARS = max(WINDOWS) // INTERVAL + 1
+
+
+def test_batch_matches_analyze_signal():
+    # В рядах есть пропуски баров (complete=False) и стоящая цена (без стоп-лосса)
+    series = generate_series(300, N_BARS)
+    block = block_from_bars(series, N_BARS)
+    signals = []
+    for window in WINDOWS:
+        mask, result = analyze_batch(block, window=window, interval=INTERVAL, **THRESHOLDS)
+        assert hits_to_signals(mask, result) == loop_signals(series, window)
+        signals += hits_to_signals(mask, result)
+    assert any(not signal["complete"] for signal in signals)
+    assert any(signal["position_sum"] is None for signal in signals)
+
+
+def test_block_from_store_records_matches_bars():
+    series = generate_series(50, N_BARS)
+    series["SHORTUSDT"] = [bar.replace(symbol="SHORTUSDT") for bar in series["SYM1USDT"][-3:]]
+    bars_block = block_from_bars(series, 10)
+    records_block = block_from_records(to_records(series), 10)
+    order = [records_block.symbols.index(symbol) for symbol in bars_block.symbols]
+    for field in ("timestamp", "oi", "price", "volume"):
+        assert np.array_equal(getattr(bars_block, field), getattr(records_block, field)[order], equal_nan=True)
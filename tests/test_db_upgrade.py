@@ -0,0 +1,86 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import db.engine
+from db.crud import save_signals, get_signal_rollup
+from db.models import utc_now, utc_today
+from db.partitions import LEGACY_RULE
+from db.signal_counter import DailySignalCounter
+
+# Схема signal_data первой версии скринера, до наборов правил и серверного времени
+BASELINE_SCHEMA = """
+CREATE TABLE signal_data (
+    id INTEGER NOT NULL PRIMARY KEY,
+    symbol VARCHAR(30) NOT NULL,
+    exchange VARCHAR(10) NOT NULL,
+    timestamp DATETIME NOT NULL,
+    oi_growth FLOAT NOT NULL,
+    price_growth FLOAT NOT NULL,
+    volume_growth_ratio FLOAT NOT NULL
+)
+"""
+
+
+@pytest.fixture
+def baseline_engine(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'screener.db'}")
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.execute(text(BASELINE_SCHEMA))
+            await conn.execute(text(
+                "INSERT INTO signal_data (symbol, exchange, timestamp, oi_growth, price_growth, volume_growth_ratio) "
+                "VALUES ('BTCUSDT', 'Binance', :timestamp, 6.2, 0.9, 10.1)"
+            ), {"timestamp": utc_now()})
+
+    asyncio.run(create())
+    monkeypatch.setattr(db.engine, "engine", engine)
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def test_legacy_signals_count_under_default_rule(baseline_engine):
+    async def scenario():
+        await db.engine.init_db()
+        async with baseline_engine.connect() as conn:
+            rules = (await conn.execute(text("SELECT rule FROM signal_data"))).scalars().all()
+        counter = DailySignalCounter()
+        async with async_sessionmaker(bind=baseline_engine, class_=AsyncSession)() as session:
+            await counter.seed(session)
+        return rules, counter
+
+    rules, counter = asyncio.run(scenario())
+    assert rules == [LEGACY_RULE]
+    assert counter.get("Binance", "BTCUSDT", LEGACY_RULE) == 1
+    assert counter.get("Binance", "BTCUSDT", "") == 0
+
+
+def test_save_signals_after_upgrade(baseline_engine):
+    signal = {"symbol": "BTCUSDT", "exchange": "Binance", "rule": LEGACY_RULE,
+              "oi_growth": 5.0, "price_growth": 1.0, "volume_growth_ratio": 2.0}
+
+    async def scenario():
+        await db.engine.init_db()
+        session_factory = async_sessionmaker(bind=baseline_engine, class_=AsyncSession)
+        async with session_factory() as session:
+            # Старая колонка timestamp — NOT NULL без значения по умолчанию
+            await save_signals(session, [signal, {**signal, "symbol": "ETHUSDT"}])
+        counter = DailySignalCounter()
+        async with session_factory() as session:
+            await counter.seed(session)
+            rollup = await get_signal_rollup(session, utc_today(), utc_today() + timedelta(days=1))
+        async with baseline_engine.connect() as conn:
+            missing = (await conn.execute(text("SELECT count(*) FROM signal_data WHERE timestamp IS NULL"))).scalar()
+        return counter, rollup, missing
+
+    counter, rollup, missing = asyncio.run(scenario())
+    assert missing == 0
+    # Сводки, счётчик и время сигналов считают сутки по одним часам
+    assert counter.get("Binance", "BTCUSDT", LEGACY_RULE) == 2
+    assert counter.get("Binance", "ETHUSDT", LEGACY_RULE) == 1
+    assert {(day, symbol): signals for day, _, symbol, _, signals in rollup} == \
+        {(utc_today(), "BTCUSDT"): 2, (utc_today(), "ETHUSDT"): 1}
@@ -0,0 +1,75 @@
+import asyncio
+
+from aiogram.exceptions import TelegramServerError, TelegramBadRequest
+from aiogram.methods import SendMessage
+
+import bot.dispatcher as dispatcher
+from monitoring.metrics import TELEGRAM_DROPPED, TELEGRAM_QUEUE_DEPTH, TELEGRAM_DELIVERY_SECONDS
+
+
+class FlakyBot:
+    def __init__(self, failures: list[Exception]):
+        self.failures = failures
+        self.sent: list[str] = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append(text)
+
+
+def method() -> SendMessage:
+    return SendMessage(chat_id=1, text="x")
+
+
+def deliver(bot: FlakyBot, monkeypatch) -> dict:
+    monkeypatch.setattr(dispatcher, "TELEGRAM_RETRY_BACKOFF_SECONDS", 0)
+
+    async def scenario():
+        telegram = dispatcher.TelegramDispatcher(bot, "1", min_interval=0)
+        telegram.start()
+        telegram.enqueue("signal")
+        await telegram.stop(timeout=5)
+        return telegram.metrics()
+
+    return asyncio.run(scenario())
+
+
+def test_server_errors_are_retried(monkeypatch):
+    bot = FlakyBot([TelegramServerError(method(), "Bad Gateway"), TelegramServerError(method(), "Bad Gateway")])
+    stats = deliver(bot, monkeypatch)
+    assert bot.sent == ["signal"]
+    assert stats["failed"] == 0
+
+
+def test_client_errors_drop_message_and_count_it(monkeypatch):
+    dropped = TELEGRAM_DROPPED.get(reason="send_failed")
+    bot = FlakyBot([TelegramBadRequest(method(), "chat not found")])
+    stats = deliver(bot, monkeypatch)
+    assert bot.sent == []
+    assert stats["failed"] == 1
+    assert TELEGRAM_DROPPED.get(reason="send_failed") == dropped + 1
+
+
+def delivered_count() -> int:
+    prefix = f"{TELEGRAM_DELIVERY_SECONDS.name}_count"
+    counts = [line for line in TELEGRAM_DELIVERY_SECONDS.render() if line.startswith(prefix)]
+    return int(counts[0].split()[-1]) if counts else 0
+
+
+def test_queue_depth_and_delivery_latency_are_exported():
+    delivered = delivered_count()
+
+    async def scenario():
+        telegram = dispatcher.TelegramDispatcher(FlakyBot([]), "1", min_interval=0)
+        telegram.enqueue("first")
+        telegram.enqueue("second")
+        depth = TELEGRAM_QUEUE_DEPTH.get()
+        telegram.start()
+        await telegram.stop(timeout=5)
+        return depth
+
+    assert asyncio.run(scenario()) == 2  # без ожидания конца тика
+    assert TELEGRAM_QUEUE_DEPTH.get() == 0
+    # Задержка пишется по каждому сигналу пачки
+    assert delivered_count() == delivered + 2
@@ -0,0 +1,49 @@
+from data_fetcher.bar import Bar
+from logic.rules import RuleSet
+from scheduler.fast_lane import FastLane
+
+BAR_MS = 5 * 60 * 1000
+RULES = [
+    RuleSet("15m", 15, min_growth_oi=3.0, min_growth_price=0.0, min_volume_ratio=1.0, max_signals_per_day=5),
+    RuleSet("30m", 30, min_growth_oi=5.0, min_growth_price=0.0, min_volume_ratio=1.0, max_signals_per_day=5),
+]
+
+
+def window(oi_growth: float, price_growth: float = 1.0) -> list[Bar]:
+    # Рост линейный по 7 барам; 15-минутное окно видит половину роста
+    return [Bar("X", i * BAR_MS, 100.0 * (1 + oi_growth / 100 * i / 6), 10.0 * (1 + price_growth / 100 * i / 6), 5.0)
+            for i in range(7)]
+
+
+def test_gap_is_distance_to_the_nearest_rule():
+    lane = FastLane(RULES, oi_margin=1.0, price_margin=0.5)
+    assert lane.gap(window(1.0)) is None
+    assert abs(lane.gap(window(4.5)) - 0.5) < 1e-9  # 30m: 5.0 - 4.5
+    assert lane.gap(window(4.5, price_growth=-2.0)) is None  # цена далеко от порога
+
+
+def test_symbols_ordered_by_gap_and_cooled_down():
+    lane = FastLane(RULES, oi_margin=1.0, price_margin=0.5, max_symbols=2)
+    lane.observe("Binance", "FAR", window(4.1))
+    lane.observe("Binance", "NEAR", window(4.9))
+    lane.observe("Binance", "PAST", window(5.5))
+    lane.observe("Binance", "COLD", window(0.0))
+    assert lane.symbols("Binance") == ["PAST", "NEAR"]
+    assert lane.symbols("ByBit") == []
+
+
+def test_symbol_leaves_after_cooldown():
+    lane = FastLane(RULES, oi_margin=1.0, price_margin=0.5, cooldown=0)
+    lane.observe("Binance", "NEAR", window(4.9))
+    assert lane.symbols("Binance") == []
+
+
+def test_rule_fires_once_per_bar():
+    lane = FastLane(RULES, oi_margin=1.0, price_margin=0.5)
+    lane.observe("Binance", "X", window(5.5))
+    lane.note_signal("Binance", "X", "30m", 6 * BAR_MS)
+    assert [rule.name for rule in lane.pending_rules("Binance", "X", 6 * BAR_MS)] == ["15m"]
+    assert len(lane.pending_rules("Binance", "X", 7 * BAR_MS)) == 2
+    # Символ вне полосы отметок не получает
+    lane.note_signal("Binance", "Y", "30m", 6 * BAR_MS)
+    assert len(lane.pending_rules("Binance", "Y", 6 * BAR_MS)) == 2
@@ -0,0 +1,23 @@
+import asyncio
+
+from aiohttp.test_utils import TestServer
+
+from benchmarks.mock_exchange import create_app, MockSettings
+from data_fetcher.binance import fetch_binance_data, create_rate_limiter
+from data_fetcher.http_client import HttpClient
+from monitoring.metrics import ERRORS
+
+
+def test_http_error_is_counted_not_parsed():
+    async def scenario():
+        async with TestServer(create_app(MockSettings(symbols=5, error_rate=1.0))) as server:
+            client = HttpClient("Binance", str(server.make_url("")).rstrip("/"), create_rate_limiter())
+            await client.start()
+            try:
+                return await fetch_binance_data(client, "SYM1USDT", limit=3)
+            finally:
+                await client.close()
+
+    errors = ERRORS.get(exchange="Binance", stage="fetch")
+    assert asyncio.run(scenario()) is None
+    assert ERRORS.get(exchange="Binance", stage="fetch") == errors + 1
@@ -0,0 +1,49 @@
+import pytest
+
+from data_fetcher.merge import merge_bars
+
+BAR_MS = 5 * 60 * 1000
+
+
+def oi_value(oi: float, price: float) -> float:
+    return oi * price
+
+
+def candles(count: int) -> list[tuple[int, float, float]]:
+    return [(i * BAR_MS, 10.0 + i, 100.0 + i) for i in range(count)]
+
+
+def test_matching_series():
+    bars = merge_bars("BTCUSDT", [(i * BAR_MS, 1.0 + i) for i in range(3)], candles(3), oi_value)
+    assert [(bar.timestamp, bar.oi, bar.oi_filled) for bar in bars] == \
+        [(0, 10.0, False), (BAR_MS, 22.0, False), (2 * BAR_MS, 36.0, False)]
+
+
+def test_ffill_last_bar_without_oi():
+    # openInterestHist ещё не отдал точку по последнему бару
+    bars = merge_bars("BTCUSDT", [(0, 1.0), (BAR_MS, 2.0)], candles(3), oi_value, policy="ffill", max_fill=1)
+    assert [bar.timestamp for bar in bars] == [0, BAR_MS, 2 * BAR_MS]
+    assert bars[-1].oi == 2.0 * 12.0
+    assert bars[-1].oi_filled and not bars[-2].oi_filled
+
+
+def test_ffill_stops_after_max_fill():
+    bars = merge_bars("BTCUSDT", [(0, 1.0), (4 * BAR_MS, 5.0)], candles(5), oi_value, policy="ffill", max_fill=1)
+    # Бар 1 заполнен, 2 и 3 выброшены, с бара 4 OI снова настоящий
+    assert [(bar.timestamp // BAR_MS, bar.oi_filled) for bar in bars] == [(0, False), (1, True), (4, False)]
+
+
+def test_drop_policy_skips_bars_without_oi():
+    bars = merge_bars("BTCUSDT", [(0, 1.0), (2 * BAR_MS, 3.0)], candles(3), oi_value, policy="drop", max_fill=5)
+    assert [bar.timestamp // BAR_MS for bar in bars] == [0, 2]
+    assert not any(bar.oi_filled for bar in bars)
+
+
+def test_oi_without_candle_is_ignored():
+    bars = merge_bars("BTCUSDT", [(0, 1.0), (BAR_MS // 2, 9.0), (BAR_MS, 2.0)], candles(2), oi_value)
+    assert [bar.oi for bar in bars] == [10.0, 22.0]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        merge_bars("BTCUSDT", [], candles(1), oi_value, policy="interpolate")
@@ -0,0 +1,64 @@
+import asyncio
+
+import scheduler.prefilter as prefilter
+from logic.rules import RuleSet
+from scheduler.prefilter import SnapshotPrefilter, max_growth
+
+
+def rule(oi: float = 3.0, price: float = 0.0) -> RuleSet:
+    return RuleSet(name="15m", window=15, min_growth_oi=oi, min_growth_price=price, min_volume_ratio=0.0,
+                   max_signals_per_day=3)
+
+
+class Adapter:
+    def __init__(self, snapshot_has_oi: bool):
+        self.snapshot_has_oi = snapshot_has_oi
+        self.calls = 0
+
+    async def fetch_snapshot(self, client):
+        self.calls += 1
+        return {"FLATUSDT": {"price": 1.0, "oi": 100.0}}
+
+
+def use_adapter(monkeypatch, adapter: Adapter):
+    monkeypatch.setattr(prefilter, "get_adapter", lambda exchange: adapter)
+    monkeypatch.setattr(prefilter, "get_http_client", lambda exchange: None)
+
+
+def test_max_growth_uses_earlier_low():
+    assert max_growth([100, 90, 99]) == 10.0
+    assert max_growth([100, 90, 80]) < 0
+
+
+def test_candidates_drop_symbols_without_oi_growth():
+    selector = SnapshotPrefilter([rule()], oi_margin=0.5, price_margin=0.5)
+    for minute in range(0, 30, 5):
+        selector.add_snapshot("ByBit", {
+            "FLATUSDT": {"price": 1.0, "oi": 100.0},
+            "HOTUSDT": {"price": 1.0 + minute / 1000, "oi": 100.0 + minute / 5},
+            "NOOIUSDT": {"price": 1.0, "oi": None},
+        }, timestamp=minute * 60)
+
+    assert selector.candidates("ByBit", ["FLATUSDT", "HOTUSDT", "NOOIUSDT", "NEWUSDT"]) == \
+        ["HOTUSDT", "NOOIUSDT", "NEWUSDT"]
+
+
+def test_no_snapshot_request_when_it_cannot_filter(monkeypatch):
+    adapter = Adapter(snapshot_has_oi=False)
+    use_adapter(monkeypatch, adapter)
+    selector = SnapshotPrefilter([rule(price=0.0)], price_margin=0.5)
+
+    assert asyncio.run(selector.select("Binance", ["FLATUSDT"])) == ["FLATUSDT"]
+    assert adapter.calls == 0
+
+
+def test_snapshot_requested_when_it_can_filter(monkeypatch):
+    adapter = Adapter(snapshot_has_oi=False)
+    use_adapter(monkeypatch, adapter)
+    asyncio.run(SnapshotPrefilter([rule(price=1.0)], price_margin=0.5).select("Binance", ["FLATUSDT"]))
+    assert adapter.calls == 1
+
+    adapter = Adapter(snapshot_has_oi=True)
+    use_adapter(monkeypatch, adapter)
+    asyncio.run(SnapshotPrefilter([rule(price=0.0)], price_margin=0.5).select("ByBit", ["FLATUSDT"]))
+    assert adapter.calls == 1
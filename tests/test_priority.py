@@ -0,0 +1,49 @@
+import asyncio
+
+import scheduler.job as job
+from data_fetcher.bar import Bar
+from scheduler.priority import SymbolPriority
+
+BAR_MS = 5 * 60 * 1000
+
+
+def window(oi_growth: float) -> list[Bar]:
+    return [Bar("X", i * BAR_MS, 100.0 * (1 + oi_growth / 100 * i / 4), 10.0, 5.0) for i in range(5)]
+
+
+def test_hot_then_deferred_then_by_oi_velocity():
+    priority = SymbolPriority(velocity_bars=4)
+    priority.observe("Binance", "SLOW", window(0.5))
+    priority.observe("Binance", "FAST", window(3.0))
+    priority.note_hit("Binance", "HOT")
+    priority.set_deferred("Binance", ["LATE"])
+
+    symbols = ["SLOW", "LATE", "NEW", "FAST", "HOT"]
+    assert priority.order("Binance", symbols) == ["HOT", "LATE", "FAST", "SLOW", "NEW"]
+    # Другая биржа — свой порядок
+    assert priority.order("ByBit", symbols) == symbols
+
+
+def test_deadline_defers_unfinished_symbols(monkeypatch):
+    priority = SymbolPriority()
+    delays = {"A": 0, "B": 0, "C": 10}
+
+    async def get_symbols(exchange):
+        return list(delays)
+
+    async def process_symbol(symbol, exchange):
+        await asyncio.sleep(delays[symbol])
+        return True
+
+    monkeypatch.setattr(job, "get_symbols", get_symbols)
+    monkeypatch.setattr(job, "process_symbol", process_symbol)
+    monkeypatch.setattr(job, "PREFILTER_ENABLED", False)
+    monkeypatch.setattr(job, "SYMBOL_PRIORITY", priority)
+
+    async def scenario():
+        await job.process_exchange("Binance", asyncio.get_running_loop().time() + 0.05)
+
+    asyncio.run(scenario())
+    assert job.TICK_COVERAGE.get(exchange="Binance") == 2 / 3
+    # Отложенный символ в следующем тике идёт первым
+    assert priority.order("Binance", ["A", "B", "C"]) == ["C", "A", "B"]
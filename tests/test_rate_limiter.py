@@ -0,0 +1,72 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from data_fetcher.http_client import HttpClient
+from data_fetcher.rate_limiter import RateLimiter
+
+
+def limiter(concurrency: int = 2) -> RateLimiter:
+    return RateLimiter("Test", limits={"weight": (1000, 60)}, endpoint_weights={},
+                       concurrency=concurrency, min_concurrency=1, max_concurrency=concurrency)
+
+
+def test_cancelled_requests_return_slots():
+    async def slow(request):
+        await asyncio.sleep(10)
+        return web.json_response([])
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/slow", slow)
+        async with TestServer(app) as server:
+            client = HttpClient("Test", str(server.make_url("")).rstrip("/"), limiter(concurrency=4))
+            await client.start()
+            try:
+                tasks = [asyncio.create_task(client.get_json("/slow")) for _ in range(10)]
+                await asyncio.sleep(0.2)
+                assert client.rate_limiter.state()["in_flight"] == 4
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                assert client.rate_limiter.state()["in_flight"] == 0
+                assert not client.rate_limiter._waiters
+            finally:
+                await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_wakeup_of_cancelled_waiter_passes_to_next():
+    async def scenario():
+        rate_limiter = limiter(concurrency=1)
+        await rate_limiter.acquire("/a")
+        second = asyncio.create_task(rate_limiter.acquire("/a"))
+        third = asyncio.create_task(rate_limiter.acquire("/a"))
+        await asyncio.sleep(0)
+
+        rate_limiter.release()  # слот достаётся second, но его тут же отменяют
+        second.cancel()
+        await asyncio.wait_for(third, 1)
+        assert second.cancelled()
+        assert rate_limiter.state()["in_flight"] == 1
+
+        rate_limiter.release()
+        assert rate_limiter.state()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_rate_limit_pause_delays_acquire():
+    async def scenario():
+        rate_limiter = limiter()
+        pause = await rate_limiter.observe(429, {"Retry-After": "0.2"})
+        assert pause == 0.2
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await rate_limiter.acquire("/a")
+        assert loop.time() - started >= 0.15
+        rate_limiter.release()
+
+    asyncio.run(scenario())
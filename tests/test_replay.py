@@ -0,0 +1,29 @@
+import time
+from datetime import datetime, timezone
+
+from backtest.replay import replay
+from data_fetcher.bar import Bar
+from logic.rules import RuleSet
+
+BAR_MS = 5 * 60 * 1000
+
+
+def test_daily_limit_resets_at_utc_midnight(monkeypatch):
+    # Часы хоста не в UTC: полночь UTC — 09:00 по местному времени, те же местные сутки
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    try:
+        midnight = int(datetime(2026, 3, 2, tzinfo=timezone.utc).timestamp() * 1000)
+        first = midnight - 6 * BAR_MS
+        bars = [Bar("BTCUSDT", first + i * BAR_MS, 100.0 * 1.02 ** i, 10.0 * 1.01 ** i, 5.0 * (i + 1))
+                for i in range(8)]
+        rule = RuleSet("15m", 15, min_growth_oi=3.0, min_growth_price=0.0, min_volume_ratio=1.0,
+                       max_signals_per_day=1)
+        records = replay("Binance", {"BTCUSDT": bars}, [rule])
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+
+    notified = [record["timestamp"] for record in records if record["notified"]]
+    # Первый сигнал до полуночи UTC и первый после — оба отправлены
+    assert notified == [first + 3 * BAR_MS, midnight]
@@ -0,0 +1,91 @@
+import numpy as np
+
+from data_fetcher.bar import Bar
+from logic.analyzer import analyze_signal
+from logic.formatter import format_signal_message
+from logic.rolling_stats import RollingStats, BAR_MS
+
+SYMBOLS = [f"SYM{i}USDT" for i in range(20)]
+
+
+def series(n_bars: int = 40) -> dict[str, tuple]:
+    rng = np.random.default_rng(7)
+    oi = 1e6 * np.cumprod(1 + rng.normal(0, 0.01, (len(SYMBOLS), n_bars)), axis=1)
+    price = 10 * np.cumprod(1 + rng.normal(0, 0.005, (len(SYMBOLS), n_bars)), axis=1)
+    volume = rng.lognormal(7, 1, (len(SYMBOLS), n_bars))
+    return oi, price, volume
+
+
+def ranks(order: list[int]) -> dict[str, float]:
+    """Ранг каждого символа сразу после его обновления — как в тике, где символ анализируется по готовности."""
+    oi, price, volume = series()
+    stats = RollingStats(min_bars=10, min_cross_section=5)
+    table = stats.table("Binance")
+    result = {}
+    for j in range(oi.shape[1]):
+        for i in order:
+            table.update(SYMBOLS[i], (j + 1) * BAR_MS, oi[i, j], price[i, j], volume[i, j], stats.min_bars)
+            if j == oi.shape[1] - 1:
+                result[SYMBOLS[i]] = stats.scores("Binance", SYMBOLS[i])["oi_rank"]
+    return result
+
+
+def test_rank_does_not_depend_on_update_order():
+    forward = ranks(list(range(len(SYMBOLS))))
+    backward = ranks(list(reversed(range(len(SYMBOLS)))))
+    assert forward == backward
+    assert all(rank is not None for rank in forward.values())
+
+
+def test_rank_survives_snapshot(tmp_path):
+    oi, price, volume = series()
+    stats = RollingStats(min_bars=10, min_cross_section=5, root=str(tmp_path))
+    table = stats.table("Binance")
+    for j in range(oi.shape[1]):
+        for i in range(len(SYMBOLS)):
+            table.update(SYMBOLS[i], (j + 1) * BAR_MS, oi[i, j], price[i, j], volume[i, j], stats.min_bars)
+    stats.save()
+
+    restored = RollingStats(min_bars=10, min_cross_section=5, root=str(tmp_path))
+    assert restored.load("Binance") == len(SYMBOLS)
+    assert all(restored.scores("Binance", s) == stats.scores("Binance", s) for s in SYMBOLS)
+
+
+def test_filled_oi_bars_are_not_counted():
+    stats = RollingStats(min_bars=5)
+    bars = [Bar("BTCUSDT", i * BAR_MS, 100.0 + i, 10.0, 5.0) for i in range(1, 4)]
+    bars.append(bars[-1].replace(timestamp=4 * BAR_MS, oi_filled=True))
+    bars.append(Bar("BTCUSDT", 5 * BAR_MS, 110.0, 10.0, 5.0))
+    stats.add("Binance", "BTCUSDT", bars)
+
+    table = stats.table("Binance")
+    row = table.index["BTCUSDT"]
+    assert table.last_ts[row] == 3 * BAR_MS
+    assert table.count[row] == 2
+
+
+def test_replace_resets_filled_flag_with_real_oi():
+    filled = Bar("BTCUSDT", BAR_MS, 100.0, 10.0, 5.0, oi_filled=True)
+    assert filled.replace(price=11.0).oi_filled
+    assert not filled.replace(oi=101.0).oi_filled
+
+
+def window(prices: list[float]) -> list[Bar]:
+    return [Bar("BTCUSDT", i * BAR_MS, 100.0 * (1 + i / 10), price, 5.0) for i, price in enumerate(prices)]
+
+
+def test_no_position_sizing_without_price_growth():
+    for prices in ([10.0, 10.0, 10.0, 10.0, 10.0], [10.0, 9.8, 9.7, 9.6, 9.5]):
+        signal = analyze_signal(window(prices), min_growth_oi=1.0, min_growth_price=float("-inf"),
+                                min_volume_ratio=0, window=20)
+        assert signal is not None
+        assert signal["position_sum"] is None and signal["stop_loss"] is None
+
+    message = format_signal_message("BTCUSDT", "Binance", 20, 40.0, -5.0, 1.0, 1, None, None)
+    assert "Сумма в позицию" not in message
+
+
+def test_position_sizing_with_price_growth():
+    signal = analyze_signal(window([10.0, 10.1, 10.2, 10.3, 10.5]), min_growth_oi=1.0, window=20)
+    assert signal["stop_loss"] == 10.0
+    assert signal["position_sum"] == round(10 / (1 - 10.0 / 10.5), 2)
@@ -0,0 +1,13 @@
+import pytest
+
+from logic.rules import load_rule_sets
+
+RANK_RULE = {"name": "top", "window": 15, "max_signals": 5, "oi_z": 3.0, "rank": 0.05}
+
+
+def test_rank_rules_need_unsharded_stats():
+    assert load_rule_sets([RANK_RULE], shard_count=1)[0].max_oi_rank == 0.05
+    with pytest.raises(ValueError, match="SHARD_COUNT"):
+        load_rule_sets([RANK_RULE], shard_count=4)
+    # z-оценки по собственной истории символа шардированию не мешают
+    assert load_rule_sets([{**RANK_RULE, "rank": None}], shard_count=4)[0].max_oi_rank is None
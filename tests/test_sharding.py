@@ -0,0 +1,31 @@
+import pytest
+
+from scheduler.sharding import Shard, local_shards
+
+SYMBOLS = [f"SYM{i}USDT" for i in range(200)]
+
+
+def test_shards_split_symbols_without_overlap():
+    shards = [Shard(index, 3) for index in range(3)]
+    selected = [shard.select("Binance", SYMBOLS) for shard in shards]
+    assert sorted(sum(selected, [])) == sorted(SYMBOLS)
+    assert all(selected)
+    # Разбиение не зависит от процесса и порядка символов
+    assert Shard(1, 3).select("Binance", list(reversed(SYMBOLS))) == list(reversed(selected[1]))
+
+
+def test_single_shard_owns_everything():
+    shard = Shard()
+    assert not shard.enabled
+    assert shard.select("ByBit", SYMBOLS) is SYMBOLS
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        Shard(3, 3)
+    with pytest.raises(ValueError):
+        local_shards(2, [0, 2])
+    with pytest.raises(ValueError):
+        local_shards(2, [])
+    assert local_shards(4, [3, 1, 1]) == [1, 3]
+    assert local_shards(2, None) == [0, 1]
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from aiohttp import ClientSession
+from aiohttp.test_utils import TestServer
+
+import data_fetcher.streams as streams
+import scheduler.job as job
+import scheduler.stream as stream
+from benchmarks.mock_exchange import create_app, MockSettings, _symbol_bars
+from data_fetcher.bar import Bar
+from data_fetcher.bar_cache import BarCache
+from db.signal_buffer import SignalBuffer
+from logic.rules import RuleSet
+
+BAR_MS = 5 * 60 * 1000
+SYMBOL = "SYM1USDT"
+
+
+class Outbox:
+    def __init__(self):
+        self.messages = []
+
+    def enqueue(self, message: str) -> bool:
+        self.messages.append(message)
+        return True
+
+
+def test_stream_updates_cache_and_fires_signal(monkeypatch):
+    cache = BarCache()
+    buffer = SignalBuffer()
+    outbox = Outbox()
+    monkeypatch.setattr(stream, "BAR_CACHE", cache)
+    monkeypatch.setattr(stream, "BAR_STORE_ENABLED", False)
+    monkeypatch.setattr(stream, "STATS_ENABLED", False)
+    monkeypatch.setattr(stream, "RULES", [RuleSet("stream", 15, min_growth_oi=10.0, min_growth_price=1.0,
+                                                  min_volume_ratio=0.0, max_signals_per_day=10)])
+    monkeypatch.setattr(job, "SIGNAL_BUFFER", buffer)
+    monkeypatch.setattr(job, "signal_dispatcher", outbox)
+
+    # Окно до текущего бара: OI и цена ниже тех, что пришлёт поток мок-биржи
+    current = int(time.time() * 1000) // BAR_MS * BAR_MS
+    history = _symbol_bars(SYMBOL, 5, current - BAR_MS)
+    cache.reset("ByBit", SYMBOL, [Bar(SYMBOL, ts, oi / 1.5, price / 1.1, volume) for ts, oi, price, volume in history])
+
+    async def scenario():
+        async with TestServer(create_app(MockSettings(symbols=5, stream_interval=0.05))) as server:
+            monkeypatch.setattr(streams, "BYBIT_WS_URL", str(server.make_url("")).rstrip("/").replace("http", "ws"))
+            processor = stream.StreamProcessor("ByBit")
+            async with ClientSession() as session:
+                runner = asyncio.create_task(streams.BybitStream(session, [SYMBOL], processor.on_update).run())
+                try:
+                    for _ in range(100):
+                        await asyncio.sleep(0.05)
+                        if outbox.messages:
+                            break
+                finally:
+                    runner.cancel()
+                    await asyncio.gather(runner, *processor._tasks, return_exceptions=True)
+
+    asyncio.run(scenario())
+    last = cache.window("ByBit", SYMBOL, 1)[0]
+    assert last.timestamp == current and not last.oi_filled
+    assert len(outbox.messages) == 1 and SYMBOL in outbox.messages[0]
+    assert len(buffer) == 1
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from data_fetcher.utils import gather_or_cancel
+
+
+async def leg(result, delay: float, log: list[str]):
+    try:
+        await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        log.append(f"cancelled {result}")
+        raise
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def test_results_keep_argument_order():
+    log = []
+    assert asyncio.run(gather_or_cancel(leg("slow", 0.02, log), leg("fast", 0, log))) == ["slow", "fast"]
+    assert log == []
+
+
+def test_empty_leg_cancels_the_other():
+    log = []
+    assert asyncio.run(gather_or_cancel(leg("slow", 10, log), leg([], 0, log))) is None
+    assert log == ["cancelled slow"]
+
+
+def test_failed_leg_cancels_the_other_and_raises():
+    log = []
+    with pytest.raises(ValueError):
+        asyncio.run(gather_or_cancel(leg("slow", 10, log), leg(ValueError("boom"), 0, log)))
+    assert log == ["cancelled slow"]